@@ -0,0 +1,44 @@
+import threading
+import urllib.parse
+import http.server
+import pytest
+
+# A local server standing in for the ZenRows API, so the downloader can be tested without spending credits.
+# Each link is answered from a script of (status code, headers, body) responses, one per request, the last one repeating.
+
+PDF_BODY = b"%PDF-1.4\n" + b"x" * 100000
+
+class StubZenRowsHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)["url"][0]
+        with self.server.lock:
+            self.server.requests.append(url)
+            script = self.server.scripts.get(url, [(200, {}, PDF_BODY)])
+            status, headers, body = script.pop(0) if(len(script) > 1) else script[0]
+
+        self.send_response(status)
+        headers = {"Content-Length": str(len(body)), **headers}
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# The stub server. Set server.scripts[link] to script a link, and read server.requests for the links asked for, in order. Unscripted links get server.pdf_body.
+@pytest.fixture
+def stub_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubZenRowsHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.scripts = {}
+    server.requests = []
+    server.pdf_body = PDF_BODY
+    server.api_url = f"http://127.0.0.1:{server.server_address[1]}/v1/"
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
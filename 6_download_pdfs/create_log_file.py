@@ -1,7 +1,7 @@
 import os
 import sys
 import pandas as pd
-import numpy as np
+from download_state_functions import open_download_state
 
 # Initialize paths.
 csv_path = "/home/joe/Documents/secret_lives_pa/output/pdf_download_list/"
@@ -14,52 +14,36 @@ download_links_file = "pdf_download_links.csv"
 criminal_cases_file = "criminal_pdf_links.csv.gz"
 lt_cases_file = "lt_pdf_links.csv.gz"
 
-# If the old log file does not exist, create an empty log file and read initial starting links.
-if(not os.path.exists(csv_path + pdf_log_file_old)):
+# Open the download state (see download_state_functions.py), which replaces rewriting the download links file every round.
+state_store = open_download_state(csv_path)
 
-    # Create empty log file.
+# If the old log file does not exist, create an empty log file.
+if(not os.path.exists(csv_path + pdf_log_file_old)):
     csv_log_df = pd.DataFrame({"file_name": [], "link": [], "status_code":[]})
     csv_log_df.to_csv(csv_path + pdf_log_file_old, index = False)
 
-    # Read in criminal cases.
-    criminal_cases_df = pd.read_csv(
-        csv_path + criminal_cases_file,
-        compression = "gzip",
-        dtype = {"file_name": str, "link": str, "successfully_scraped": bool}
-    )
-    
-    # Read in landlord-tenant cases.
-    lt_cases_df = pd.read_csv(
-        csv_path + lt_cases_file,
-        compression = "gzip",
-        dtype = {"file_name": str, "link": str, "successfully_scraped": bool}
-    )
+# The first time, fill the download state with the links.
+# The state only counts as seeded once every file was imported, so if we stop partway through, the next run imports them again (skipping the links already in).
+if(not state_store.is_seeded()):
 
-    # Combine cases.
-    cases_df = pd.concat([criminal_cases_df, lt_cases_df], axis = 0)
-    cases_df.to_csv(csv_path + download_links_file, index = False)
+    # Carry over the download links of an earlier round (from before we had the download state) if there are any.
+    if(os.path.exists(csv_path + download_links_file)):
+        state_store.import_links(csv_path + download_links_file)
 
-# If the log file does exist, read in the log file and existing links.
-else:
-    csv_log_df = pd.read_csv(
-        csv_path + pdf_log_file_old,
-        dtype = {"file_name": str, "link": str, "status_code": float}
-    )
+    # Otherwise, read in the criminal and landlord-tenant cases.
+    else:
+        state_store.import_links(csv_path + criminal_cases_file, compression = "gzip")
+        state_store.import_links(csv_path + lt_cases_file, compression = "gzip")
 
-    cases_df = pd.read_csv(
-        csv_path + download_links_file,
-        dtype = {"file_name": str, "link": str, "successfully_scraped": bool}
-    )
+    state_store.mark_seeded()
 
-# If it's not an empty log file, update our links using the results of the old log file, and create the new log file.
-if(len(csv_log_df) != 0):
+# Update the download state with the results of the old log file. This only touches the links in the log.
+nr_results = state_store.import_log(csv_path + pdf_log_file_old)
 
-    # Update download links.
-    merged_df = pd.merge(cases_df, csv_log_df, on = ["file_name", "link"], how = "outer")
-    merged_df = merged_df.assign(successfully_scraped = np.where(merged_df["status_code"] == 200, True, merged_df["successfully_scraped"]))
-    merged_df = merged_df.drop(columns = ["status_code"])
-    merged_df.to_csv(csv_path + download_links_file, index = False)
-
-    # Create new empty log file.
+# If it's not an empty log file, create the new log file.
+if(nr_results != 0):
     csv_log_df_new = pd.DataFrame({"file_name": [], "link": [], "status_code":[]})
     csv_log_df_new.to_csv(csv_path + pdf_log_file_new, index = False)
+
+print(f"{state_store.count_left()} PDFs left to download.")
+state_store.close()
@@ -1,15 +1,13 @@
 import os
 import sys
+import itertools
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv, dotenv_values
 from zenrows import ZenRowsClient
-import requests
-from multiprocessing.pool import ThreadPool
-import threading
-
-# Intialize lock on threads.
-csv_writer_lock = threading.Lock()
+from download_pdf_functions import ZENROWS_API_URL, ConcurrencyController, DownloadLogWriter, run_threads, fetch_pdf
+from download_state_functions import open_download_state
+from download_pdf_async_functions import run_async_downloads
 
 # Initialize paths.
 csv_path = "/home/joe/Documents/secret_lives_pa/output/pdf_download_list/"
@@ -18,39 +16,23 @@ pdf_path = "/home/joe/Documents/secret_lives_pa/output/pdf_download_list/pdfs/"
 # Initialize names for files.
 arguments = sys.argv
 pdf_log_file = arguments[1]
-download_links_file = "pdf_download_links.csv"
-
-# Read in the download links.
-cases_df = pd.read_csv(
-        csv_path + download_links_file,
-        dtype = {"file_name": str, "link": str, "successfully_scraped": bool}
-    )
 
-# Only keep links/cases which have not been scraped yet.
-cases_df = cases_df[cases_df["successfully_scraped"] == False]
+# Read in the download links which have not been scraped yet from the download state (filled by create_log_file.py), a page at a time as the downloads need them.
+state_store = open_download_state(csv_path)
+if(not state_store.is_seeded()):
+    sys.exit("No download links yet. Run create_log_file.py first.")
+links = state_store.links_left()
 
-# Load API key.
+# Load API key (and the API URL, which can be pointed at a local mock server for testing).
 load_dotenv()
 apikey = os.getenv("ZENROWS_API_KEY")
+api_url = os.getenv("ZENROWS_API_URL", ZENROWS_API_URL)
 
-# Download a PDF.
-def download_pdf(file_name, url, key = apikey):
-
-    # Request PDF using ZenRows API to avoid being blocked.
-    response = requests.get(
-        "https://api.zenrows.com/v1/",
-        params = {
-            "url": url,
-            "apikey": key
-        }
-    )
-
-    # Save PDF.
-    with open(pdf_path + file_name, 'wb') as f:
-        f.write(response.content)
-
-    # Return status code (in case request failed).
-    return(response.status_code)
+# The second argument is the most requests in flight at once. The controller finds how many ZenRows sustains below that.
+# The third (optional) argument is the engine: threads (default), with one thread per request in flight, or asyncio, which keeps hundreds of requests in flight from one thread.
+nr_workers = int(arguments[2])
+engine = arguments[3] if(len(arguments) > 3) else "threads"
+controller = ConcurrencyController(nr_workers)
 
 # Visit a URL, download the PDF, record the status code, write to log file.
 def visit_url(file_name, url):
@@ -58,26 +40,24 @@ def visit_url(file_name, url):
     # Download the PDF for the docket.
     print("Downloading file: " + file_name)
     print("url: " + url)
-    status_code = download_pdf(file_name, url)
+    status_code = fetch_pdf(file_name, url, apikey, pdf_path, controller, api_url)
     print("Status code: " + str(status_code) + "\n")
 
-    # Convert results of download into a Pandas data frame.
-    print("Saving results")
-    result = {
-        "file_name": [file_name],
-        "link": [url],
-        "status_code": [status_code]
-    }
-    df = pd.DataFrame(result)
-
-    # Save results to .csv (using the lock so it is thread safe).
-    with csv_writer_lock:
-        df.to_csv(csv_path + pdf_log_file, index = False, mode = "a", header = False)
-    print("Saved results\n")
+    # Hand the result to the thread writing the log file.
+    log_writer.write(file_name, url, status_code)
 
 # Start downloading the PDFs.
-nr_workers = int(arguments[2])
-pool = ThreadPool(nr_workers)
-results = pool.starmap(visit_url, zip(cases_df["file_name"], cases_df["link"]))
-pool.close()
-pool.join()
\ No newline at end of file
+# The log is written in batches by a thread of its own, and what is left of it when we stop (even on Ctrl-C) is written when it is closed.
+log_writer = DownloadLogWriter(csv_path + pdf_log_file)
+try:
+    if(engine == "asyncio"):
+        run_async_downloads(links, apikey, pdf_path, log_writer.write, nr_workers, api_url)
+    else:
+        # Stop handing out links if the log can no longer be written (the threads only print the error), so we do not download PDFs nobody will know of. close raises the error.
+        run_threads(visit_url, itertools.takewhile(lambda link: log_writer.error is None, links), nr_workers)
+finally:
+    # close raises the error of the log thread, if any, once the download state is closed too.
+    try:
+        log_writer.close()
+    finally:
+        state_store.close()
\ No newline at end of file
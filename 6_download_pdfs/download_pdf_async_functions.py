@@ -0,0 +1,381 @@
+import os
+import ssl
+import time
+import asyncio
+import traceback
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from download_pdf_functions import ZENROWS_API_URL, ConcurrencyController, download_chunk_size, is_retryable, backoff_delay
+
+# aiohttp is optional. Without it, we fall back on the small HTTP client below, which only needs the standard library.
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Download PDFs from one thread with asyncio, so hundreds of requests can be in flight without one OS thread (and its stack) each.
+# Only the file writes, which would block the event loop, go to a small pool of threads.
+
+# A response the server sent which we could not read.
+class HTTPProtocolError(Exception):
+    pass
+
+# Saving a PDF to the local disk failed (e.g., the disk is full).
+# This says nothing about the load of ZenRows, so it neither slows the downloads down nor is tried again.
+class LocalFileError(Exception):
+    # Args:
+    #   message (str): What went wrong.
+    #   latency (float): Seconds until the headers of the response arrived.
+    def __init__(self, message: str, latency: float):
+        super().__init__(message)
+        self.latency = latency
+
+# Errors which mean a request never got a (whole) response.
+DOWNLOAD_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HTTPProtocolError) + ((aiohttp.ClientError,) if(aiohttp is not None) else ())
+
+# Response of the standard library client, with the part of aiohttp's interface we use (status and content.iter_chunked).
+class StreamingHTTPResponse:
+    # Args:
+    #   client (StreamingHTTPClient): The client, which gets the connection back once the body is read.
+    #   key (tuple): Scheme, host and port of the connection.
+    #   reader (StreamReader): Reads from the connection.
+    #   writer (StreamWriter): Writes to the connection.
+    #   status (int): The status code.
+    #   headers (dict): The headers, with lower case names.
+    #   timeout (float): Seconds to wait for each read.
+    def __init__(self, client, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, status: int, headers: dict[str, str], timeout: float):
+        self.client = client
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.status = status
+        self.headers = headers
+        self.timeout = timeout
+        self.content = self
+        self.finished = False
+
+    # Read the body in pieces.
+    # Args:
+    #   size (int): Most bytes in one piece.
+    # Returns:
+    #   async generator: The pieces of the body.
+    async def iter_chunked(self, size: int):
+        if(self.headers.get("transfer-encoding", "").lower() == "chunked"):
+            while(True):
+                line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+                try:
+                    chunk_size = int(line.split(b";")[0], 16)
+                except ValueError:
+                    raise HTTPProtocolError(f"Could not read the size of a chunk: {line!r}")
+                if(chunk_size == 0):
+                    # Skip the trailers up to the blank line ending the body.
+                    while((await asyncio.wait_for(self.reader.readline(), self.timeout)) not in (b"\r\n", b"\n", b"")):
+                        pass
+                    break
+                yield await asyncio.wait_for(self.reader.readexactly(chunk_size), self.timeout)
+                await asyncio.wait_for(self.reader.readline(), self.timeout)
+        elif("content-length" in self.headers):
+            try:
+                remaining = int(self.headers["content-length"])
+            except ValueError:
+                raise HTTPProtocolError(f"Could not read the length of the body: {self.headers['content-length']!r}")
+            while(remaining > 0):
+                chunk = await asyncio.wait_for(self.reader.read(min(size, remaining)), self.timeout)
+                if(chunk == b""):
+                    raise HTTPProtocolError("Connection closed before the end of the body.")
+                remaining -= len(chunk)
+                yield chunk
+        # Without either, the body ends when the server closes the connection.
+        else:
+            while(chunk := await asyncio.wait_for(self.reader.read(size), self.timeout)):
+                yield chunk
+            self.headers["connection"] = "close"
+        self.finished = True
+
+    # Give the connection back to the client if the body was read and the server keeps it open, and close it otherwise.
+    def release(self):
+        if(self.finished and self.headers.get("connection", "").lower() != "close"):
+            self.client.idle.setdefault(self.key, []).append((self.reader, self.writer))
+        else:
+            self.writer.close()
+
+# A request of the standard library client, sent when entering async with (as in aiohttp).
+class StreamingHTTPRequest:
+    # Args:
+    #   client (StreamingHTTPClient): The client.
+    #   url (str): The URL.
+    #   params (dict): The query parameters.
+    def __init__(self, client, url: str, params: dict[str, str] | None):
+        self.client = client
+        self.url = url
+        self.params = params
+        self.response = None
+
+    async def __aenter__(self) -> StreamingHTTPResponse:
+        self.response = await self.client.request(self.url, self.params)
+        return self.response
+
+    async def __aexit__(self, *exc_info):
+        self.response.release()
+
+# HTTP/1.1 client on asyncio streams, for when aiohttp is not installed. It only does what the downloader needs: GET requests with keep-alive connections.
+class StreamingHTTPClient:
+    # Args:
+    #   connect_timeout (float): Seconds to wait for a connection.
+    #   read_timeout (float): Seconds to wait for each read.
+    def __init__(self, connect_timeout: float = 10, read_timeout: float = 180):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.ssl_context = ssl.create_default_context()
+        # Open connections nobody is using, by scheme, host and port.
+        self.idle = {}
+
+    # Prepare a GET request, sent when entering async with e.g., async with client.get(url, params = params) as response.
+    # Args:
+    #   url (str): The URL.
+    #   params (dict): The query parameters.
+    # Returns:
+    #   StreamingHTTPRequest: The request.
+    def get(self, url: str, params: dict[str, str] | None = None) -> StreamingHTTPRequest:
+        return StreamingHTTPRequest(self, url, params)
+
+    # Send a GET request and read the status and headers of the response (see StreamingHTTPResponse for the body).
+    # Args:
+    #   url (str): The URL.
+    #   params (dict): The query parameters.
+    # Returns:
+    #   StreamingHTTPResponse: The response.
+    async def request(self, url: str, params: dict[str, str] | None = None) -> StreamingHTTPResponse:
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if(parts.scheme == "https") else 80))
+        query = "&".join(query for query in (parts.query, urllib.parse.urlencode(params or {})) if(query))
+        request = (
+            f"GET {parts.path or '/'}{'?' + query if(query) else ''} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+
+        # A connection we kept open may have been closed by the server in the meantime. If so, move on to the next one, and in the end to a new one.
+        while(True):
+            reused = len(self.idle.get(key, [])) > 0
+            reader, writer = self.idle[key].pop() if(reused) else await asyncio.wait_for(
+                asyncio.open_connection(key[1], key[2], ssl = self.ssl_context if(key[0] == "https") else None),
+                self.connect_timeout
+            )
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+                if(status_line == b""):
+                    raise HTTPProtocolError("Connection closed before the response.")
+                break
+            except (OSError, HTTPProtocolError):
+                writer.close()
+                if(not reused):
+                    raise
+
+        try:
+            status = int(status_line.split()[1])
+            headers = {}
+            while((line := await asyncio.wait_for(reader.readline(), self.read_timeout)) not in (b"\r\n", b"\n", b"")):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, IndexError) as e:
+            writer.close()
+            raise HTTPProtocolError(f"Could not read the response: {e}")
+        except BaseException:
+            writer.close()
+            raise
+
+        return StreamingHTTPResponse(self, key, reader, writer, status, headers, self.read_timeout)
+
+    # Close every open connection.
+    async def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle = {}
+
+# Open the HTTP client of the asyncio engine: aiohttp if it is installed, our own otherwise.
+# Args:
+#   max_in_flight (int): Most requests in flight at once.
+#   connect_timeout (float): Seconds to wait for a connection.
+#   read_timeout (float): Seconds to wait for each read.
+# Returns:
+#   ClientSession or StreamingHTTPClient: The client. Close it with await client.close().
+def open_http_client(max_in_flight: int, connect_timeout: float = 10, read_timeout: float = 180):
+    if(aiohttp is not None):
+        return aiohttp.ClientSession(
+            connector = aiohttp.TCPConnector(limit = max_in_flight),
+            timeout = aiohttp.ClientTimeout(sock_connect = connect_timeout, sock_read = read_timeout)
+        )
+    return StreamingHTTPClient(connect_timeout, read_timeout)
+
+# Remove a file if it exists.
+# Args:
+#   path (str): File path to the file.
+def remove_if_exists(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# ConcurrencyController for coroutines instead of threads. All coroutines run in one thread, so only waiting for a free slot needs a condition.
+class AsyncConcurrencyController(ConcurrencyController):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.condition = asyncio.Condition()
+
+    # Wait until another request may be sent.
+    # Returns:
+    #   float: When the request started (pass it to release).
+    async def acquire(self) -> float:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return time.monotonic()
+
+    # Report how a request went, and let the next one through.
+    # Args:
+    #   started_at (float): The return value of acquire.
+    #   ok (bool): Whether the request went through without a sign of overload (see is_retryable).
+    #   latency (float): Seconds until the headers of the response arrived. Defaults to the seconds since started_at.
+    async def release(self, started_at: float, ok: bool, latency: float | None = None):
+        async with self.condition:
+            self.in_flight -= 1
+            self.observe(started_at, ok, latency)
+            self.condition.notify_all()
+
+# Download a PDF (see download_pdf in download_pdf_functions.py), writing it through the executor.
+# Args:
+#   client: The HTTP client (see open_http_client).
+#   executor (Executor): Threads writing the files.
+#   file_name (str): Name to save the PDF under.
+#   url (str): Link to the PDF.
+#   key (str): ZenRows API key.
+#   pdf_path (str): Folder to save the PDF in.
+#   api_url (str): URL of the ZenRows API.
+# Returns:
+#   tuple: The status code and the seconds until the headers of the response arrived.
+# Raises:
+#   LocalFileError: If the PDF could not be saved.
+async def download_pdf_async(client, executor, file_name: str, url: str, key: str, pdf_path: str, api_url: str = ZENROWS_API_URL) -> tuple[int, float]:
+    loop = asyncio.get_running_loop()
+    temp_path = pdf_path + file_name + ".part"
+    f = None
+    latency = None
+
+    # Run a file operation through the executor. Reading the response raises OSError too (e.g., a reset connection), so only the file operations are told apart.
+    async def save(function, *args):
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except OSError as e:
+            raise LocalFileError(f"Could not save {file_name}: {e!r}", latency) from e
+
+    try:
+        sent_at = time.monotonic()
+        async with client.get(api_url, params = {"url": url, "apikey": key}) as response:
+            # Entering async with waits for the headers, not the body.
+            latency = time.monotonic() - sent_at
+            if(response.status == 200):
+                f = await save(open, temp_path, "wb")
+                async for chunk in response.content.iter_chunked(download_chunk_size):
+                    await save(f.write, chunk)
+                await save(f.close)
+                await save(os.replace, temp_path, pdf_path + file_name)
+            return response.status, latency
+    finally:
+        if(f is not None and not f.closed):
+            await loop.run_in_executor(executor, f.close)
+        await loop.run_in_executor(executor, remove_if_exists, temp_path)
+
+# Download a PDF, trying again with a jittered exponential backoff if it was throttled or failed (see fetch_pdf in download_pdf_functions.py).
+# Args:
+#   client: The HTTP client (see open_http_client).
+#   executor (Executor): Threads writing the files.
+#   controller (AsyncConcurrencyController): Limits the requests in flight.
+#   file_name (str): Name to save the PDF under.
+#   url (str): Link to the PDF.
+#   key (str): ZenRows API key.
+#   pdf_path (str): Folder to save the PDF in.
+#   api_url (str): URL of the ZenRows API.
+#   retries (int): Times to try again.
+#   backoff_base (float): Bound on the wait before the first retry (see backoff_delay).
+#   backoff_cap (float): Bound on the wait before any retry.
+# Returns:
+#   int: The status code of the last try, or None if it never got a response.
+# Raises:
+#   LocalFileError: If the PDF could not be saved.
+async def fetch_pdf_async(client, executor, controller: AsyncConcurrencyController, file_name: str, url: str, key: str, pdf_path: str, api_url: str = ZENROWS_API_URL, retries: int = 5, backoff_base: float = 1, backoff_cap: float = 60) -> int | None:
+    for attempt in range(retries + 1):
+        if(attempt > 0):
+            await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_cap))
+            print(f"Trying {file_name} again (retry {attempt} of {retries}).")
+
+        status_code = None
+        latency = None
+        ok = False
+        started_at = await controller.acquire()
+        try:
+            status_code, latency = await download_pdf_async(client, executor, file_name, url, key, pdf_path, api_url)
+            ok = not is_retryable(status_code)
+        except LocalFileError as e:
+            # The request itself went through.
+            ok = True
+            latency = e.latency
+            raise
+        except DOWNLOAD_ERRORS as e:
+            print(f"Request for {file_name} failed: {e!r}")
+        finally:
+            await controller.release(started_at, ok, latency)
+
+        if(not is_retryable(status_code)):
+            break
+
+    return status_code
+
+# Download PDFs with asyncio and hand every result to the function saving it to the log, as the threads do.
+# A fixed number of coroutines take the next link as soon as they are done with their last one, so memory does not grow with the number of links.
+# Args:
+#   links (iterable): (file_name, url) pairs.
+#   key (str): ZenRows API key.
+#   pdf_path (str): Folder to save the PDFs in.
+#   save_result (function): Saves the result of one PDF to the log. Takes the file name, the link and the status code. Runs in the event loop, so it must not block (e.g., DownloadLogWriter.write).
+#   max_in_flight (int): Most requests in flight at once. The controller finds how many ZenRows sustains below that.
+#   api_url (str): URL of the ZenRows API.
+#   file_workers (int): Threads writing the files.
+#   retries (int): Times to try again a PDF which was throttled or failed.
+#   backoff_base (float): Bound on the wait before the first retry.
+#   backoff_cap (float): Bound on the wait before any retry.
+async def download_pdfs_async(links, key: str, pdf_path: str, save_result, max_in_flight: int, api_url: str = ZENROWS_API_URL, file_workers: int = 4, retries: int = 5, backoff_base: float = 1, backoff_cap: float = 60):
+    controller = AsyncConcurrencyController(max_in_flight)
+    client = open_http_client(max_in_flight)
+    links = iter(links)
+
+    async def worker():
+        # Every coroutine runs in the same thread, so taking the next link needs no lock.
+        for file_name, url in links:
+            print("Downloading file: " + file_name)
+            # An error we did not see coming must not end the coroutine, or gather would stop every other one with it and the links left would never be tried.
+            try:
+                status_code = await fetch_pdf_async(client, executor, controller, file_name, url, key, pdf_path, api_url, retries, backoff_base, backoff_cap)
+            except LocalFileError as e:
+                print(e)
+                status_code = None
+            except Exception:
+                traceback.print_exc()
+                status_code = None
+            print("Status code: " + str(status_code) + "\n")
+            save_result(file_name, url, status_code)
+
+    with ThreadPoolExecutor(file_workers) as executor:
+        try:
+            await asyncio.gather(*(worker() for _ in range(max_in_flight)))
+        finally:
+            await client.close()
+
+# Download PDFs with asyncio (see download_pdfs_async), from code which is not itself a coroutine.
+# Args: See download_pdfs_async.
+def run_async_downloads(links, key: str, pdf_path: str, save_result, max_in_flight: int, api_url: str = ZENROWS_API_URL, **kwargs):
+    asyncio.run(download_pdfs_async(links, key, pdf_path, save_result, max_in_flight, api_url, **kwargs))
@@ -0,0 +1,301 @@
+import os
+import csv
+import time
+import queue
+import random
+import threading
+import traceback
+import requests
+from collections import deque
+from requests.adapters import HTTPAdapter
+
+# Where we send our requests. Set ZENROWS_API_URL (e.g., in .env) to point the downloader at a local mock server instead.
+ZENROWS_API_URL = "https://api.zenrows.com/v1/"
+
+# Every thread keeps its own session, so its connection to ZenRows stays open (keep-alive) between PDFs instead of doing a new TCP/TLS handshake for each one.
+thread_data = threading.local()
+
+# Size of the pieces in which a PDF is written to disk, so we never hold the whole PDF in memory.
+download_chunk_size = 64 * 1024
+
+# Declare functions.
+# Run a function over items with a fixed number of threads, feeding them through a bounded queue.
+# The items are only read as fast as the threads take them and results are not kept, so memory stays flat however many items there are (unlike ThreadPool.starmap, which holds every argument and every result).
+# Args:
+#   function (function): Takes the elements of one item as arguments.
+#   items (iterable): The items e.g., (file_name, link) pairs.
+#   nr_workers (int): Number of threads.
+#   queue_size (int): Most items waiting in the queue. Defaults to 2 per thread.
+def run_threads(function, items, nr_workers: int, queue_size: int | None = None):
+    work = queue.Queue(maxsize = queue_size or nr_workers * 2)
+
+    def worker():
+        while((item := work.get()) is not None):
+            # An error on one item must not end the thread, or the queue would fill up with nobody left to take from it.
+            try:
+                function(*item)
+            except Exception:
+                traceback.print_exc()
+
+    threads = [threading.Thread(target = worker, daemon = True) for _ in range(nr_workers)]
+    for thread in threads:
+        thread.start()
+    for item in items:
+        work.put(item)
+    # One stop sign per thread, once every item is queued.
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+
+# Get the session of this thread, creating it the first time.
+# Returns:
+#   Session: The session.
+def get_session() -> requests.Session:
+    if(not hasattr(thread_data, "session")):
+        session = requests.Session()
+        # A thread only ever has one request open at a time, to one host (ZenRows), so it needs a single pooled connection.
+        adapter = HTTPAdapter(pool_connections = 1, pool_maxsize = 1)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        thread_data.session = session
+    return thread_data.session
+
+# Download a PDF.
+# Args:
+#   file_name (str): Name to save the PDF under.
+#   url (str): Link to the PDF.
+#   key (str): ZenRows API key.
+#   pdf_path (str): Folder to save the PDF in.
+#   api_url (str): URL of the ZenRows API.
+#   timeout (tuple): Seconds to wait for the connection and for each read.
+# Returns:
+#   tuple: The status code (in case the request failed) and the seconds until the headers of the response arrived (the latency, which unlike the whole download does not grow with the size of the PDF).
+def download_pdf(file_name: str, url: str, key: str, pdf_path: str, api_url: str = ZENROWS_API_URL, timeout: tuple[float, float] = (10, 180)) -> tuple[int, float]:
+
+    # Stream the PDF into a temporary file next to the final one, and only rename it once the whole PDF arrived.
+    # This way a failed request or a killed job never leaves a partial (or error page) PDF under the name of the PDF.
+    temp_path = pdf_path + file_name + ".part"
+    try:
+        # Request PDF using ZenRows API to avoid being blocked.
+        with get_session().get(
+            api_url,
+            params = {
+                "url": url,
+                "apikey": key
+            },
+            stream = True,
+            timeout = timeout
+        ) as response:
+
+            # Save PDF (only if the request succeeded).
+            if(response.status_code == 200):
+                with open(temp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size = download_chunk_size):
+                        f.write(chunk)
+                os.replace(temp_path, pdf_path + file_name)
+    finally:
+        if(os.path.exists(temp_path)):
+            os.remove(temp_path)
+
+    return response.status_code, response.elapsed.total_seconds()
+
+# Writes the log file from a thread of its own, so the downloads only put their result on a queue instead of waiting for a lock and a write each.
+# Rows are written in batches (every batch_size rows or batch_seconds seconds, whichever comes first), so a killed job (even kill -9) loses at most the last batch, whose PDFs are simply downloaded again next round.
+# The file is also synced to disk (fsync) every sync_seconds seconds and when closing, so it survives the node going down too.
+# The rows are the same as those pandas appended before: file name, link and status code, without a header.
+class DownloadLogWriter:
+    # Args:
+    #   log_file (str): File path to the log file.
+    #   batch_size (int): Write after this many rows...
+    #   batch_seconds (float): ...or after this many seconds, whichever comes first.
+    #   sync_seconds (float): Seconds between syncing the file to disk.
+    def __init__(self, log_file: str, batch_size: int = 1000, batch_seconds: float = 5, sync_seconds: float = 60):
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.sync_seconds = sync_seconds
+        self.queue = queue.SimpleQueue()
+        # The error which stopped the thread, if any. Raised from write and close, since otherwise the rows would be silently lost.
+        self.error = None
+        self.thread = threading.Thread(target = self.run, daemon = True)
+        self.thread.start()
+
+    # Log the result of one PDF. Safe to call from any thread.
+    # Args:
+    #   file_name (str): Name of the PDF.
+    #   url (str): Link to the PDF.
+    #   status_code (int): The status code, or None if the request never got a response.
+    def write(self, file_name: str, url: str, status_code: int | None):
+        self.raise_error()
+        self.queue.put((file_name, url, status_code))
+
+    # Raise the error which stopped the thread, if any.
+    def raise_error(self):
+        if(self.error is not None):
+            raise self.error
+
+    # Write batches of rows until the writer is closed (runs in the thread of the writer).
+    def run(self):
+        try:
+            self.write_batches()
+        except Exception as e:
+            self.error = e
+
+    # Write batches of rows until the writer is closed.
+    def write_batches(self):
+        with open(self.log_file, "a", newline = "") as f:
+            writer = csv.writer(f, lineterminator = "\n")
+            last_sync = time.monotonic()
+            closed = False
+
+            while(not closed):
+                rows = []
+                deadline = time.monotonic() + self.batch_seconds
+                while(len(rows) < self.batch_size):
+                    try:
+                        row = self.queue.get(timeout = max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    # None is the sign that the writer is closed.
+                    if(row is None):
+                        closed = True
+                        break
+                    rows.append(row)
+
+                if(len(rows) > 0):
+                    writer.writerows(rows)
+                    f.flush()
+                if(closed or time.monotonic() - last_sync >= self.sync_seconds):
+                    os.fsync(f.fileno())
+                    last_sync = time.monotonic()
+
+    # Write every row still queued, sync the file to disk and stop the thread. Raises an error if the thread stopped because of one.
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.raise_error()
+
+# Check whether a request is worth trying again: it was throttled (429), ZenRows or the site had an error (5xx), or it never got a response (None).
+# These are also the signs that we are sending too many requests at once (see ConcurrencyController).
+# Args:
+#   status_code (int): The status code, or None if the request raised an error.
+# Returns:
+#   bool: Whether to try again.
+def is_retryable(status_code: int | None) -> bool:
+    return status_code is None or status_code == 429 or status_code >= 500
+
+# Seconds to wait before trying a request again, growing exponentially with the number of tries.
+# The wait is drawn uniformly between 0 and the exponential bound ("full jitter"), so threads throttled at the same time do not all come back at the same time.
+# Args:
+#   attempt (int): The number of the retry, starting at 1.
+#   base (float): Bound on the wait of the first retry.
+#   cap (float): Bound on the wait of any retry.
+# Returns:
+#   float: Seconds to wait.
+def backoff_delay(attempt: int, base: float = 1, cap: float = 60) -> float:
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+# Limits how many requests are in flight at once, finding the highest rate ZenRows sustains by itself (additive increase, multiplicative decrease, as in TCP).
+# Every successful request raises the limit by 1/limit, so by about one per round of requests. A throttled or failed request, or latency going above latency_factor times the best recent latency, cuts the limit by decrease_factor.
+# The best latency is only taken over the last latency_window requests, so after a lasting rise in latency (e.g., a slower site) it catches up and the limit can grow again.
+# The limit is cut at most once per round: requests which started before the last cut do not cut it again, since they were sent at the old rate.
+class ConcurrencyController:
+    # Args:
+    #   max_limit (int): Most requests in flight at once (the number of threads).
+    #   min_limit (int): Fewest requests in flight at once.
+    #   initial_limit (int): Requests in flight at the start. Defaults to a quarter of max_limit.
+    #   latency_factor (float): How many times the best latency the average latency may reach before we slow down.
+    #   decrease_factor (float): What the limit is multiplied with when we slow down.
+    #   latency_weight (float): Weight of the newest request in the moving average of the latency.
+    #   latency_window (int): Number of successful requests the best latency is taken over.
+    def __init__(self, max_limit: int, min_limit: int = 1, initial_limit: int | None = None, latency_factor: float = 2, decrease_factor: float = 0.5, latency_weight: float = 0.1, latency_window: int = 100):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(initial_limit if(initial_limit is not None) else max(self.min_limit, max_limit // 4))
+        self.latency_factor = latency_factor
+        self.decrease_factor = decrease_factor
+        self.latency_weight = latency_weight
+        self.in_flight = 0
+        # Moving average of the latency of successful requests, and its last latency_window values.
+        self.latency = None
+        self.recent_latencies = deque(maxlen = latency_window)
+        self.decreased_at = float("-inf")
+        self.condition = threading.Condition()
+
+    # Wait until another request may be sent.
+    # Returns:
+    #   float: When the request started (pass it to release).
+    def acquire(self) -> float:
+        with self.condition:
+            self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return time.monotonic()
+
+    # Report how a request went, and let the next one through.
+    # Args:
+    #   started_at (float): The return value of acquire.
+    #   ok (bool): Whether the request went through without a sign of overload (see is_retryable).
+    #   latency (float): Seconds until the headers of the response arrived. Defaults to the seconds since started_at.
+    def release(self, started_at: float, ok: bool, latency: float | None = None):
+        with self.condition:
+            self.in_flight -= 1
+            self.observe(started_at, ok, latency)
+            self.condition.notify_all()
+
+    # Raise or cut the limit after a request (see the top of the class). The caller holds the condition.
+    # Args:
+    #   started_at (float): When the request started.
+    #   ok (bool): Whether the request went through without a sign of overload.
+    #   latency (float): Seconds until the headers of the response arrived. Defaults to the seconds since started_at.
+    def observe(self, started_at: float, ok: bool, latency: float | None = None):
+        now = time.monotonic()
+        overloaded = not ok
+        if(ok):
+            if(latency is None):
+                latency = now - started_at
+            self.latency = latency if(self.latency is None) else (1 - self.latency_weight) * self.latency + self.latency_weight * latency
+            self.recent_latencies.append(self.latency)
+            overloaded = self.latency > self.latency_factor * min(self.recent_latencies)
+
+        if(overloaded and started_at >= self.decreased_at):
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.decreased_at = now
+            print(f"Slowing down to {int(self.limit)} requests at once.")
+        elif(ok and not overloaded):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+# Download a PDF, trying again with a jittered exponential backoff if it was throttled or failed (see is_retryable).
+# Args:
+#   file_name (str): Name to save the PDF under.
+#   url (str): Link to the PDF.
+#   key (str): ZenRows API key.
+#   pdf_path (str): Folder to save the PDF in.
+#   controller (ConcurrencyController): Limits the requests in flight.
+#   api_url (str): URL of the ZenRows API.
+#   retries (int): Times to try again.
+#   backoff_base (float): Bound on the wait before the first retry (see backoff_delay).
+#   backoff_cap (float): Bound on the wait before any retry.
+# Returns:
+#   int: The status code of the last try, or None if it never got a response.
+def fetch_pdf(file_name: str, url: str, key: str, pdf_path: str, controller: ConcurrencyController, api_url: str = ZENROWS_API_URL, retries: int = 5, backoff_base: float = 1, backoff_cap: float = 60) -> int | None:
+    for attempt in range(retries + 1):
+        if(attempt > 0):
+            # Wait without holding a slot, so other requests can go through meanwhile.
+            time.sleep(backoff_delay(attempt, backoff_base, backoff_cap))
+            print(f"Trying {file_name} again (retry {attempt} of {retries}).")
+
+        status_code = None
+        latency = None
+        started_at = controller.acquire()
+        try:
+            status_code, latency = download_pdf(file_name, url, key, pdf_path, api_url)
+        except requests.RequestException as e:
+            print(f"Request for {file_name} failed: {e}")
+        finally:
+            controller.release(started_at, not is_retryable(status_code), latency)
+
+        if(not is_retryable(status_code)):
+            break
+
+    return status_code
@@ -0,0 +1,162 @@
+import os
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+# State of the downloads, kept in a SQLite database (download_state.sqlite) instead of rewriting pdf_download_links.csv every round.
+# One row per link with whether its PDF was downloaded (successfully_scraped), the status code of the last try and when that was (when the log file of that round was last written).
+# Between rounds, create_log_file.py applies the log of the last round to the rows it names, so a round costs time in proportion to the PDFs it tried, not to all the links.
+# The links left to download are kept in a partial index, so reading them costs time in proportion to how many are left.
+
+# The table is stored by its key (WITHOUT ROWID), so a link is found in one B-tree instead of an index and then the table.
+CREATE_LINKS_TABLE = """
+CREATE TABLE IF NOT EXISTS links (
+    file_name TEXT NOT NULL,
+    link TEXT NOT NULL,
+    successfully_scraped INTEGER NOT NULL,
+    status_code INTEGER,
+    time_stamp TEXT,
+    PRIMARY KEY (file_name, link)
+) WITHOUT ROWID
+"""
+
+# Only the links left to download, in the order we read them.
+CREATE_LINKS_LEFT_INDEX = "CREATE INDEX IF NOT EXISTS links_left ON links (file_name, link) WHERE successfully_scraped = 0"
+
+# Facts about the state itself, e.g., whether all the links were imported (seeded).
+CREATE_META_TABLE = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+
+# Add a link we have not seen yet, and leave the ones we have alone.
+INSERT_LINK = """
+INSERT INTO links (file_name, link, successfully_scraped)
+VALUES (?, ?, ?)
+ON CONFLICT (file_name, link) DO NOTHING
+"""
+
+# Record the result of one try. A link stays downloaded once it was, so applying the same log twice changes nothing.
+UPSERT_RESULT = """
+INSERT INTO links (file_name, link, successfully_scraped, status_code, time_stamp)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (file_name, link) DO UPDATE SET
+    successfully_scraped = MAX(successfully_scraped, excluded.successfully_scraped),
+    status_code = excluded.status_code,
+    time_stamp = excluded.time_stamp
+"""
+
+class DownloadStateStore:
+    # Open (or create) the download state.
+    # Args:
+    #   state_db (str): File path to the database.
+    def __init__(self, state_db: str):
+        self.connection = sqlite3.connect(state_db)
+        # WAL lets us read the state (e.g., from another terminal) while it is being written to.
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(CREATE_LINKS_TABLE)
+        self.connection.execute(CREATE_LINKS_LEFT_INDEX)
+        self.connection.execute(CREATE_META_TABLE)
+        self.connection.commit()
+
+    # Check whether every link was imported (see mark_seeded). Links may have been imported without it if the import stopped partway through.
+    # Returns:
+    #   bool: Whether the state was seeded.
+    def is_seeded(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is not None
+
+    # Record that every link was imported. Until then, importing the links again is safe: the links already in the state are left as they are.
+    def mark_seeded(self):
+        self.connection.execute("INSERT INTO meta (key, value) VALUES ('seeded', ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value", (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        self.connection.commit()
+
+    # Import links from a CSV with the columns file_name, link and successfully_scraped (e.g., criminal_pdf_links.csv.gz or the pdf_download_links.csv of an earlier round).
+    # Links which are already in the state are left as they are.
+    # Args:
+    #   links_file (str): File path to the CSV.
+    #   compression (str): Compression of the CSV e.g., "gzip". Inferred from the file name by default.
+    #   chunk_size (int): Rows read (and committed) at a time.
+    # Returns:
+    #   int: Number of rows read.
+    def import_links(self, links_file: str, compression: str = "infer", chunk_size: int = 100000) -> int:
+        nr_rows = 0
+        for links_df in pd.read_csv(
+            links_file,
+            compression = compression,
+            usecols = ["file_name", "link", "successfully_scraped"],
+            dtype = {"file_name": str, "link": str, "successfully_scraped": bool},
+            chunksize = chunk_size
+        ):
+            self.connection.executemany(INSERT_LINK, zip(links_df["file_name"], links_df["link"], links_df["successfully_scraped"].astype(int)))
+            self.connection.commit()
+            nr_rows += len(links_df)
+        return nr_rows
+
+    # Apply the log of a round of downloads (file_name, link and status_code, see download_PDFs.py) to the state.
+    # A link with status code 200 counts as downloaded. A link of the log which is not in the state yet is added.
+    # Args:
+    #   log_file (str): File path to the log file.
+    #   chunk_size (int): Rows read (and committed) at a time.
+    # Returns:
+    #   int: Number of rows in the log.
+    def import_log(self, log_file: str, chunk_size: int = 100000) -> int:
+        nr_rows = 0
+        time_stamp = datetime.fromtimestamp(os.path.getmtime(log_file)).strftime("%Y-%m-%d %H:%M:%S")
+        for log_df in pd.read_csv(
+            log_file,
+            dtype = {"file_name": str, "link": str, "status_code": float},
+            chunksize = chunk_size
+        ):
+            # In the order of the key, the rows we update sit next to each other instead of all over the database.
+            log_df = log_df.sort_values(["file_name", "link"])
+            status_codes = [None if(pd.isna(status_code)) else int(status_code) for status_code in log_df["status_code"]]
+            self.connection.executemany(
+                UPSERT_RESULT,
+                ((file_name, link, int(status_code == 200), status_code, time_stamp) for file_name, link, status_code in zip(log_df["file_name"], log_df["link"], status_codes))
+            )
+            self.connection.commit()
+            nr_rows += len(log_df)
+        return nr_rows
+
+    # Read the links left to download, a page at a time, so memory does not grow with the number of links.
+    # Each page starts after the last link of the page before (instead of holding one query open), so the state can be written to while we read it.
+    # Args:
+    #   page_size (int): Links read at a time.
+    # Returns:
+    #   generator: (file_name, link) pairs, ordered by file name.
+    def links_left(self, page_size: int = 100000):
+        last = ("", "")
+        while(True):
+            page = self.connection.execute(
+                "SELECT file_name, link FROM links WHERE successfully_scraped = 0 AND (file_name, link) > (?, ?) ORDER BY file_name, link LIMIT ?",
+                last + (page_size,)
+            ).fetchall()
+            yield from page
+            if(len(page) < page_size):
+                break
+            last = page[-1]
+
+    # Count the links left to download.
+    # Returns:
+    #   int: The number of links.
+    def count_left(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM links WHERE successfully_scraped = 0").fetchone()[0]
+
+    # Count the links by the status code of their last try (reads every link).
+    # Returns:
+    #   DataFrame: One row per status code (empty if never tried) and whether it was downloaded, with the number of links.
+    def summary(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT successfully_scraped, status_code, COUNT(*) AS links FROM links GROUP BY successfully_scraped, status_code",
+            self.connection
+        )
+
+    # Close the database.
+    def close(self):
+        self.connection.close()
+
+# Open the download state.
+# Args:
+#   csv_path (str): Folder with the download links and log files.
+# Returns:
+#   DownloadStateStore: The download state.
+def open_download_state(csv_path: str) -> DownloadStateStore:
+    return DownloadStateStore(csv_path + "download_state.sqlite")
@@ -0,0 +1,58 @@
+import os
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import download_pdf_async_functions
+from download_pdf_async_functions import run_async_downloads, open_http_client, fetch_pdf_async, AsyncConcurrencyController, LocalFileError
+
+def download(stub_server, tmp_path, links, max_in_flight = 1) -> dict:
+    results = {}
+    run_async_downloads(
+        links, "key", str(tmp_path) + "/", lambda file_name, url, status_code: results.update({file_name: status_code}), max_in_flight,
+        stub_server.api_url, retries = 0
+    )
+    return results
+
+def test_downloads_pdfs(stub_server, tmp_path):
+    results = download(stub_server, tmp_path, [("a.pdf", "ok_a"), ("b.pdf", "ok_b")], max_in_flight = 2)
+
+    assert results == {"a.pdf": 200, "b.pdf": 200}
+    for file_name in results:
+        with open(tmp_path / file_name, "rb") as f:
+            assert f.read() == stub_server.pdf_body
+
+def test_malformed_content_length_fails_one_pdf(stub_server, tmp_path):
+    stub_server.scripts["malformed"] = [(200, {"Content-Length": "many"}, b"")]
+    results = download(stub_server, tmp_path, [("a.pdf", "malformed"), ("b.pdf", "ok_b"), ("c.pdf", "ok_c")])
+
+    assert results == {"a.pdf": None, "b.pdf": 200, "c.pdf": 200}
+    assert sorted(os.listdir(tmp_path)) == ["b.pdf", "c.pdf"]
+
+def test_unexpected_error_fails_one_pdf(stub_server, tmp_path, monkeypatch):
+    download_pdf = download_pdf_async_functions.download_pdf_async
+
+    async def broken_download_pdf(client, executor, file_name, *args):
+        if(file_name == "a.pdf"):
+            raise RuntimeError("A bug in the downloader.")
+        return await download_pdf(client, executor, file_name, *args)
+
+    monkeypatch.setattr(download_pdf_async_functions, "download_pdf_async", broken_download_pdf)
+    results = download(stub_server, tmp_path, [("a.pdf", "ok_a"), ("b.pdf", "ok_b")])
+
+    assert results == {"a.pdf": None, "b.pdf": 200}
+
+def test_disk_error_is_neither_overload_nor_tried_again(stub_server, tmp_path):
+    # The folder to save the PDF in does not exist, so the PDF cannot be saved.
+    async def fetch() -> float:
+        controller = AsyncConcurrencyController(8, initial_limit = 4, latency_factor = 1000)
+        client = open_http_client(8)
+        try:
+            with ThreadPoolExecutor(1) as executor, pytest.raises(LocalFileError):
+                await fetch_pdf_async(client, executor, controller, "a.pdf", "ok_a", "key", str(tmp_path / "missing") + "/", stub_server.api_url, retries = 5, backoff_base = 0.01)
+        finally:
+            await client.close()
+        return controller.limit
+
+    assert asyncio.run(fetch()) == 4 + 1 / 4
+    assert stub_server.requests == ["ok_a"]
+    assert os.listdir(tmp_path) == []
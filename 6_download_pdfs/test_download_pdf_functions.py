@@ -0,0 +1,95 @@
+import os
+import csv
+import random
+import time
+import pytest
+from download_pdf_functions import DownloadLogWriter, ConcurrencyController, backoff_delay, fetch_pdf
+
+def test_log_writer_writes_every_row(tmp_path):
+    log_writer = DownloadLogWriter(str(tmp_path / "log.csv"), batch_size = 2)
+    rows = [("a.pdf", "link_a", 200), ("b.pdf", "link_b", 429), ("c.pdf", "link_c", None)]
+    for row in rows:
+        log_writer.write(*row)
+    log_writer.close()
+
+    with open(tmp_path / "log.csv") as f:
+        assert list(csv.reader(f)) == [["a.pdf", "link_a", "200"], ["b.pdf", "link_b", "429"], ["c.pdf", "link_c", ""]]
+
+def test_log_writer_raises_the_error_of_its_thread(tmp_path):
+    # The log file cannot be opened, so the thread stops right away.
+    log_writer = DownloadLogWriter(str(tmp_path))
+    log_writer.thread.join(timeout = 10)
+
+    with pytest.raises(IsADirectoryError):
+        log_writer.write("a.pdf", "link_a", 200)
+    with pytest.raises(IsADirectoryError):
+        log_writer.close()
+
+def test_backoff_delay_doubles_up_to_the_cap(monkeypatch):
+    # The longest wait the jitter can draw.
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    assert [backoff_delay(attempt, base = 1, cap = 20) for attempt in range(1, 7)] == [1, 2, 4, 8, 16, 20]
+
+    monkeypatch.undo()
+    assert all(0 <= backoff_delay(3, base = 1, cap = 20) <= 4 for _ in range(100))
+
+# A controller which records its limit after every request. The latency check is left out, since the latency of a local server jumps around.
+def recording_controller(initial_limit: int) -> tuple[ConcurrencyController, list[float]]:
+    controller = ConcurrencyController(8, initial_limit = initial_limit, latency_factor = 1000)
+    limits = []
+    observe = controller.observe
+
+    def recording_observe(started_at, ok, latency = None):
+        observe(started_at, ok, latency)
+        limits.append(controller.limit)
+
+    controller.observe = recording_observe
+    return controller, limits
+
+def test_throttled_pdf_is_tried_again(stub_server, tmp_path):
+    stub_server.scripts["throttled"] = [(429, {}, b"Too many requests"), (503, {}, b"Unavailable"), (200, {}, stub_server.pdf_body)]
+    controller, limits = recording_controller(initial_limit = 4)
+
+    status_code = fetch_pdf("a.pdf", "throttled", "key", str(tmp_path) + "/", controller, stub_server.api_url, retries = 5, backoff_base = 0.01)
+
+    assert status_code == 200
+    assert stub_server.requests == ["throttled"] * 3
+    with open(tmp_path / "a.pdf", "rb") as f:
+        assert f.read() == stub_server.pdf_body
+    # Each throttled try (sent after the last cut) halves the limit, and then it goes back up.
+    assert limits == [2, 1, 2]
+
+    for i in range(4):
+        fetch_pdf(f"{i}.pdf", f"ok_{i}", "key", str(tmp_path) + "/", controller, stub_server.api_url, backoff_base = 0.01)
+    # Every request which goes through raises it by 1/limit.
+    expected = [2]
+    for _ in range(4):
+        expected.append(expected[-1] + 1 / expected[-1])
+    assert limits[3:] == pytest.approx(expected[1:])
+
+def test_pdf_failing_every_try_gives_up(stub_server, tmp_path):
+    stub_server.scripts["down"] = [(503, {}, b"Unavailable")]
+    controller, limits = recording_controller(initial_limit = 8)
+
+    status_code = fetch_pdf("a.pdf", "down", "key", str(tmp_path) + "/", controller, stub_server.api_url, retries = 2, backoff_base = 0.01)
+
+    assert status_code == 503
+    assert stub_server.requests == ["down"] * 3
+    assert os.listdir(tmp_path) == []
+    assert limits == [4, 2, 1]
+
+def test_limit_recovers_after_latency_rises_for_good():
+    controller = ConcurrencyController(16, initial_limit = 8)
+    for latency in [1.0] * 200:
+        controller.observe(time.monotonic(), True, latency)
+    assert controller.limit == 16
+
+    # The site becomes slower for good. The limit is cut while the moving average climbs above the old baseline...
+    limits = []
+    for latency in [2.5] * 400:
+        controller.observe(time.monotonic(), True, latency)
+        limits.append(controller.limit)
+    assert min(limits) < 16
+    # ...and grows back once the old latencies have left the window.
+    assert limits[-1] == 16
+    assert limits.index(min(limits)) < 150
@@ -0,0 +1,87 @@
+import pandas as pd
+from download_state_functions import open_download_state
+
+def write_links(path, file_names: list[str], scraped: list[bool] | None = None):
+    pd.DataFrame({
+        "file_name": file_names,
+        "link": ["https://example.com/" + file_name for file_name in file_names],
+        "successfully_scraped": scraped or [False] * len(file_names)
+    }).to_csv(path, index = False)
+
+def write_log(path, rows: list[tuple[str, int | None]]):
+    pd.DataFrame({
+        "file_name": [file_name for file_name, _ in rows],
+        "link": ["https://example.com/" + file_name for file_name, _ in rows],
+        "status_code": [status_code for _, status_code in rows]
+    }).to_csv(path, index = False)
+
+def read_state(state_store) -> dict:
+    rows = state_store.connection.execute("SELECT file_name, successfully_scraped, status_code FROM links")
+    return {file_name: (successfully_scraped, status_code) for file_name, successfully_scraped, status_code in rows}
+
+def test_import_links(tmp_path):
+    write_links(tmp_path / "criminal_pdf_links.csv.gz", ["a.pdf", "b.pdf", "c.pdf"], [False, True, False])
+    state_store = open_download_state(str(tmp_path) + "/")
+
+    assert state_store.import_links(str(tmp_path / "criminal_pdf_links.csv.gz"), compression = "gzip", chunk_size = 2) == 3
+    assert read_state(state_store) == {"a.pdf": (0, None), "b.pdf": (1, None), "c.pdf": (0, None)}
+    assert state_store.count_left() == 2
+    state_store.close()
+
+def test_import_stopped_partway_is_not_seeded(tmp_path):
+    write_links(tmp_path / "criminal_pdf_links.csv", ["a.pdf", "b.pdf"])
+    write_links(tmp_path / "lt_pdf_links.csv", ["c.pdf"])
+    state_store = open_download_state(str(tmp_path) + "/")
+
+    # The first run only got through the criminal links.
+    state_store.import_links(str(tmp_path / "criminal_pdf_links.csv"))
+    write_log(tmp_path / "log.csv", [("a.pdf", 200)])
+    state_store.import_log(str(tmp_path / "log.csv"))
+    assert not state_store.is_seeded()
+
+    # The next one imports everything again, leaving what it already has alone.
+    state_store.import_links(str(tmp_path / "criminal_pdf_links.csv"))
+    state_store.import_links(str(tmp_path / "lt_pdf_links.csv"))
+    state_store.mark_seeded()
+    state_store.close()
+
+    state_store = open_download_state(str(tmp_path) + "/")
+    assert state_store.is_seeded()
+    assert read_state(state_store) == {"a.pdf": (1, 200), "b.pdf": (0, None), "c.pdf": (0, None)}
+    state_store.close()
+
+def test_applying_the_same_log_twice(tmp_path):
+    write_links(tmp_path / "links.csv", ["a.pdf", "b.pdf", "c.pdf"])
+    write_log(tmp_path / "log_1.csv", [("a.pdf", 200), ("b.pdf", 429), ("c.pdf", None)])
+    write_log(tmp_path / "log_2.csv", [("a.pdf", 503), ("b.pdf", 200)])
+    state_store = open_download_state(str(tmp_path) + "/")
+    state_store.import_links(str(tmp_path / "links.csv"))
+
+    for _ in range(2):
+        assert state_store.import_log(str(tmp_path / "log_1.csv")) == 3
+        assert read_state(state_store) == {"a.pdf": (1, 200), "b.pdf": (0, 429), "c.pdf": (0, None)}
+
+    # A later failed try of a downloaded PDF does not undo it.
+    for _ in range(2):
+        state_store.import_log(str(tmp_path / "log_2.csv"))
+        assert read_state(state_store) == {"a.pdf": (1, 503), "b.pdf": (1, 200), "c.pdf": (0, None)}
+    assert list(state_store.links_left()) == [("c.pdf", "https://example.com/c.pdf")]
+    state_store.close()
+
+def test_links_left_in_pages(tmp_path):
+    file_names = [f"{i:03d}.pdf" for i in range(25)]
+    write_links(tmp_path / "links.csv", file_names, [i % 3 == 0 for i in range(25)])
+    state_store = open_download_state(str(tmp_path) + "/")
+    state_store.import_links(str(tmp_path / "links.csv"))
+    left = [file_name for i, file_name in enumerate(file_names) if(i % 3 != 0)]
+
+    for page_size in [1, 4, len(left), 100]:
+        assert [file_name for file_name, _ in state_store.links_left(page_size = page_size)] == left
+
+    # Links downloaded while we page through them are not read again, nor are the ones already read.
+    links = state_store.links_left(page_size = 4)
+    read = [next(links)[0] for _ in range(4)]
+    write_log(tmp_path / "log.csv", [(file_name, 200) for file_name in left[:8]])
+    state_store.import_log(str(tmp_path / "log.csv"))
+    assert read + [file_name for file_name, _ in links] == left[:4] + left[8:]
+    state_store.close()
@@ -0,0 +1,110 @@
+import re
+import os
+import sys
+import random
+from collections import Counter
+from parse_pdf_text_functions import extract_page_texts
+from parse_pdf_column_functions import COLUMN_SPECS
+
+# Checks that the pdfium engine gives the same text as the pdfplumber engine on a sample of PDFs.
+# Our parsers cut every line at hard-coded column offsets, so besides comparing the lines we also report which offsets would have given a different field.
+
+# Collect every column offset the parsers slice lines at (e.g., line[60:98] gives 60 and 98).
+# Args:
+#   file_names (list): The parser source files.
+# Returns:
+#   list: The sorted offsets.
+def collect_column_offsets(file_names: list[str]) -> list[int]:
+    offsets = set()
+    parser_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name in file_names:
+        with open(os.path.join(parser_dir, file_name)) as source_file:
+            for start, end in re.findall(r"\[(\d*):(\d*)\]\.strip\(\)", source_file.read()):
+                offsets.update(int(x) for x in (start, end) if x != "")
+    return sorted(offsets)
+
+# Compare two lines field by field at the given offsets.
+# Args:
+#   line_a (str): Line from the first engine.
+#   line_b (str): Line from the second engine.
+#   offsets (list): Sorted column offsets.
+# Returns:
+#   list: The offsets starting a field which differs between the two lines.
+def compare_columns(line_a: str, line_b: str, offsets: list[int]) -> list[int]:
+    bounds = [0] + [x for x in offsets if x > 0] + [max(len(line_a), len(line_b), *offsets) + 1]
+    return [start for start, end in zip(bounds, bounds[1:]) if line_a[start:end].strip() != line_b[start:end].strip()]
+
+# Compare the text of a PDF from two engines line by line.
+# Args:
+#   pages_a (list): The text of each page from the first engine.
+#   pages_b (list): The text of each page from the second engine.
+#   offsets (list): Sorted column offsets (see collect_column_offsets).
+# Returns:
+#   list: (line index, offsets starting a field which differs, line from the first engine, line from the second engine) of each line which differs.
+def compare_pages(pages_a: list[str], pages_b: list[str], offsets: list[int]) -> list[tuple[int, list[int], str, str]]:
+    lines_a = "\n".join(pages_a).split("\n")
+    lines_b = "\n".join(pages_b).split("\n")
+    return [
+        (i, compare_columns(line_a, line_b, offsets), line_a.rstrip(), line_b.rstrip())
+        for i, (line_a, line_b) in enumerate(zip(lines_a, lines_b)) if line_a.rstrip() != line_b.rstrip()
+    ]
+
+offsets_cs = collect_column_offsets(["parse_court_summary_CP_functions.py", "parse_court_summary_MJ_functions.py"])
+# The docket sheet tables are cut through their column specs (see parse_pdf_column_functions.py), the rest of the docket sheet at offsets in the parsers.
+offsets_ds = sorted(
+    set(collect_column_offsets(["parse_docket_sheet_CP_functions.py", "parse_docket_sheet_MJ_functions.py"]))
+    | {start for columns in COLUMN_SPECS.values() for _, start in columns}
+)
+
+if __name__ == "__main__":
+    # Argument 1 is the folder with the PDFs e.g., /media/joe/T7 Shield/pdfs/Montgomery/
+    # Argument 2 (optional) is the number of PDFs to sample (default 100).
+    # Argument 3 (optional) is the seed of the sample (default 1).
+    arguments = sys.argv
+    path_to_pdfs = arguments[1]
+    sample_size = int(arguments[2]) if(len(arguments) > 2) else 100
+    seed = int(arguments[3]) if(len(arguments) > 3) else 1
+
+    pdfs = sorted(x for x in os.listdir(path_to_pdfs) if x.endswith(".pdf"))
+    random.Random(seed).shuffle(pdfs)
+    pdfs = pdfs[:sample_size]
+
+    identical_files = 0
+    line_mismatches = 0
+    offset_mismatches = Counter()
+    failed_files = []
+
+    for file_name in pdfs:
+        # Court summaries are extracted without blank characters, docket sheets with them.
+        keep_blank_chars = not file_name.startswith("cs_")
+        offsets = offsets_ds if(keep_blank_chars) else offsets_cs
+
+        try:
+            pages_plumber = extract_page_texts(path_to_pdfs + file_name, keep_blank_chars = keep_blank_chars, engine = "pdfplumber")
+            pages_pdfium = extract_page_texts(path_to_pdfs + file_name, keep_blank_chars = keep_blank_chars, engine = "pdfium")
+        except Exception as e:
+            failed_files.append(file_name)
+            print(f"{file_name}: could not extract text. The error is {e}")
+            continue
+
+        if(pages_plumber == pages_pdfium):
+            identical_files += 1
+            continue
+
+        lines_plumber = "\n".join(pages_plumber).split("\n")
+        lines_pdfium = "\n".join(pages_pdfium).split("\n")
+
+        if(len(lines_plumber) != len(lines_pdfium)):
+            print(f"{file_name}: {len(lines_plumber)} lines with pdfplumber but {len(lines_pdfium)} lines with pdfium.")
+
+        for i, bad_offsets, line_plumber, line_pdfium in compare_pages(pages_plumber, pages_pdfium, offsets):
+            line_mismatches += 1
+            offset_mismatches.update(bad_offsets)
+            print(f"{file_name} line {i}: fields starting at {bad_offsets} differ")
+            print(f"    pdfplumber: {line_plumber}")
+            print(f"    pdfium:     {line_pdfium}")
+
+    print(f"\n{identical_files} of {len(pdfs) - len(failed_files)} PDFs have identical text ({len(failed_files)} could not be read).")
+    print(f"{line_mismatches} lines differ.")
+    for offset, count in sorted(offset_mismatches.items()):
+        print(f"    field starting at column {offset}: {count} mismatches")
@@ -48,7 +48,7 @@ def extract_poi(lines_arg):
 
     # If there is no DOB, then this person has no PII.
     no_poi = True
-    for i, x in enumerate(lines):
+    for i, x in enumerate(lines_arg):
         if("DOB:" in x):
             no_poi = False
             break
@@ -56,19 +56,19 @@ def extract_poi(lines_arg):
     if(no_poi):
         poi_start_index = 0
     else:
-        poi_start_index = [i for i, x in enumerate(lines) if "DOB:" in x][0]
+        poi_start_index = [i for i, x in enumerate(lines_arg) if "DOB:" in x][0]
 
     # If there are no closed, inactive, active, or adjudicated cases, this individual has no case history.
     no_cases = True
-    for i, x in enumerate(lines):
+    for i, x in enumerate(lines_arg):
         if("closed" in x.lower() or "inactive" in x.lower() or "active" in x.lower() or "adjudicated" in x.lower() or "adjudicated/closed" in x.lower() or "physical case file destroyed" in x.lower()):
             no_cases = False
             break
 
     if(no_cases):
-        poi_end_index = len(lines) - 1
+        poi_end_index = len(lines_arg) - 1
     else:
-        poi_end_index = [i for i,x in enumerate(lines) if "adjudicated/closed" in x.lower() or "physical case file destroyed" in x.lower() or "closed" in x.lower() or "inactive" in x.lower() or "active" in x.lower() or "adjudicated" in x.lower()][0]
+        poi_end_index = [i for i,x in enumerate(lines_arg) if "adjudicated/closed" in x.lower() or "physical case file destroyed" in x.lower() or "closed" in x.lower() or "inactive" in x.lower() or "active" in x.lower() or "adjudicated" in x.lower()][0]
 
     poi = lines_arg[poi_start_index:poi_end_index]
 
@@ -52,19 +52,19 @@ def extract_poi(lines_arg):
     # Beginning part of every court summary in court of common pleas has a block of text with person information.
     # Organizations do not have date of birth so we need another way to identify the beginning of the POI information.
     try:
-        poi_start_index = [i for i, x in enumerate(lines) if "DOB:" in x][0]
+        poi_start_index = [i for i, x in enumerate(lines_arg) if "DOB:" in x][0]
     except Exception as e:
         # Search through the lines until we come to the first line which does not contain the key phrases and is not an empty line.
-        for i, line in enumerate(lines):
+        for i, line in enumerate(lines_arg):
             if(re.search("magisterial\s+district\s+court", line.lower()) is None and re.search("public\s+court\s+summary", line.lower()) is None and line.strip() != ""):
                 poi_start_index = i
                 break
 
     # Set the poi_end_index to be the last line of the page if you cannot find the court. Some PDFs have no data and this should capture that.
     try:
-        poi_end_index = [i for i,x in enumerate(lines) if "court:" in x.lower()][0]
+        poi_end_index = [i for i,x in enumerate(lines_arg) if "court:" in x.lower()][0]
     except Exception as e:
-        poi_end_index = len(lines) - 1
+        poi_end_index = len(lines_arg) - 1
 
     poi = lines[poi_start_index:poi_end_index]
 
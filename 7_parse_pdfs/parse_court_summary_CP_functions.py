@@ -0,0 +1,305 @@
+import re
+from parse_pdf_text_functions import extract_page_texts, split_document_lines
+from parse_pdf_failure_functions import SectionParseError
+
+# Set of all counties in PA.
+counties = {
+            "adams", "allegheny", "armstrong", "beaver", "bedford", "berks",
+            "blair", "bradford", "bucks", "butler", "cambria", "cameron",
+            "carbon", "centre", "chester", "clarion", "clearfield", "clinton",
+            "columbia", "crawford", "cumberland", "dauphin", "delaware", "elk",
+            "erie", "fayette", "forest", "franklin", "fulton", "greene",
+            "huntingdon", "indiana", "jefferson", "juniata", "lackawanna",
+            "lancaster", "lawrence", "lebanon", "lehigh", "luzerne", "lycoming",
+            "mckean", "mercer", "mifflin", "monroe", "montgomery", "montour",
+            "northampton", "northumberland", "perry", "philadelphia", "pike",
+            "potter", "schuylkill", "snyder", "somerset", "sullivan",
+            "susquehanna", "tioga", "union", "venango", "warren", "washington",
+            "wayne", "westmoreland", "wyoming", "york"
+            }
+
+# Case statuses which start a set of closed cases, and a set of inactive, active, or adjudicated cases.
+closed_case_statuses = {"closed", "adjudicated/closed", "physical case file destroyed"}
+open_case_statuses = {"inactive", "active", "adjudicated"}
+case_statuses = closed_case_statuses | open_case_statuses
+
+# Patterns compiled once.
+# The first line mentioning a case status (e.g., "inactive", "adjudicated/closed") ends the personal information.
+CASE_STATUS_PATTERN = re.compile("closed|active|adjudicated|physical case file destroyed")
+# 1st line of a case: Docket Number, Proc. Status, DC Number, and OTN Number.
+CASE_HEADER_PATTERN = re.compile("(.*?)proc status:(.*?)dc no:(.*?)otn:(.*)")
+SENTENCE_DATE_PATTERN = re.compile(r"\d{2}/\d{2}/\d{4}")
+
+# Declare functions.
+# Extract the personal information from the lines at the top of the court summary.
+# Args:
+#   poi (list): The lines from the one with the DOB to the first case status.
+# Returns:
+#   dict: A dictionary containing the personal information.
+def extract_poi(poi: list[str]) -> dict[str, str | list]:
+    poi_dict = {}
+
+    # Name, DOB, and Sex appear on the first line.
+    name, dob_sex = poi[0].split("DOB:")[:2]
+    poi_dict["name"] = name.strip()
+    poi_dict["dob"] = dob_sex.split("Sex:")[0].strip()
+    poi_dict["sex"] = dob_sex.split("Sex:")[1].strip()
+
+    # Location and Eye Color appear on the second line.
+    poi_dict["home_location"] = poi[1].split("Eyes:")[0].strip().lower()
+    poi_dict["eyes"] = poi[1].split("Eyes:")[1].strip()
+
+    # Alias and hair color are on the third line, but alias is blank on this line.
+    poi_dict["hair"] = poi[2].split("Hair:")[1].strip()
+
+    # The first alias and race are on the fourth line.
+    alias = poi[3].split("Race:")[0].strip()
+    poi_dict["race"] = poi[3].split("Race:")[1].strip()                          
+
+    # The rest of the aliases are on subsequent lines.
+    remainder_alias = [element.strip() for element in poi[4:]]
+    remainder_alias.append(alias)
+    poi_dict["alias"] = remainder_alias
+
+    return poi_dict
+
+# Start a new case from the 1st line of a case.
+# Args:
+#   line (str): The lower case, stripped line with the docket number, proc. status, DC number, and OTN number.
+#   county (str): The county of the case.
+# Returns:
+#   dict: The new case.
+def extract_case_header(line: str, county: str) -> dict[str, str]:
+    case_header = CASE_HEADER_PATTERN.fullmatch(line)
+    if(case_header is None):
+        raise ValueError(f"Case line without a DC number or OTN: {line}")
+    if(county is None):
+        raise ValueError(f"Case before any county: {line}")
+
+    docket_number, proc_status, dc_nr, otn_nr = case_header.groups()
+    return {"county": county, "docket_number": docket_number.strip(), "proc_status": proc_status.strip(), "dc_nr": dc_nr.strip(), "otn_nr": otn_nr.strip()}
+
+# Extract the details of a closed case from one of its lines.
+# 2nd line: Arrest date, disposition date, and disposition judge.
+# 3rd line: Defense attorney
+# Args:
+#   case (dict): The case.
+#   line (str): The lower case, stripped line.
+# Returns:
+#   bool: Whether the line held any details of the case.
+def extract_closed_case_line(case: dict, line: str) -> bool:
+    if("arrest dt: " in line):
+        arrest_date, disposition = line.split("arrest dt:")[1].split("disp date:")[:2]
+        case["arrest_date"] = arrest_date.strip()
+        case["disp_date"] = disposition.split("disp judge:")[0].strip()
+        case["disp_judge"] = disposition.split("disp judge:")[1].strip()
+    elif("def atty:" in line):
+        case["def_attorney"] = line.split("def atty:")[1].strip()
+    else:
+        return False
+    return True
+
+# Extract the details of an inactive, active, or adjudicated case from one of its lines.
+# 2nd line: Arrest date, trial date, legacy number.
+# 3rd line: Last action, last action date, last action room.
+# 4th line: Next action, next action date, next action room.
+# Occasionally, the defense attorney will also be listed (in between the 2nd and 3rd line).
+# Also occasionally, we can get a disposition date and disposition judge on the 5th line.
+# Args:
+#   case (dict): The case.
+#   line (str): The lower case, stripped line.
+# Returns:
+#   bool: Whether the line held any details of the case.
+def extract_open_case_line(case: dict, line: str) -> bool:
+    if("arrest dt: " in line):
+        case["arrest_date"] = line.split("arrest dt:")[1].split("trial dt:")[0].strip()
+        trial = line.split("trial dt:")[1].split("legacy no:")
+        case["trial_date"] = trial[0].strip()
+        case["legacy_number"] = trial[1].strip()
+    elif("last action: " in line or "next action: " in line):
+        action = "last" if("last action: " in line) else "next"
+        action_name, action_date = line.split(action + " action:")[1].split(action + " action date:")[:2]
+        case[action + "_action"] = action_name.strip()
+        case[action + "_action_date"] = action_date.split(action + " action room:")[0].strip()
+        case[action + "_action_room"] = action_date.split(action + " action room:")[1].strip()
+    elif("def atty: " in line):
+        case["def_attorney"] = line.split("def atty:")[1].strip()
+    # A line with § starts the sequences of the case instead.
+    elif("disp date:" in line and "§" not in line):
+        disposition = line.split("disp date:")[1].split("disp judge:")
+        case["disp_date"] = disposition[0].strip()
+        case["disp_judge"] = disposition[1].strip()
+    else:
+        return False
+    return True
+
+# Extract a sequence (charge) from its line.
+# You can think of the PDF as a fixed-width data table. Hopefully, each of these values is always contained within these lengths.
+# Args:
+#   line (str): The lower case, stripped line with a §.
+# Returns:
+#   dict: The sequence.
+def extract_sequence(line: str) -> dict[str, str]:
+    return {"seq_num": line[:11].strip(), "statute": line[11:48].strip(), "grade": line[48:54].strip(), "description": line[54:95].strip(), "disposition": line[95:].strip()}
+
+# Extract a sentence of a sequence from its line.
+# Args:
+#   line (str): The lower case, stripped line with "min:", "max:", or a date.
+# Returns:
+#   dict: The sentence.
+def extract_sentence(line: str) -> dict[str, str]:
+    return {"sentence_date": line[:17].strip(), "sentence_type": line[17:43].strip(), "program_period": line[43:74].strip(), "sentence_length": line[74:].strip()}
+
+# Extract every set of cases of a court summary, and find where the personal information is, in a single pass over its lines.
+# Each line is in one of three states: before the first case status, in a case, or in the sequences (charges and sentences) of a case.
+# Args:
+#   lines (list): The lines of the court summary.
+#   lowered (list): The same lines, lower case.
+# Returns:
+#   tuple: The personal information and the cases by case status.
+def extract_court_summary(lines: list[str], lowered: list[str]) -> tuple[dict, dict]:
+    cs_dict = {}
+    dob_index = None
+    poi_end_index = None
+
+    # The set of cases we are in.
+    cases = None
+    extract_case_line = None
+    county = None
+    case = None
+    case_nr = -1
+
+    # The sequences of the case we are in.
+    in_sequences = False
+    sequence = None
+    seq_nr = -1
+    sentence_nr = -1
+
+    # Remember where we are, so an error says which section and line it came from.
+    status = None
+    i = None
+    try:
+        for i, line in enumerate(lowered):
+            # If there is no DOB, then this person has no PII.
+            if(dob_index is None and "DOB:" in lines[i]):
+                dob_index = i
+
+            # If there are no closed, inactive, active, or adjudicated cases, this individual has no case history.
+            if(poi_end_index is None):
+                if(CASE_STATUS_PATTERN.search(line) is None):
+                    continue
+                poi_end_index = i
+
+            line = line.strip()
+
+            # Before the first set of cases, only look for a case status.
+            if(cases is None):
+                if(CASE_STATUS_PATTERN.search(line) is None or "continued" in line):
+                    continue
+                if(line not in case_statuses):
+                    raise ValueError(f"Unknown case status: {line}")
+
+            # A new set of cases (statuses).
+            if(line in case_statuses):
+                status = line
+                cases = cs_dict[line] = {}
+                extract_case_line = extract_closed_case_line if(line in closed_case_statuses) else extract_open_case_line
+                county = None
+                case = None
+                case_nr = -1
+                in_sequences = False
+                continue
+
+            if(in_sequences):
+                # A new county or a new case ends the sequences of the case, unless the case carries on from the previous page.
+                if(line in counties):
+                    in_sequences = False
+                elif("proc status: " in line):
+                    if("continued" in lowered[i - 1] and line.split("proc status:")[0].strip() == case["docket_number"]):
+                        continue
+                    in_sequences = False
+                # When we encounter §, it marks the beginning of a new sequence.
+                elif("§" in line):
+                    # Reset the sentence counter because we are on a new sequence of charges.
+                    seq_nr += 1
+                    sentence_nr = -1
+                    sequence = case["seq_" + str(seq_nr)] = extract_sequence(line)
+                    continue
+                # When we encounter "min:" or "max:", we begin capturing the sentenced punishments.
+                elif("min:" in line or "max:" in line or SENTENCE_DATE_PATTERN.search(line)):
+                    sentence_nr += 1
+                    sequence["sentence_" + str(sentence_nr)] = extract_sentence(line)
+                    continue
+                # Any other line in the sequences is a junk line.
+                else:
+                    continue
+
+            # Check if the current line is a new county.
+            if(line in counties):
+                county = line
+            # If we are not on a new county or new case status, then we are on a new case.
+            elif("proc status: " in line):
+                # If the previous line has continued, and the docket # is the docket # of our current case, we already collected this info.
+                if("continued" in lowered[i - 1] and case_nr != -1 and line.split("proc status:")[0].strip() == case["docket_number"]):
+                    continue
+
+                case_nr += 1
+                case = cases["case_" + str(case_nr)] = extract_case_header(line, county)
+            # The other lines of the case (arrest date, defense attorney, etc.).
+            elif(extract_case_line(case, line)):
+                continue
+            # When we encounter §, the sequences of the case begin. Their numbers start over.
+            elif("§" in line):
+                in_sequences = True
+                seq_nr = 0
+                sentence_nr = -1
+                sequence = case["seq_0"] = extract_sequence(line)
+            # If the line does not contain any of the above characters, it's a junk line, and we can skip it.
+    except Exception as e:
+        raise SectionParseError("poi" if(status is None) else status, i, e) from e
+
+    if(poi_end_index is None):
+        poi_end_index = len(lines) - 1
+
+    try:
+        poi_dict = {} if(dob_index is None) else extract_poi(lines[dob_index:poi_end_index])
+    except Exception as e:
+        raise SectionParseError("poi", dob_index, e) from e
+
+    return poi_dict, cs_dict
+
+# Extract text from PDF.
+# Args:
+#   pdf_path (str): File path to the PDF.
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium" (faster, same text).
+# Returns:
+#   list: The text of each page.
+def extract_text_from_pdf(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> list[str]:
+    return extract_page_texts(pdf_path, keep_blank_chars = False, x_density = 3.9, y_density = 13, cache_dir = cache_dir, engine = engine)
+
+# Extract all information from the text of a court summary.
+# Args:
+#   pages (list): The text of each page.
+# Returns:
+#   dict: The personal information, followed by the cases by case status.
+def extract_all_from_text(pages: list[str]) -> dict[str, str | dict]:
+    # Concatenate all pages into one page, so to speak, and lower case it once.
+    lines, lowered, _ = split_document_lines(pages)
+
+    poi_dict, cs_dict = extract_court_summary(lines, lowered)
+
+    # Update personal demographics with criminal background.
+    poi_dict.update(cs_dict)
+
+    return poi_dict
+
+# Extract all information from a court summary PDF.
+# Args:
+#   pdf_path (str): File path to the PDF.
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium".
+# Returns:
+#   dict: The personal information, followed by the cases.
+def extract_all(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> dict[str, str | dict]:
+    return extract_all_from_text(extract_text_from_pdf(pdf_path, cache_dir, engine))
@@ -0,0 +1,89 @@
+import logging
+import functools
+import multiprocessing
+import parse_court_summary_CP_functions
+import parse_court_summary_MJ_functions
+from parse_pdf_driver_functions import bounded_imap
+
+# Parse court summaries from a script, a notebook or a pool of workers, without going through the parse_court_summaries_*_full.py files.
+# E.g., parse_court_summary("cs_Montgomery_CP_CR_0000001_2019.pdf", court = "CP") or parse_court_summaries(pdf_paths, court = "MJ", workers = 8).
+
+# Parser module of each court type.
+COURT_SUMMARY_PARSERS = {
+    "CP": parse_court_summary_CP_functions,
+    "MJ": parse_court_summary_MJ_functions
+}
+
+# Read the text of each page of a court summary.
+# Args:
+#   path_or_text: File path to the PDF, the layout text of the court summary (pages separated by form feeds) or a list with the layout text of each page.
+#   court (str): Court type, "CP" or "MJ".
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium".
+# Returns:
+#   list: The text of each page.
+def read_court_summary_pages(path_or_text: str | list[str], court: str = "CP", cache_dir: str | None = None, engine: str = "pdfplumber") -> list[str]:
+    if(isinstance(path_or_text, list)):
+        return path_or_text
+    # A file path is a single line ending in .pdf. Anything else is the text itself.
+    if("\n" not in path_or_text and path_or_text.lower().endswith(".pdf")):
+        return COURT_SUMMARY_PARSERS[court].extract_text_from_pdf(path_or_text, cache_dir, engine)
+    return path_or_text.split("\f")
+
+# Parse one court summary.
+# Args:
+#   path_or_text: File path to the PDF, or its text (see read_court_summary_pages).
+#   court (str): Court type, "CP" or "MJ".
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium".
+# Returns:
+#   dict: The personal information, followed by the cases. Raises an error if the court summary cannot be parsed.
+def parse_court_summary(path_or_text: str | list[str], court: str = "CP", cache_dir: str | None = None, engine: str = "pdfplumber") -> dict[str, str | dict]:
+    if(court not in COURT_SUMMARY_PARSERS):
+        raise ValueError(f"Unknown court type {court}. Use one of {', '.join(COURT_SUMMARY_PARSERS)}.")
+
+    pages = read_court_summary_pages(path_or_text, court, cache_dir, engine)
+    return COURT_SUMMARY_PARSERS[court].extract_all_from_text(pages)
+
+# Parse one court summary, logging the error and returning None if it cannot be parsed, so one bad court summary does not end a whole batch.
+# Args:
+#   path_or_text: File path to the PDF, or its text (see read_court_summary_pages).
+#   court (str): Court type, "CP" or "MJ".
+#   cache_dir (str): Directory of the layout text cache.
+#   engine (str): Engine used to extract the text.
+# Returns:
+#   dict: What we parsed out of the court summary, or None if parsing failed.
+def try_parse_court_summary(path_or_text: str | list[str], court: str = "CP", cache_dir: str | None = None, engine: str = "pdfplumber") -> dict | None:
+    try:
+        return parse_court_summary(path_or_text, court, cache_dir, engine)
+    except Exception as e:
+        name = path_or_text if(isinstance(path_or_text, str) and "\n" not in path_or_text) else "court summary text"
+        logging.error(f"Error in parsing {name}. The error is {e}")
+        return None
+
+# Parse many court summaries, one at a time or over a pool of worker processes.
+# Args:
+#   items (iterable): File paths to the PDFs, or their texts (see read_court_summary_pages).
+#   court (str): Court type, "CP" or "MJ".
+#   workers (int): Number of worker processes. With 1, the court summaries are parsed in this process.
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDFs.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium".
+#   max_in_flight (int): Most court summaries handed to the pool at once. Defaults to 4 per worker.
+# Returns:
+#   generator: What we parsed out of each court summary (None if parsing failed), in the order of the items.
+def parse_court_summaries(items, court: str = "CP", workers: int = 1, cache_dir: str | None = None, engine: str = "pdfplumber", max_in_flight: int | None = None):
+    if(court not in COURT_SUMMARY_PARSERS):
+        raise ValueError(f"Unknown court type {court}. Use one of {', '.join(COURT_SUMMARY_PARSERS)}.")
+
+    task = functools.partial(try_parse_court_summary, court = court, cache_dir = cache_dir, engine = engine)
+
+    if(workers <= 1):
+        for item in items:
+            yield task(item)
+        return
+
+    if(max_in_flight is None):
+        max_in_flight = workers * 4
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from bounded_imap(pool, task, items, max_in_flight)
@@ -2,95 +2,94 @@ import re
 import json
 import pandas as pd
 import pdfplumber
+from parse_pdf_text_functions import extract_page_texts, crop_page_bands, split_document_lines, find_section_headers, SectionView
+from parse_pdf_column_functions import column_spec
 
 # Extract text from PDF.
 # Args:
 #   pdf_path (str): File path to the PDF.
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium" (faster, same text).
 # Returns:
-#   string: A single string which is the concatenated version of all pages and lines in the PDF.
-def extract_text_from_pdf(pdf_path: str) -> str:
-    # Open up the PDF and read in each page.
-    pages = pdfplumber.open(pdf_path).pages
-    # List comprehension. Structure is expression FOR x IN y.
-    # Execute expression on each x in y.
-    # Here we extract the text from each page. Then we separate each text element with the new line character.
-    alltext = "\n".join([page.extract_text(keep_blank_chars=True, layout=True, x_density = 3.9, y_density = 13) for page in pages])
-    return alltext
-
-# Extracts sections from the document text.
+#   list: The text of each page in the PDF, without the header and footer repeated on every page.
+def extract_text_from_pdf(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> list[str]:
+    # Extract the text from each page (or read it from the cache if we have already extracted it once before).
+    pages = extract_page_texts(pdf_path, keep_blank_chars = True, x_density = 3.9, y_density = 13, cache_dir = cache_dir, engine = engine)
+    # Crop the header and footer bands off every page so only the body of each page is left.
+    return [crop_page_bands(page) for page in pages]
+
+# Extracts sections from the pages of the document.
 # Args:
-#   text (str): The text of the document.
+#   pages (list): The text of each page, without its header and footer (see extract_text_from_pdf).
 # Returns:
-#   dict: A dictionary containing the extracted sections with the section headers as keys.
-def extract_sections(text: str) -> dict[str, str]:
-    # Find lines that contain 4 or more upper-case characters and/or slashes and/or hyphens (and are bookended by white space).
-    # These will be the section headers.
-    section_header_pattern = re.compile(r"^\s*[A-Z\s\/\-]{4,}\s*$", re.MULTILINE)
-
-    # Find all section headers and their starting character index.
-    matches = re.finditer(section_header_pattern, text)
-
-    # Iterate through each match and find the starting character index as well as the section header.
-    headers = [(match.start(), match.group().strip()) for match in matches]
-    # Drop any potential headers that are just empty whitespace or are only 3 non-white space characters.
-    # We need to drop the 3 non-white space character headers because there are some acronyms that are all capital lettrs
-    # and are surrounded only by white space in the CASE FINANCIAL INFORMATION section. E.g., OAG and PSP.
-    # We also need to drop RRRI as a header. This can show as a punishment condition.
-    headers = [h for h in headers if len(h[1]) > 3 and h[1] != "RRRI"]
+#   dict: A dictionary containing the extracted sections with the section headers as keys. Each section is a view of the document's lower case lines (see SectionView).
+def extract_sections(pages: list[str]) -> dict[str, SectionView]:
+    # Find lines that only contain upper-case characters and/or slashes and/or hyphens (and white space).
+    # Together with the blank lines around them, these will be the section headers.
+    section_header_pattern = re.compile(r"[A-Z\s\/\-]*")
+
+    # Split the document into lines, and lower case them, once. The sections only point into these lines.
+    lines, lowered, page_starts = split_document_lines(pages)
 
     # Dictionary to store sections
     sections = {}
 
-    # Iterate over headers and extract sections.
-    for i in range(len(headers)):
-        start_index = headers[i][0]
-        header = headers[i][1]
-        # Set the end index to be the start index of the next section header (or the end of the text file).
-        end_index = headers[i + 1][0] if i + 1 < len(headers) else len(text)
-
-        # Extract section text.
-        section_text = text[start_index:end_index].strip()
-
-        # Remove the header from the section text.
-        section_text = section_text[len(header):].strip()
-
-        # Sometimes, section headers do not carry over to new pages. To capture the information which overflows onto the next page, set the criminal docket header to the previous substantive header.
-        # And then remove the junk from the top of the criminal docket header.
-        if "CRIMINAL DOCKET" in header and i - 2 > 0:
-            header = headers[i-2][1]
-            section_text_list = [line for line in section_text.split("\n") if line.strip() != ""]
-            section_text = "\n".join(section_text_list[5:])
-
-        # Reduce different versions of the same header to a single version
-        if "ATTORNEY INFORMATION" in header:
-            header = "ATTORNEY INFORMATION"
-        elif "BAIL INFORMATION" in header:
-            header = "BAIL"
-            
-        # Add the current section header to our dictionary of sections.
-        # setdefault searches for the key in your dictionary if it exists.
-        # If it does exist, it returns the value associated with the key. If it does not exist, the key is inserted with the provided default value.
-        sections.setdefault(header, "")
-
-        # Add the section text to the dictionary under the header key.
-        sections[header] += f"\n{section_text}"
+    # The section the last page ended in.
+    header = None
+
+    for page_nr in range(len(pages)):
+        page_start = page_starts[page_nr]
+        page_end = page_starts[page_nr + 1] if page_nr + 1 < len(pages) else len(lines)
+
+        # Find all section headers and their first line.
+        # We look for them page by page so a header at the bottom of one page never runs into a header at the top of the next.
+        headers = find_section_headers(lines, page_start, page_end, section_header_pattern)
+        # Drop any potential headers that are only 3 non-white space characters.
+        # We need to drop the 3 non-white space character headers because there are some acronyms that are all capital lettrs
+        # and are surrounded only by white space in the CASE FINANCIAL INFORMATION section. E.g., OAG and PSP.
+        # We also need to drop RRRI as a header. This can show as a punishment condition.
+        headers = [h for h in headers if len(h[2]) > 3 and h[2] != "RRRI"]
+
+        # Section headers do not carry over to new pages, so the lines above the first header of a page belong to the section the last page ended in.
+        if(header is not None):
+            sections[header].add_range(page_start, headers[0][0] if len(headers) > 0 else page_end)
+
+        # Iterate over headers and extract sections.
+        for i in range(len(headers)):
+            # The section starts after the header, and ends at the next section header (or the end of the page).
+            start_index = headers[i][1]
+            header = headers[i][2]
+            end_index = headers[i + 1][0] if i + 1 < len(headers) else page_end
+
+            # Reduce different versions of the same header to a single version
+            if "ATTORNEY INFORMATION" in header:
+                header = "ATTORNEY INFORMATION"
+            elif "BAIL INFORMATION" in header:
+                header = "BAIL"
+
+            # Add the current section header to our dictionary of sections.
+            # setdefault searches for the key in your dictionary if it exists.
+            # If it does exist, it returns the value associated with the key. If it does not exist, the key is inserted with the provided default value.
+            sections.setdefault(header, SectionView(lowered, lines))
+
+            # Add the lines of the section to the view under the header key.
+            sections[header].add_range(start_index, end_index)
 
     return sections
 
 # Extracts the defendant's information from the DEFENDANT INFORMATION section.
 # Args:
-#   text (str): The text containing the defendant's information.
+#   lines (SectionView): The lower case lines containing the defendant's information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_defendant_information(text: str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_defendant_information(lines: SectionView) -> dict[str, str | list]:
     extracted_info = {}
     i = 0
 
     # Defendant information follows a straightforward pattern.
     # In CP dockets, there is only one line which contains defendant DOB and address.
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         if("date of birth:" in line and "city/state/zip:" in line):
             extracted_info["dob"] = line.split("date of birth:")[1].split("city/state/zip:")[0].strip()
             extracted_info["address"] = line.split("date of birth:")[1].split("city/state/zip:")[1].strip()
@@ -103,11 +102,10 @@ def extract_defendant_information(text: str) -> dict[str, str | list]:
 
 # Extracts the case information from the CASE INFORMATION section.
 # Args:
-#   text(str): The text containing the case information.
+#   lines (SectionView): The lower case lines containing the case information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_case_information(text: str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_information(lines: SectionView) -> dict[str, str | list]:
     extracted_info = {}
     i = 0
 
@@ -121,16 +119,16 @@ def extract_case_information(text: str) -> dict[str, str | list]:
     #   Line 6 is complaint/citation number and incident number.
     #   Line 7 is county and township.
     #   Line 8 + 9 is case local number type and case local number.
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         
         if("cross court docket nos:" in line):
             extracted_info["cross_court_docket_nrs"] = [item.strip() for item in line.replace("cross court docket nos:", "").split(",")]
             j = 1
 
             # Check the next line for more docket numbers.
-            while("judge assigned" not in split[i + j].lower() and "date filed" not in split[i + j].lower() and "initiation date" not in split[i + j].lower()):
-                lookahead_line = split[i + j].lower().strip()
+            while("judge assigned" not in lines[i + j] and "date filed" not in lines[i + j] and "initiation date" not in lines[i + j]):
+                lookahead_line = lines[i + j].strip()
                 extracted_info["cross_court_docket_nrs"].extend([item.strip() for item in lookahead_line.replace("cross court docket nos:", "").split(",")])
                 j += 1
             
@@ -153,8 +151,8 @@ def extract_case_information(text: str) -> dict[str, str | list]:
             j = 1
 
             # Check the next line to see if initial issuing authority and/or final issuing authority spilled over into the next line.
-            while("arresting agency:" not in split[i + j].lower() and "arresting officer:" not in split[i + j].lower()):
-                lookahead_line = split[i + j].lower()
+            while("arresting agency:" not in lines[i + j] and "arresting officer:" not in lines[i + j]):
+                lookahead_line = lines[i + j]
                 extracted_info["initial_issuing_authority"] = extracted_info["initial_issuing_authority"] + " " + lookahead_line[:66].strip()
                 extracted_info["final_issuing_authority"] = extracted_info["final_issuing_authority"] + " " + lookahead_line[66:].strip()
                 j += 1
@@ -166,8 +164,8 @@ def extract_case_information(text: str) -> dict[str, str | list]:
             j = 1
 
             # Check the next line to see if arresting agency spilled over onto the next line.
-            while("complaint/citation no.:" not in split[i + j].lower() and "incident number:" not in split[i + j].lower()):
-                lookahead_line = split[i + j].lower().strip()
+            while("complaint/citation no.:" not in lines[i + j] and "incident number:" not in lines[i + j]):
+                lookahead_line = lines[i + j].strip()
                 extracted_info["arresting_agency"] = extracted_info["arresting_agency"] + " " + lookahead_line
                 j += 1
 
@@ -186,8 +184,8 @@ def extract_case_information(text: str) -> dict[str, str | list]:
             extracted_info["case_local_number"] = []
             j = 1
 
-            while(i + j < len(split)):
-                lookahead_line = split[i + j].lower().strip()
+            while(i + j < len(lines)):
+                lookahead_line = lines[i + j].strip()
                 case_local_number_type = lookahead_line[:34].strip()
                 case_local_number = lookahead_line[34:].strip()
                 extracted_info["case_local_number_type"].append(case_local_number_type)
@@ -204,59 +202,105 @@ def extract_case_information(text: str) -> dict[str, str | list]:
 
 # Extracts the charges from the CHARGES section.
 # Args:
-#   text(str): The text containing the charges information.
+#   lines (SectionView): The lower case lines containing the charges information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_charges(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_charges(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "CHARGES")
     extracted_info = {}
     charge_nr = -1
     charge_nr_idx = "charge_nr_" + str(charge_nr)
     i = 0
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
 
-        # Skip blank lines, column header line, and junk lines.
-        if(("seq." in line and "orig seq." in line and "statute" in line and "grade" in line) or line == "" or "reflected on these docket sheets" in line or "assume any liability for inaccurate" in line or "docket sheet information should" in line or "who does not comply" in line or "liability as set forth" in line or "cpcms" in line):
+        # The column header line tells where the columns start.
+        if("seq." in line and "orig seq." in line and "statute" in line and "grade" in line):
+            columns = column_spec("CP", "CHARGES", line)
+            i += 1
+        # Skip blank lines. The page header and footer are already cropped off (see crop_page_bands).
+        elif(line == ""):
             i+=1
         # The § character indicates a new charge.
         elif("§" in line):
             charge_nr += 1
             charge_nr_idx = "charge_nr_" + str(charge_nr)
-            extracted_info[charge_nr_idx] = {}
 
             # Each charge adheres to the following pattern.
-            extracted_info[charge_nr_idx]["seq"] = line[:11].strip()
-            extracted_info[charge_nr_idx]["orig_seq"] = line[11:22].strip()
-            extracted_info[charge_nr_idx]["grade"] = line[22:31].strip()
-            extracted_info[charge_nr_idx]["statute"] = line[31:56].strip()
-            extracted_info[charge_nr_idx]["description"] = line[56:102].strip()
-            extracted_info[charge_nr_idx]["offense_date"] = line[102:118].strip()
-            extracted_info[charge_nr_idx]["otn"] = line[118:].strip()
+            extracted_info[charge_nr_idx] = columns.row(line)
             i += 1
-        # If the line is not a header line, a blank line, a new charge, or a junk line, then it is the description from the previous charge overflowing onto a new line.
+        # If the line is not a header line, a blank line or a new charge, then it is the description from the previous charge overflowing onto a new line.
         else:
             extracted_info[charge_nr_idx]["description"] = extracted_info[charge_nr_idx]["description"] + " " + line.strip()
             i += 1
     
     return(extracted_info)
 
+# Patterns used to tell apart the lines of the DISPOSITION/SENTENCING section, compiled once.
+SENTENCING_DATE_PATTERN = re.compile(r"\d{2}/\d{2}/\d{4}")
+# A name at the start of the line e.g., the sentencing judge.
+SENTENCING_NAME_PATTERN = re.compile("[A-Za-z'\-]+\s*,\s*[A-Za-z'\-]+")
+# Stricter version used to rule out a case event line.
+SENTENCING_EVENT_NAME_PATTERN = re.compile("[A-Za-z'\-]+\s*,\s*[A-Za-z\-]+")
+SENTENCING_TIME_UNIT_PATTERN = re.compile("hour|day|week|month|year")
+# Possible punishments.
+SENTENCING_PUNISHMENT_PATTERN = re.compile("^confinement$|^probation$|^ipp$|^ard$|^ard\s*-\s*dui$|^drug court$")
+SENTENCING_LINK_PATTERN = re.compile(r"link \d+")
+DEFENDANT_PRESENT_PATTERN = re.compile("defendant.*present")
+
+# Tells what a line of the DISPOSITION/SENTENCING section holds, checking each pattern at most once.
+# The checks are made in order of precedence, so the first kind that fits is the kind of the line.
+# Args:
+#   line (str): The line, lower case and stripped.
+#   punish_start_date (bool): Whether we are in a punishment block.
+#   linked_sentences (bool): Whether we are in the linked sentences block.
+# Returns:
+#   string: The kind of line ("disposition_date", "offense", "sentencer", "punishment", "no_further_penalty", "min_punishment", "max_punishment", "linked_sentences", "punishment_condition", "link", "link_text"), or None if it holds nothing we keep.
+def classify_sentencing_line(line: str, punish_start_date: bool, linked_sentences: bool) -> str | None:
+    has_time_unit = SENTENCING_TIME_UNIT_PATTERN.search(line) is not None
+
+    # A date in the disposition date column on a line that does not have: 1) a name or 2) a hour/day/week/month/year (indicating a punishment).
+    if(SENTENCING_DATE_PATTERN.fullmatch(column_spec("CP", "CASE EVENTS").value(line, "disposition_date")) and not SENTENCING_EVENT_NAME_PATTERN.match(line) and not has_time_unit):
+        return "disposition_date"
+    # The § character indicates the line where the offense is laid out.
+    if("§" in line and not linked_sentences):
+        return "offense"
+
+    has_date = "/" in line and SENTENCING_DATE_PATTERN.search(line) is not None
+    # A date and a name.
+    if(has_date and SENTENCING_NAME_PATTERN.match(line)):
+        return "sentencer"
+    # Hour, day, week, month or year and a date or a punishment from the list of punishments.
+    if(has_time_unit and (has_date or SENTENCING_PUNISHMENT_PATTERN.search(column_spec("CP", "PUNISHMENTS").value(line, "punishment_type")))):
+        return "punishment"
+    if("no further penalty" in line or "merged" in line):
+        return "no_further_penalty"
+    if(punish_start_date and "min of" in line):
+        return "min_punishment"
+    if(punish_start_date and "max of" in line):
+        return "max_punishment"
+    if("linked sentences" in line):
+        return "linked_sentences"
+    if(punish_start_date and not linked_sentences):
+        return "punishment_condition"
+    if("link " in line and SENTENCING_LINK_PATTERN.search(line)):
+        return "link"
+    if(linked_sentences):
+        return "link_text"
+    return None
+
 # Extracts the sentencing and disposition information from the DISPOSITION/SENTENCING section.
 # Args:
-#   text(str): The text containing the disposition and sentencing information.
+#   lines (SectionView): The lower case lines containing the disposition and sentencing information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_sentencing(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_sentencing(lines: SectionView) -> dict[str, str | list]:
     extracted_info = {}
     
     # Line counter.
     i = 0
 
-    # Possible punishments.
-    punishments = "^confinement$|^probation$|^ipp$|^ard$|^ard\s*-\s*dui$|^drug court$"
-
     # Counters for specific elements of the dictionary.
     case_event_nr = -1
     case_event_idx = "case_event_nr_" + str(case_event_nr)
@@ -269,37 +313,38 @@ def extract_sentencing(text:str) -> dict[str, str | list]:
     linked_sentences = False
     punish_start_date = False
     link_nr = ""
+    case_event_columns = column_spec("CP", "CASE EVENTS")
+    offense_columns = column_spec("CP", "OFFENSES")
+    sentence_columns = column_spec("CP", "SENTENCES")
+    punishment_columns = column_spec("CP", "PUNISHMENTS")
     
-    while(i < len(split)):
-        line = split[i].lower().strip()
-        disp_date = line[60:98].strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
+        kind = classify_sentencing_line(line, punish_start_date, linked_sentences)
         
-        # If you see a date on a line that does not have: 1) a name, 2) a hour/day/week/month/year (indicating a punishment), or 3) printed: (end of page),
+        # If you see a date on a line that does not have: 1) a name or 2) a hour/day/week/month/year (indicating a punishment),
         # then it is the case event/disposition date/final disposition line (2nd element).
-        if(re.search(r"^\d{2}/\d{2}/\d{4}$", disp_date) and not re.search("^[A-Za-z'\-]+\s*,\s*[A-Za-z\-]+", line) and not re.search("hour|day|week|month|year", line) and not re.search("printed:", line)):
+        if(kind == "disposition_date"):
             case_event_nr += 1
             case_event_idx = "case_event_nr_" + str(case_event_nr)
-            extracted_info[case_event_idx] = {}
 
             # Reset offense index.
             offense_nr = -1
             offense_idx = "offense_nr_" + str(offense_nr)
 
-            extracted_info[case_event_idx]["case_event"] = line[:60].strip()
-            extracted_info[case_event_idx]["disposition_date"] = line[60:98].strip()
-            extracted_info[case_event_idx]["final_disposition"] = line[98:].strip()
+            extracted_info[case_event_idx] = case_event_columns.row(line)
 
             # This line has the case disposition and if the defendant was present.
-            previous_line = split[i - 1].lower().strip()
-            extracted_info[case_event_idx]["disposition"] = re.sub("defendant.*present", "", previous_line).strip()
-            if(re.search(r"defendant was present", previous_line)):
+            previous_line = lines[i - 1].strip()
+            extracted_info[case_event_idx]["disposition"] = DEFENDANT_PRESENT_PATTERN.sub("", previous_line).strip()
+            if("defendant was present" in previous_line):
                 extracted_info[case_event_idx]["defendant_present"] = True
-            elif(re.search(r"defendant was not present", previous_line)):
+            elif("defendant was not present" in previous_line):
                 extracted_info[case_event_idx]["defendant_present"] = False
             else:
                 extracted_info[case_event_idx]["defendant_present"] = None
         # The § character indicates the line where the offense is laid out (3rd element).
-        elif(re.search(r"§", line) and not linked_sentences):
+        elif(kind == "offense"):
             offense_nr += 1
             offense_idx = "offense_nr_" + str(offense_nr)
             
@@ -312,28 +357,21 @@ def extract_sentencing(text:str) -> dict[str, str | list]:
             # Parser will think this is a punishment condition.
             punish_start_date = False
 
-            extracted_info[case_event_idx][offense_idx] = {}
-            extracted_info[case_event_idx][offense_idx]["offense_description"] = line[:61].strip()
-            extracted_info[case_event_idx][offense_idx]["offense_disposition"] = line[61:100].strip()
-            extracted_info[case_event_idx][offense_idx]["grade"] = line[100:110].strip()
-            extracted_info[case_event_idx][offense_idx]["offense_section"] = line[110:].strip()
+            extracted_info[case_event_idx][offense_idx] = offense_columns.row(line)
         # If you see a date and a name, this is the line with the judge who handed down the sentence (4th element).
-        elif(re.search(r"\d{2}/\d{2}/\d{4}", line) and re.search("^[A-Za-z'\-]+\s*,\s*[A-Za-z'\-]+", line)):
+        elif(kind == "sentencer"):
             sentence_nr += 1
             sentence_idx = "sentence_nr_" + str(sentence_nr)
-            extracted_info[case_event_idx][offense_idx][sentence_idx] = {}
 
             # Reset punishment index.
             punish_nr = -1
             punish_idx = "punish_nr_" + str(punish_nr)
             punish_start_date = False
 
-            extracted_info[case_event_idx][offense_idx][sentence_idx]["sentencing_judge"] = line[:60].strip()
-            extracted_info[case_event_idx][offense_idx][sentence_idx]["sentencing_date"] = line[60:100].strip()
-            extracted_info[case_event_idx][offense_idx][sentence_idx]["credit_for_time_served"] = line[100:].strip()
+            extracted_info[case_event_idx][offense_idx][sentence_idx] = sentence_columns.row(line)
         # If you find hour, day, week, month or year and a date or a punishment from the list of punishments, this is the first line of the sentence length (5th element).
         # Unfortunately, not every punishment has a start date.
-        elif(re.search(r"hour|day|week|month|year", line) and (re.search(r"\d{2}/\d{2}/\d{4}", line) or re.search(punishments, line[:60].strip()))):
+        elif(kind == "punishment"):
             # Move the punishment counter up 1 and initialize the punishment dictionary.
             punish_nr += 1
             punish_idx = "punish_nr_" + str(punish_nr)
@@ -350,19 +388,19 @@ def extract_sentencing(text:str) -> dict[str, str | list]:
             punish_start_date = True
             
             # Set initial conditions to blank and extract other information.
-            extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_type"] = line[:60].strip()
-            extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_start_date"] = line[101:].strip()
+            extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_type"] = punishment_columns.value(line, "punishment_type")
+            extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_start_date"] = punishment_columns.value(line, "punishment_start_date")
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_conditions"] = ""
         
-            if(re.search(r"min of", line)):
-                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["min_punishment"] = line[60:101].strip()
-            elif(re.search(r"max of", line)):
-                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["max_punishment"] = line[60:101].strip()
+            if("min of" in line):
+                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["min_punishment"] = punishment_columns.value(line, "punishment")
+            elif("max of" in line):
+                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["max_punishment"] = punishment_columns.value(line, "punishment")
             # Sometimes a punishment will not be given a minimum or maximum but just the length
             else:
-                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment"] = line[60:101].strip()
+                extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment"] = punishment_columns.value(line, "punishment")
         # Sometimes, the punishment will just be 'no further penalty' or 'merged'.
-        elif(re.search("no further penalty|merged", line)):
+        elif(kind == "no_further_penalty"):
             # Move the punishment counter up 1 and initialize the punishment dictionary.
             punish_nr += 1
             punish_idx = "punish_nr_" + str(punish_nr)
@@ -382,25 +420,25 @@ def extract_sentencing(text:str) -> dict[str, str | list]:
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_conditions"] = ""
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_type"] = line
         # If you find the phrase of "min of" and you already found the punishment start date, then this is the 2nd line of the sentence length (5th element).
-        elif(punish_start_date and re.search(r"min of", line)):
+        elif(kind == "min_punishment"):
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["min_punishment"] = line
         # If you find the phrase of "max of" and you already found the punishment start date, then this is the 2nd line of the sentence length (5th element).
-        elif(punish_start_date and re.search(r"max of", line)):
+        elif(kind == "max_punishment"):
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["max_punishment"] = line
         # Signal we are in the linked sentences block.
-        elif(re.search(r"linked sentences", line)):
+        elif(kind == "linked_sentences"):
             linked_sentences = True
             # We are no longer in the punishment block.
             punish_start_date = False
         # If we are still in the punishment block, and we have not reached the linked sentences yet, then we are on punishment conditions.
-        elif(punish_start_date and not linked_sentences):
+        elif(kind == "punishment_condition"):
             extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_conditions"] = extracted_info[case_event_idx][offense_idx][sentence_idx][punish_idx]["punishment_conditions"] + "|" + line
         # Found a new linked sentence.
-        elif(re.search(r"link \d+", line)):
-            link_nr = re.findall(r"link \d+", line)[0]
+        elif(kind == "link"):
+            link_nr = SENTENCING_LINK_PATTERN.search(line).group(0)
             extracted_info[link_nr] = ""
         # If we are in the linked sentences block, just capture the information.
-        elif(linked_sentences):
+        elif(kind == "link_text"):
             extracted_info[link_nr] = extracted_info[link_nr] + "|" + line
         
         i += 1
@@ -409,11 +447,11 @@ def extract_sentencing(text:str) -> dict[str, str | list]:
 
 # Extracts confinement information from the CONFINEMENT INFORMATION section.
 # Args:
-#   text(str): The text containing the case information.
+#   lines (SectionView): The lower case lines containing the case information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_confinement(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_confinement(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "CONFINEMENT")
     extracted_info = {}
     confinement_nr = -1
     confinement_idx = "confinement_nr_" + str(confinement_nr)
@@ -421,20 +459,15 @@ def extract_confinement(text:str) -> dict[str, str | list]:
     # Line counter.
     i = 0
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
 
         # Capture confinement information.
-        if("confinement" not in line and "known as of" not in line and "cpcms" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set forth" not in line and line != ""):
+        if("confinement" not in line and "known as of" not in line and line != ""):
             confinement_nr += 1
             confinement_idx = "confinement_nr_" + str(confinement_nr)
-            extracted_info[confinement_idx] = {}
 
-            extracted_info[confinement_idx]["confinement_date"] = line[:19].strip()
-            extracted_info[confinement_idx]["confinement_type"] = line[19:55].strip()
-            extracted_info[confinement_idx]["confinement_location"] = line[55:89].strip()
-            extracted_info[confinement_idx]["confinement_reason"] = line[89:122].strip()
-            extracted_info[confinement_idx]["in_custody"] = line[122:].strip()
+            extracted_info[confinement_idx] = columns.row(line)
         
         i += 1
 
@@ -442,11 +475,11 @@ def extract_confinement(text:str) -> dict[str, str | list]:
 
 # Extracts status information from the STATUS INFORMATION section.
 # Args:
-#   text(str): The text containing the status information.
+#   lines (SectionView): The lower case lines containing the status information.
 # Return:
 #   dict: A dictionary containing the status information.
-def extract_status(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_status(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "STATUS INFORMATION")
     extracted_info = {}
     
     # Line counter.
@@ -454,8 +487,8 @@ def extract_status(text:str) -> dict[str, str | list]:
     status_nr = -1
     status_idx = "status_nr_" + str(status_nr)
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         
         if("case status:" in line):
             extracted_info["case_status"] = line.split("case status:")[1].split("status date")[0].strip()
@@ -463,12 +496,10 @@ def extract_status(text:str) -> dict[str, str | list]:
             extracted_info["arrest_date"] = line.split("arrest date:")[1].strip()
         if("complaint date:" in line):
             extracted_info["complaint_date"] = line.split("complaint date:")[1].strip()
-        if(re.search(r"\d{2}/\d{2}/\d{4}", line) and "arrest date" not in line and "complaint date" not in line and "cpcms" not in line):
+        if(re.search(r"\d{2}/\d{2}/\d{4}", line) and "arrest date" not in line and "complaint date" not in line):
             status_nr += 1
             status_idx = "status_nr_" + str(status_nr)
-            extracted_info[status_idx] = {}
-            extracted_info[status_idx]["status_date"] = line[:20].strip()
-            extracted_info[status_idx]["processing_status"] = line[20:].strip()
+            extracted_info[status_idx] = columns.row(line)
         
         i += 1
     
@@ -476,11 +507,11 @@ def extract_status(text:str) -> dict[str, str | list]:
 
 # Extracts calendar events from the CALENDAR EVENTS section.
 # Args:
-#   text(str): The text containing the calendar events information.
+#   lines (SectionView): The lower case lines containing the calendar events information.
 # Return:
 #   dict: A dictionary containing the calendar events information.
-def extract_calendar_events(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_calendar_events(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "CALENDAR EVENTS")
     extracted_info = {}
     
     # Line counter.
@@ -488,30 +519,22 @@ def extract_calendar_events(text:str) -> dict[str, str | list]:
     event_nr = -1
     event_idx = "event_nr_" + str(event_nr)
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
         
         # If we find a date on the line (that is not at the end of the document), then it is a calendar event.
-        if(re.search(r"\d{2}/\d{2}/\d{4}", line) and "printed" not in line):
+        if(re.search(r"\d{2}/\d{2}/\d{4}", line)):
             event_nr += 1
             event_idx = "event_nr_" + str(event_nr)
-            extracted_info[event_idx] = {}
 
-            extracted_info[event_idx]["event_type"] = line[:37].strip()
-            extracted_info[event_idx]["start_date"] = line[37:49].strip()
-            extracted_info[event_idx]["start_time"] = line[49:65].strip()
-            extracted_info[event_idx]["room"] = line[65:90].strip()
-            extracted_info[event_idx]["judge"] = line[90:127].strip()
-            extracted_info[event_idx]["schedule_status"] = line[127:].strip()
+            extracted_info[event_idx] = columns.row(line)
 
+        # The header row tells where the columns start.
+        elif("event type" in line and "start date" in line):
+            columns = column_spec("CP", "CALENDAR EVENTS", line)
         # If we do not find a date, but it is not the end of the document nor is it the header row or an empty row, then it is an overflow row.
-        elif("case calendar" not in line and "event type" not in line and "cpcms" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set forth" not in line and line != ""):
-            extracted_info[event_idx]["event_type"] = extracted_info[event_idx]["event_type"] + " " + line[:37].strip()
-            extracted_info[event_idx]["start_date"] = extracted_info[event_idx]["start_date"] + " " + line[37:49].strip()
-            extracted_info[event_idx]["start_time"] = extracted_info[event_idx]["start_time"] + " " + line[49:65].strip()
-            extracted_info[event_idx]["room"] = extracted_info[event_idx]["room"] + " " + line[65:90].strip()
-            extracted_info[event_idx]["judge"] = extracted_info[event_idx]["judge"] + " " + line[90:127].strip()
-            extracted_info[event_idx]["schedule_status"] = extracted_info[event_idx]["schedule_status"] + " " + line[127:].strip()
+        elif("case calendar" not in line and "event type" not in line and line != ""):
+            columns.extend(extracted_info[event_idx], line)
         
         i += 1
     
@@ -519,11 +542,11 @@ def extract_calendar_events(text:str) -> dict[str, str | list]:
 
 # Extracts case participants from the CASE PARTICIPANTS section.
 # Args:
-#   text(str): The text containing the case participants.
+#   lines (SectionView): The lower case lines containing the case participants.
 # Return:
 #   dict: A dictionary containing the case participant information.
-def extract_case_participants(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_participants(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "CASE PARTICIPANTS")
     extracted_info = {}
     
     # Line counter.
@@ -531,17 +554,18 @@ def extract_case_participants(text:str) -> dict[str, str | list]:
     participant_nr = -1
     participant_idx = "participant_nr_" + str(participant_nr)
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         
+        # The header row tells where the columns start.
+        if("participant type" in line):
+            columns = column_spec("CP", "CASE PARTICIPANTS", line)
         # If it is not the end of the document nor is it the header row or an empty row, then it is a case participant.
-        if("participant" not in line and "cpcms" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set fort" not in line and line != ""):
+        elif("participant" not in line and line != ""):
             participant_nr += 1
             participant_idx = "participant_nr_" + str(participant_nr)
-            extracted_info[participant_idx] = {}
 
-            extracted_info[participant_idx]["participant_type"] = line[:45].strip()
-            extracted_info[participant_idx]["name"] = line[45:].strip()
+            extracted_info[participant_idx] = columns.row(line)
         
         i += 1
     
@@ -549,18 +573,17 @@ def extract_case_participants(text:str) -> dict[str, str | list]:
 
 # Extract attorney information from the ATTORNEY INFORMATION section.
 # Args:
-#   text(str): The text containing the attorney information.
+#   lines (SectionView): The lower case lines containing the attorney information.
 # Return:
 #   dict: A dictionary containing the attorney information.
-def extract_attorney_info(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_attorney_info(lines: SectionView) -> dict[str, str | list]:
     i = 0
 
     # Split each line into the prosecutor side and the defense side.
-    prosecutor_lines = [line[:67].strip().lower() for line in split]
+    prosecutor_lines = [line[:67].strip() for line in lines]
     prosecutor_nr = -1
     prosecutor_idx = "prosecutor_nr_" + str(prosecutor_nr)
-    defense_lines = [line[67:].strip().lower() for line in split]
+    defense_lines = [line[67:].strip() for line in lines]
     defense_nr = -1
     defense_idx = "defense_nr_" + str(defense_nr)
     attorney_dict = {}
@@ -581,9 +604,9 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
     defense_address_block = False
     defense_representing_block = False
     
-    while(i < len(split)):
-        p_line = prosecutor_lines[i].strip().lower()
-        d_line = defense_lines[i].strip().lower()
+    while(i < len(lines)):
+        p_line = prosecutor_lines[i].strip()
+        d_line = defense_lines[i].strip()
         
         # Prosecutor information.
         if("name:" in p_line):
@@ -613,7 +636,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
             prosecutor_scNr_block = False
             prosecutor_phoneNr_block = False
             attorney_dict["prosecutors"][prosecutor_idx]["address"] = p_line.split("address:")[1].strip()
-        elif("cpcms" not in p_line and "recent entries" not in p_line and "administrative" not in p_line and "docket sheet" not in p_line and "comply" not in p_line and "set fort" not in p_line and "commonwealth" not in p_line and "pennsylvania" not in p_line and "these reports" not in p_line and "information" not in p_line):
+        elif("commonwealth" not in p_line and "pennsylvania" not in p_line and "information" not in p_line):
             if(prosecutor_name_block):
                 attorney_dict["prosecutors"][prosecutor_idx]["name"] = attorney_dict["prosecutors"][prosecutor_idx]["name"] + "|" + p_line
             elif(prosecutor_scNr_block):
@@ -675,7 +698,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
             defense_phoneNr_block = False
             defense_address_block = False
             attorney_dict["defense"][defense_idx]["representing"] = d_line.split("representing:")[1].strip()
-        elif("cpcms" not in d_line and "recent entries" not in d_line and "administrative" not in d_line and "docket sheet" not in d_line and "comply" not in d_line and "set fort" not in d_line and "commonwealth" not in d_line and "pennsylvania" not in d_line and "these reports" not in d_line and "information" not in d_line and "printed" not in d_line):
+        elif("commonwealth" not in d_line and "pennsylvania" not in d_line and "information" not in d_line):
             if(defense_name_block):
                 attorney_dict["defense"][defense_idx]["name"] = attorney_dict["defense"][defense_idx]["name"] + "|" + d_line
             elif(defense_scNr_block):
@@ -695,11 +718,12 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
 
 # Extract bail information from the BAIL / BAIL INFORMATION section.
 # Args:
-#   text(str): The text containing the bail information.
+#   lines (SectionView): The lower case lines containing the bail information.
 # Return:
 #   dict: A dictionary containing the bail information.
-def extract_bail(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_bail(lines: SectionView) -> dict[str, str | list]:
+    bail_columns = column_spec("CP", "BAIL ACTIONS")
+    surety_columns = column_spec("CP", "SURETIES")
     i = 0
     bail_dict = {}
 
@@ -715,38 +739,34 @@ def extract_bail(text:str) -> dict[str, str | list]:
     surety_nr = -1
     surety_idx = "surety_nr_" + str(surety_nr)
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if("nebbia status:" in line):
             bail_dict["nebbia_status"] = line.split("nebbia status:")[1].strip()
         elif("bail action" in line):
+            bail_columns = column_spec("CP", "BAIL ACTIONS", line)
             bail_block = True
             surety_block = False
         elif("surety type" in line):
+            surety_columns = column_spec("CP", "SURETIES", line)
             surety_block = True
             bail_block = False
 
-        if(bail_block and "cpcms" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set fort" not in line and "bail action" not in line and "court case" not in line and "commonwealth" not in line and line.strip() != ""):
+        if(bail_block and "bail action" not in line and "court case" not in line and "commonwealth" not in line and line.strip() != ""):
             # If the bail date is blank, the bail action overflowed onto the next line.
-            if(line[38:65].strip() == ""):
-                bail_dict["bail_info"][bail_idx]["bail_action"] = bail_dict["bail_info"][bail_idx]["bail_action"] +  " " + line[:38].strip()
-                bail_dict["bail_info"][bail_idx]["bail_type"] = bail_dict["bail_info"][bail_idx]["bail_type"] + " " + line[65:88].strip()
+            if(bail_columns.value(line, "date") == ""):
+                bail_dict["bail_info"][bail_idx]["bail_action"] = bail_dict["bail_info"][bail_idx]["bail_action"] +  " " + bail_columns.value(line, "bail_action")
+                bail_dict["bail_info"][bail_idx]["bail_type"] = bail_dict["bail_info"][bail_idx]["bail_type"] + " " + bail_columns.value(line, "bail_type")
             # Otherwise, continue collecting the surety information as normal.
             else:
                 # Initialize starting values.
                 bail_nr += 1
                 bail_idx = "bail_nr_" + str(bail_nr)
-                bail_dict["bail_info"][bail_idx] = {}
 
                 # Set values for bail.
-                bail_dict["bail_info"][bail_idx]["bail_action"] = line[:38].strip()
-                bail_dict["bail_info"][bail_idx]["date"] = line[38:65].strip()
-                bail_dict["bail_info"][bail_idx]["bail_type"] = line[65:88].strip()
-                bail_dict["bail_info"][bail_idx]["originating_court"] = line[88:118].strip()
-                bail_dict["bail_info"][bail_idx]["percentage"] = line[118:132].strip()
-                bail_dict["bail_info"][bail_idx]["amount"] = line[132:].strip()
-        elif(surety_block and "cpcms" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set fort" not in line and "surety type" not in line and "court case" not in line and "commonwealth" not in line and line.strip() != ""):
+                bail_dict["bail_info"][bail_idx] = bail_columns.row(line)
+        elif(surety_block and "surety type" not in line and "court case" not in line and "commonwealth" not in line and line.strip() != ""):
             # If the surety type is blank, the surety name overflowed onto the next line.
             if(line[:27].strip() == ""):
                 bail_dict["surety_info"][surety_idx]["surety_name"] = bail_dict["surety_info"][surety_idx]["surety_name"] +  " " + line[27:54].strip()
@@ -755,15 +775,9 @@ def extract_bail(text:str) -> dict[str, str | list]:
                 # Initialize starting values.
                 surety_nr += 1
                 surety_idx = "surety_nr_" + str(surety_nr)
-                bail_dict["surety_info"][surety_idx] = {}
 
                 # Set values for surety.
-                bail_dict["surety_info"][surety_idx]["surety_type"] = line[:38].strip()
-                bail_dict["surety_info"][surety_idx]["surety_name"] = line[38:65].strip()
-                bail_dict["surety_info"][surety_idx]["posting_status"] = line[65:88].strip()
-                bail_dict["surety_info"][surety_idx]["posting_date"] = line[88:105].strip()
-                bail_dict["surety_info"][surety_idx]["security_type"] = line[105:133].strip()
-                bail_dict["surety_info"][surety_idx]["security_amount"] = line[133:].strip()
+                bail_dict["surety_info"][surety_idx] = surety_columns.row(line)
 
         i += 1
     
@@ -771,19 +785,19 @@ def extract_bail(text:str) -> dict[str, str | list]:
 
 # Extract case financial information from the CASE FINANCIAL INFORMATION section.
 # Args:
-#   text(str): The text containing the case financial information.
+#   lines (SectionView): The lower case lines containing the case financial information.
 # Return:
 #   dict: A dictionary containing the case financial information.
-def extract_case_financial_info(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_financial_info(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "CASE FINANCIAL INFORMATION")
     i = 0
     case_financial_dict = {}
     fee_nr = -1
     fee_idx = "fee_nr_" + str(fee_nr)
     case_financial_block = False
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if(re.search(r"costs\/fees$|restitution$|fines$", line.strip())):
             case_financial_block = True
@@ -791,21 +805,15 @@ def extract_case_financial_info(text:str) -> dict[str, str | list]:
         header_line1 = "assessment" in line or "payments" in line or "adjustments" in line or "non monetary" in line or "balance" in line
         header_line2 = "defendant" in line and "payments" in line
 
-        if(not re.search(r"costs\/fees$|restitution$|fines$", line.strip()) and case_financial_block and "reflected on these docket sheets" not in line and "assume any liability for inaccurate" not in line and "docket sheet information should" not in line and "who does not comply" not in line and "liability as set forth" not in line and "assessment is subrogated" not in line and "cpcms" not in line and line.strip() != "" and not header_line1 and not header_line2):
+        if(not re.search(r"costs\/fees$|restitution$|fines$", line.strip()) and case_financial_block and "assessment is subrogated" not in line and line.strip() != "" and not header_line1 and not header_line2):
             # If the first part is not blank but every other part is blank, then the description overflowed onto the next line.
             if(line[:62].strip() != "" and line[62:83].strip() == "" and line[83:99].strip() == "" and line[99:116].strip() == "" and line[116:133].strip() == "" and line[133:].strip() == ""):
                 case_financial_dict[fee_idx]["description"] = case_financial_dict[fee_idx]["description"] + " " + line.strip()
             else:
                 fee_nr += 1
                 fee_idx = "fee_nr_" + str(fee_nr)
-                case_financial_dict[fee_idx] = {}
 
-                case_financial_dict[fee_idx]["description"] = line[:60].strip()
-                case_financial_dict[fee_idx]["assessment"] = line[60:78].strip()
-                case_financial_dict[fee_idx]["payment"] = line[78:99].strip()
-                case_financial_dict[fee_idx]["adjustment"] = line[99:116].strip()
-                case_financial_dict[fee_idx]["non_monetary_payment"] = line[116:133].strip()
-                case_financial_dict[fee_idx]["balance"] = line[133:].strip()
+                case_financial_dict[fee_idx] = columns.row(line)
 
         i += 1
     
@@ -813,34 +821,31 @@ def extract_case_financial_info(text:str) -> dict[str, str | list]:
 
 # Extract related cases from the RELATED CASES section.
 # Args:
-#   text(str): The text containing the related cases.
+#   lines (SectionView): The lower case lines containing the related cases.
 # Return:
 #   dict: A dictionary containing the related cases.
-def extract_related_cases(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_related_cases(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("CP", "RELATED CASES")
     i = 0
     related_cases_dict = {}
     related_case_nr = -1
     related_case_idx = "related_case_nr_" + str(related_case_nr)
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
-        if("related docket no" not in line and "reflected on these docket sheets" not in line and "assume any liability for inaccurate" not in line and "docket sheet information should" not in line and "who does not comply" not in line and "liability as set forth" not in line and "cpcms" not in line and line.strip() != ""):
+        if("related docket no" not in line and line.strip() != ""):
             # If only the relation reason column has an entry and every other column is empty, then the reason column overflowed on to the next line.
-            if(line[114:].strip() != "" and line[:43].strip() == "" and line[43:89].strip() == "" and line[89:114].strip() == ""):
+            row = columns.row(line)
+            if(row["relation_reason"] != "" and row["related_docket_nr"] == "" and row["related_case_caption"] == "" and row["related_court"] == ""):
                 related_cases_dict[related_case_idx]["relation_reason"] = related_cases_dict[related_case_idx]["relation_reason"] + " " + line.strip()
             # If the related court and relation reason columns are blank, it is a bold line categorizing the related cases together.
             # I do not really think we need this information.
-            elif(line[89:114].strip() != "" and line[114:].strip() != ""):
+            elif(row["related_court"] != "" and row["relation_reason"] != ""):
                 related_case_nr += 1
                 related_case_idx = "related_case_nr_" + str(related_case_nr)
-                related_cases_dict[related_case_idx] = {}
 
-                related_cases_dict[related_case_idx]["related_docket_nr"] = line[:43].strip()
-                related_cases_dict[related_case_idx]["related_case_caption"] = line[43:89].strip()
-                related_cases_dict[related_case_idx]["related_court"] = line[89:114].strip()
-                related_cases_dict[related_case_idx]["relation_reason"] = line[114:].strip()
+                related_cases_dict[related_case_idx] = row
 
         i += 1
     
@@ -848,11 +853,13 @@ def extract_related_cases(text:str) -> dict[str, str | list]:
 
 # Extract payment plan summary from the PAYMENT PLAN SUMMARY section.
 # Args:
-#   text(str): The text containing the payment plan summary.
+#   lines (SectionView): The lower case lines containing the payment plan summary.
 # Return:
 #   dict: A dictionary containing the payment plan summary.
-def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_payment_plan_summary(lines: SectionView) -> dict[str, str | list]:
+    payment_plan_columns = column_spec("CP", "PAYMENT PLANS")
+    participant_columns = column_spec("CP", "PAYMENT PLAN PARTICIPANTS")
+    payment_columns = column_spec("CP", "PAYMENTS")
     i = 0
     payment_plan_dict = {}
     payment_plan_info_block = False
@@ -860,8 +867,8 @@ def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
     payment_nr = -1
     payment_idx = "payment_nr_" + str(payment_nr)
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if("payment plan no" in line or "responsible participant" in line):
             payment_plan_info_block = True
@@ -870,39 +877,29 @@ def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
             payment_plan_info_block = False
             payment_plan_history_block = True
 
-        if(payment_plan_info_block and "payment plan no" not in line and "responsible participant" not in line and "reflected on these docket sheets" not in line and "assume any liability for inaccurate" not in line and "docket sheet information should" not in line and "who does not comply" not in line and "liability as set forth" not in line and "cpcms" not in line and line.strip() != ""):
+        if(payment_plan_info_block and "payment plan no" not in line and "responsible participant" not in line and line.strip() != ""):
             # If there is a date or a payment plan ID, then it is the first line of the payment plan information.
             if(re.search(r"\d{2}/\d{2}/\d{4}", line) or re.search(r"\d{2}-\d{4}-\w+", line)):
-                payment_plan_dict["payment_plan_nr"] = line[:41].strip()
-                payment_plan_dict["payment_plan_freq"] = line[41:74].strip()
-                payment_plan_dict["next_due_date"] = line[74:98].strip()
-                payment_plan_dict["active"] = line[98:133].strip()
-                payment_plan_dict["overdue_amount"] = line[133:].strip()
+                payment_plan_dict.update(payment_plan_columns.row(line))
             else:
-                payment_plan_dict["participant"] = line[:98].strip()
-                payment_plan_dict["suspended"] = line[98:133].strip()
-                payment_plan_dict["next_due_amount"] = line[133:].strip()
+                payment_plan_dict.update(participant_columns.row(line))
                 
-        elif(payment_plan_history_block and "payment plan no" not in line and "responsible participant" not in line and "on these docket sheets" not in line and "assume any liability for inaccurate" not in line and "docket sheet information should" not in line and "who does not comply" not in line and "liability as set forth" not in line and "cpcms" not in line and "payment plan history:" not in line and line.strip() != ""):
+        elif(payment_plan_history_block and "payment plan no" not in line and "responsible participant" not in line and "payment plan history:" not in line and line.strip() != ""):
             payment_nr += 1
             payment_idx = "payment_nr_" + str(payment_nr)
-            payment_plan_dict[payment_idx] = {}
 
-            payment_plan_dict[payment_idx]["receipt_date"] = line[:82].strip()
-            payment_plan_dict[payment_idx]["payor_name"] = line[82:110].strip()
-            payment_plan_dict[payment_idx]["participant_role"] = line[110:132].strip()
-            payment_plan_dict[payment_idx]["amount_paid"] = line[132:].strip()
+            payment_plan_dict[payment_idx] = payment_columns.row(line)
 
         i += 1
     
     return(payment_plan_dict)
 
-def extract_all(pdf_path: str) -> dict[str, str | dict]:
-    # Join together all pages and lines into one string.
-    text = extract_text_from_pdf(pdf_path)
+def extract_all(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> dict[str, str | dict]:
+    # Read the body of every page.
+    pages = extract_text_from_pdf(pdf_path, cache_dir, engine)
 
     # Partition the text by sections.
-    sections = extract_sections(text)
+    sections = extract_sections(pages)
 
     case_info = (
         extract_case_information(sections.get("CASE INFORMATION", ""))
@@ -2,41 +2,31 @@ import re
 import json
 import pandas as pd
 import pdfplumber
+from parse_pdf_text_functions import extract_page_texts, crop_page_bands, split_document_lines, find_section_headers, SectionView
+from parse_pdf_column_functions import column_spec
 
 # Extract text from PDF.
 # Args:
 #   pdf_path (str): File path to the PDF.
+#   cache_dir (str): Directory of the layout text cache. If None, the text is always extracted from the PDF.
+#   engine (str): Engine used to extract the text, either "pdfplumber" or "pdfium" (faster, same text).
 # Returns:
-#   string: A single string which is the concatenated version of all pages and lines in the PDF.
-def extract_text_from_pdf(pdf_path: str) -> str:
-    # Open up the PDF and read in each page.
-    pages = pdfplumber.open(pdf_path).pages
-    # List comprehension. Structure is expression FOR x IN y.
-    # Execute expression on each x in y.
-    # Here we extract the text from each page. Then we separate each text element with the new line character.
-    alltext = "\n".join([page.extract_text(keep_blank_chars=True, layout=True, x_density = 3.9, y_density = 13) for page in pages])
-    return alltext
-
-# Extracts sections from the document text.
+#   list: The text of each page in the PDF, without the header and footer repeated on every page.
+def extract_text_from_pdf(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> list[str]:
+    # Extract the text from each page (or read it from the cache if we have already extracted it once before).
+    pages = extract_page_texts(pdf_path, keep_blank_chars = True, x_density = 3.9, y_density = 13, cache_dir = cache_dir, engine = engine)
+    # Crop the header and footer bands off every page so only the body of each page is left.
+    return [crop_page_bands(page) for page in pages]
+
+# Extracts sections from the pages of the document.
 # Args:
-#   text (str): The text of the document.
+#   pages (list): The text of each page, without its header and footer (see extract_text_from_pdf).
 # Returns:
-#   dict: A dictionary containing the extracted sections with the section headers as keys.
-def extract_sections(text: str) -> dict[str, str]:
-    # Find lines that contain 4 or more upper-case characters and/or slashes and/or hyphens (and are bookended by white space).
-    # These will be the section headers.
-    section_header_pattern = re.compile(r"^\s*[A-Z\s\/\-]{4,}\s*$", re.MULTILINE)
-
-    # Find all section headers and their starting character index.
-    matches = re.finditer(section_header_pattern, text)
-
-    # Iterate through each match and find the starting character index as well as the section header.
-    headers = [(match.start(), match.group().strip()) for match in matches]
-    # Drop any potential headers that are just empty whitespace or are only 3 non-white space characters.
-    # We need to drop the 3 non-white space character headers because there are some acronyms that are all capital lettrs
-    # and are surrounded only by white space in the CASE FINANCIAL INFORMATION section. E.g., OAG and PSP.
-    # We also need to drop RRRI, CJES, and JCPS as headers. This can show as a punishment condition.
-    headers = [h for h in headers if len(h[1]) > 3 and h[1] != "RRRI" and h[1] != "CJES" and h[1] != "JCPS"]
+#   dict: A dictionary containing the extracted sections with the section headers as keys. Each section is a view of the document's lower case lines (see SectionView).
+def extract_sections(pages: list[str]) -> dict[str, SectionView]:
+    # Find lines that only contain upper-case characters and/or slashes and/or hyphens (and white space).
+    # Together with the blank lines around them, these will be the section headers.
+    section_header_pattern = re.compile(r"[A-Z\s\/\-]*")
 
     standard_headers = [
         "DEFENDANT INFORMATION", "CASE INFORMATION", "STATUS INFORMATION", "CALENDAR EVENTS", "CASE PARTICIPANTS", "CHARGES",
@@ -44,67 +34,76 @@ def extract_sections(text: str) -> dict[str, str]:
         "CASE FINANCIAL INFORMATION", "PAYMENT PLAN SUMMARY", "DOCKET"
     ]
 
+    # Split the document into lines, and lower case them, once. The sections only point into these lines.
+    lines, lowered, page_starts = split_document_lines(pages)
+
     # Dictionary to store sections
     sections = {}
 
     # Way to track previous header.
     prior_header = ""
 
-    # Iterate over headers and extract sections.
-    for i in range(len(headers)):
-        start_index = headers[i][0]
-        header = headers[i][1]
-        
-        # Set the end index to be the start index of the next section header (or the end of the text file).
-        end_index = headers[i + 1][0] if i + 1 < len(headers) else len(text)
-
-        # Extract section text.
-        section_text = text[start_index:end_index].strip()
-
-        # Sometimes, the description for a charge in CHARGES will be all capitalized, and it will take up multiple lines.
-        # Meaning to the parser, it looks like a new section header. We need to fix that.
-        # If the header is not in our standard list of headers AND the prior header is CHARGES, then the header is not really a header.
-        if(header not in standard_headers and prior_header == "CHARGES"):
-            header = "CHARGES"
-        # Similar thing happens for ATTORNEY INFORMATION and attorney addresses (sometimes the address is capitalized).
-        elif(header not in standard_headers and prior_header == "ATTORNEY INFORMATION"):
-            header = "ATTORNEY INFORMATION"
-        else:
-            # Remove the header from the section text.
-            section_text = section_text[len(header):].strip()
-
-        # The BAIL and CALENDAR EVENTS section headers does not carry over to new pages
-        # To capture the info which overflows onto the next page, set the DOCKET header to the previous header (i.e., BAIL or CALENDAR EVENTS). Then remove the junk from the top of the docket.
-        if re.search("^DOCKET$", header) and ("BAIL" in headers[i - 1][1] or "CALENDAR EVENTS" in headers[i - 1][1]) and i - 2 > 0:
-            header = headers[i - 1][1]
-            section_text_list = [line for line in section_text.split("\n") if line.strip() != ""]
-            section_text = "\n".join(section_text_list[5:])
-
-        # Reduce different versions of the same header to a single version
-        if "ATTORNEY INFORMATION" in header:
-            header = "ATTORNEY INFORMATION"
-        elif "BAIL INFORMATION" in header:
-            header = "BAIL"
-        prior_header = header
-            
-        # Add the current section header to our dictionary of sections.
-        # setdefault searches for the key in your dictionary if it exists.
-        # If it does exist, it returns the value associated with the key. If it does not exist, the key is inserted with the provided default value.
-        sections.setdefault(header, "")
-
-        # Add the section text to the dictionary under the header key.
-        sections[header] += f"\n{section_text}"
+    for page_nr in range(len(pages)):
+        page_start = page_starts[page_nr]
+        page_end = page_starts[page_nr + 1] if page_nr + 1 < len(pages) else len(lines)
+
+        # Find all section headers and their first line.
+        # We look for them page by page so a header at the bottom of one page never runs into a header at the top of the next.
+        headers = find_section_headers(lines, page_start, page_end, section_header_pattern)
+        # Drop any potential headers that are only 3 non-white space characters.
+        # We need to drop the 3 non-white space character headers because there are some acronyms that are all capital lettrs
+        # and are surrounded only by white space in the CASE FINANCIAL INFORMATION section. E.g., OAG and PSP.
+        # We also need to drop RRRI, CJES, and JCPS as headers. This can show as a punishment condition.
+        headers = [h for h in headers if len(h[2]) > 3 and h[2] != "RRRI" and h[2] != "CJES" and h[2] != "JCPS"]
+
+        # Section headers (e.g., BAIL or CALENDAR EVENTS) do not carry over to new pages, so the lines above the first header of a page belong to the section the last page ended in.
+        if(prior_header != ""):
+            sections[prior_header].add_range(page_start, headers[0][0] if len(headers) > 0 else page_end)
+
+        # Iterate over headers and extract sections.
+        for i in range(len(headers)):
+            # The section starts after the header, and ends at the next section header (or the end of the page).
+            start_index = headers[i][1]
+            header = headers[i][2]
+            end_index = headers[i + 1][0] if i + 1 < len(headers) else page_end
+
+            # Sometimes, the description for a charge in CHARGES will be all capitalized, and it will take up multiple lines.
+            # Meaning to the parser, it looks like a new section header. We need to fix that.
+            # If the header is not in our standard list of headers AND the prior header is CHARGES, then the header is not really a header (so we keep its lines).
+            if(header not in standard_headers and prior_header == "CHARGES"):
+                header = "CHARGES"
+                start_index = headers[i][0]
+            # Similar thing happens for ATTORNEY INFORMATION and attorney addresses (sometimes the address is capitalized).
+            elif(header not in standard_headers and prior_header == "ATTORNEY INFORMATION"):
+                header = "ATTORNEY INFORMATION"
+                start_index = headers[i][0]
+
+            # Reduce different versions of the same header to a single version
+            if "ATTORNEY INFORMATION" in header:
+                header = "ATTORNEY INFORMATION"
+            elif "BAIL INFORMATION" in header:
+                header = "BAIL"
+            prior_header = header
+
+            # Add the current section header to our dictionary of sections.
+            # setdefault searches for the key in your dictionary if it exists.
+            # If it does exist, it returns the value associated with the key. If it does not exist, the key is inserted with the provided default value.
+            sections.setdefault(header, SectionView(lowered, lines))
+
+            # Add the lines of the section to the view under the header key.
+            sections[header].add_range(start_index, end_index)
 
     return sections
 
 # Extracts the defendant's information from the DEFENDANT INFORMATION section.
 # Args:
-#   text (str): The text containing the defendant's information.
+#   lines (SectionView): The lower case lines containing the defendant's information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_defendant_information(text: str) -> dict[str, str | list]:
-    split = text.split("\n")
-    split = [line for line in split if line.strip() != ""]
+def extract_defendant_information(lines: SectionView) -> dict[str, str | list]:
+    # The address type keeps its case, so keep the lines as they are in the PDF too.
+    original_lines = [lines.original(j) for j, line in enumerate(lines) if line.strip() != ""]
+    lines = [line for line in lines if line.strip() != ""]
     extracted_info = {}
     i = 0
 
@@ -118,8 +117,8 @@ def extract_defendant_information(text: str) -> dict[str, str | list]:
     #   Line 7 is if the defendant requested a public defender.
     #   Line 8 is if an application has been provided for the appointment of a public defender.
     #   Line 9 is if the defendant has been finger printed.
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
 
         if("name:" in line or "sex:" in line):
             extracted_info["name"] = line.split("name:")[1].split("sex:")[0].strip()
@@ -130,17 +129,17 @@ def extract_defendant_information(text: str) -> dict[str, str | list]:
             extracted_info["race"] = line.split("date of birth:")[1].split("race:")[1].strip()
             i += 1
         elif("address(es):" in line):
-            if("advised of his right to apply for assignment of counsel?" in split[i + 1].lower()):
+            if("advised of his right to apply for assignment of counsel?" in lines[i + 1]):
                 extracted_info["address_type"] = ""
-                extracted_info["counsel"] = split[i + 1].lower().split("advised of his right to apply for assignment of counsel?")[1].strip()
+                extracted_info["counsel"] = lines[i + 1].split("advised of his right to apply for assignment of counsel?")[1].strip()
             else:
-                extracted_info["address_type"] = split[i + 1].split()
+                extracted_info["address_type"] = original_lines[i + 1].split()
 
-            if("public defender requested by the defendant?" in split[i + 2].lower()):
+            if("public defender requested by the defendant?" in lines[i + 2]):
                 extracted_info["address"] = ""
-                extracted_info["defender_requested"] = split[i + 2].lower().split("public defender requested by the defendant?")[1].strip()
+                extracted_info["defender_requested"] = lines[i + 2].split("public defender requested by the defendant?")[1].strip()
             else:
-                extracted_info["address"] = re.split("\s{2,}", split[i + 2].strip().lower())
+                extracted_info["address"] = re.split("\s{2,}", lines[i + 2].strip())
             i += 3
         elif("advised of his right to apply for assignment of counsel?" in line):
             extracted_info["counsel"] = line.split("advised of his right to apply for assignment of counsel?")[1].strip()
@@ -162,11 +161,10 @@ def extract_defendant_information(text: str) -> dict[str, str | list]:
 
 # Extracts the case information from the CASE INFORMATION section.
 # Args:
-#   text(str): The text containing the case information.
+#   lines (SectionView): The lower case lines containing the case information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_case_information(text: str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_information(lines: SectionView) -> dict[str, str | list]:
     extracted_info = {}
     i = 0
 
@@ -179,8 +177,8 @@ def extract_case_information(text: str) -> dict[str, str | list]:
     #   Line 5 is disposition and disposition date.
     #   Line 6 is county and township.
     #   Line 7 is case status.
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         
         if("issue date:" in line):
             extracted_info["issue_date"] = line.split("issue date:")[1].strip()
@@ -190,8 +188,8 @@ def extract_case_information(text: str) -> dict[str, str | list]:
                 extracted_info["judge_assigned"] = line.split("judge assigned:")[1].split("issue date:")[0].strip()
                 
                 # Check the next line if the judge's name takes up multiple lines.
-                while("otn" not in split[i + j].lower() and "file date" not in split[i + j].lower() and "otn/lotn" not in split[i + j]):
-                    lookahead_line = split[i + j].lower().strip()
+                while("otn" not in lines[i + j] and "file date" not in lines[i + j] and "otn/lotn" not in lines[i + j]):
+                    lookahead_line = lines[i + j].strip()
                     extracted_info["judge_assigned"] = extracted_info["judge_assigned"] + " " + lookahead_line
                     j += 1
 
@@ -239,11 +237,11 @@ def extract_case_information(text: str) -> dict[str, str | list]:
 
 # Extracts status information from the STATUS INFORMATION section.
 # Args:
-#   text(str): The text containing the status information.
+#   lines (SectionView): The lower case lines containing the status information.
 # Return:
 #   dict: A dictionary containing the status information.
-def extract_status_information(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_status_information(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "STATUS INFORMATION")
     extracted_info = {}
     
     # Line counter.
@@ -251,17 +249,17 @@ def extract_status_information(text:str) -> dict[str, str | list]:
     status_nr = -1
     status_idx = "status_nr_" + str(status_nr)
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
         
+        # The header row tells where the columns start.
+        if("status date" in line and "processing status" in line):
+            columns = column_spec("MJ", "STATUS INFORMATION", line)
         # If it's not a header row, the end of the document, or an empty line, then it is a status information row.
-        if("case status" not in line and "status date" not in line and "processing status" not in line and "printed:" not in line and "recent entries made" not in line and "administrative office of penn" not in line and "docket sheet information should" not in line and "comply with the provi" not in line and "set forth in 18" not in line and "district judge" not in line and line.strip() != ""):
+        elif("case status" not in line and "status date" not in line and "processing status" not in line and line.strip() != ""):
             status_nr += 1
             status_idx = "status_nr_" + str(status_nr)
-            extracted_info[status_idx] = {}
-            extracted_info[status_idx]["case_status"] = line[:35].strip()
-            extracted_info[status_idx]["status_date"] = line[35:56].strip()
-            extracted_info[status_idx]["processing_status"] = line[56:].strip()
+            extracted_info[status_idx] = columns.row(line)
         
         i += 1
     
@@ -269,11 +267,11 @@ def extract_status_information(text:str) -> dict[str, str | list]:
 
 # Extracts calendar events from the CALENDAR EVENTS section.
 # Args:
-#   text(str): The text containing the calendar events information.
+#   lines (SectionView): The lower case lines containing the calendar events information.
 # Return:
 #   dict: A dictionary containing the calendar events information.
-def extract_calendar_events(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_calendar_events(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "CALENDAR EVENTS")
     extracted_info = {}
     
     # Line counter.
@@ -281,30 +279,22 @@ def extract_calendar_events(text:str) -> dict[str, str | list]:
     event_nr = -1
     event_idx = "event_nr_" + str(event_nr)
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
         
         # If we find a date on the line (that is not at the end of the document), then it is a calendar event.
-        if(re.search(r"\d{2}/\d{2}/\d{4}", line) and "printed:" not in line):
+        if(re.search(r"\d{2}/\d{2}/\d{4}", line)):
             event_nr += 1
             event_idx = "event_nr_" + str(event_nr)
-            extracted_info[event_idx] = {}
 
-            extracted_info[event_idx]["event_type"] = line[:37].strip()
-            extracted_info[event_idx]["start_date"] = line[37:49].strip()
-            extracted_info[event_idx]["start_time"] = line[49:65].strip()
-            extracted_info[event_idx]["room"] = line[65:90].strip()
-            extracted_info[event_idx]["judge"] = line[90:127].strip()
-            extracted_info[event_idx]["schedule_status"] = line[127:].strip()
+            extracted_info[event_idx] = columns.row(line)
 
+        # The header row tells where the columns start.
+        elif("event type" in line and "start date" in line):
+            columns = column_spec("MJ", "CALENDAR EVENTS", line)
         # If we do not find a date, but it is not the end of the document nor is it the header row or an empty row, then it is an overflow row.
-        elif("case calendar" not in line and "event type" not in line and "printed:" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply" not in line and "set forth" not in line and not re.search("magisterial\s*district\s*judge [0-9]{2}-", line) and line.strip() != ""):
-            extracted_info[event_idx]["event_type"] = extracted_info[event_idx]["event_type"] + " " + line[:37].strip()
-            extracted_info[event_idx]["start_date"] = extracted_info[event_idx]["start_date"] + " " + line[37:49].strip()
-            extracted_info[event_idx]["start_time"] = extracted_info[event_idx]["start_time"] + " " + line[49:65].strip()
-            extracted_info[event_idx]["room"] = extracted_info[event_idx]["room"] + " " + line[65:90].strip()
-            extracted_info[event_idx]["judge"] = extracted_info[event_idx]["judge"] + " " + line[90:127].strip()
-            extracted_info[event_idx]["schedule_status"] = extracted_info[event_idx]["schedule_status"] + " " + line[127:].strip()
+        elif("case calendar" not in line and "event type" not in line and line.strip() != ""):
+            columns.extend(extracted_info[event_idx], line)
         
         i += 1
     
@@ -312,11 +302,11 @@ def extract_calendar_events(text:str) -> dict[str, str | list]:
 
 # Extracts case participants from the CASE PARTICIPANTS section.
 # Args:
-#   text(str): The text containing the case participants.
+#   lines (SectionView): The lower case lines containing the case participants.
 # Return:
 #   dict: A dictionary containing the case participant information.
-def extract_case_participants(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_participants(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "CASE PARTICIPANTS")
     extracted_info = {}
     
     # Line counter.
@@ -324,17 +314,18 @@ def extract_case_participants(text:str) -> dict[str, str | list]:
     participant_nr = -1
     participant_idx = "participant_nr_" + str(participant_nr)
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
         
+        # The header row tells where the columns start.
+        if("participant type" in line):
+            columns = column_spec("MJ", "CASE PARTICIPANTS", line)
         # If it is not the end of the document nor is it the header row or an empty row, then it is a case participant.
-        if("participant type" not in line and "printed:" not in line and "recent entries" not in line and "administrative" not in line and "docket sheet" not in line and "comply with the" not in line and "set forth in" not in line and "magisterial district judge" not in line and line != ""):
+        elif(line != ""):
             participant_nr += 1
             participant_idx = "participant_nr_" + str(participant_nr)
-            extracted_info[participant_idx] = {}
 
-            extracted_info[participant_idx]["participant_type"] = line[:45].strip()
-            extracted_info[participant_idx]["name"] = line[45:].strip()
+            extracted_info[participant_idx] = columns.row(line)
         
         i += 1
     
@@ -342,37 +333,35 @@ def extract_case_participants(text:str) -> dict[str, str | list]:
 
 # Extracts the charges from the CHARGES section.
 # Args:
-#   text(str): The text containing the charges information.
+#   lines (SectionView): The lower case lines containing the charges information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_charges(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_charges(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "CHARGES")
     extracted_info = {}
     charge_nr = -1
     charge_nr_idx = "charge_nr_" + str(charge_nr)
     i = 0
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
-        # Skip blank lines, column header line, and junk lines.
-        if("offense dt." in line or line.strip() == "" or "reflected on these docket sheets" in line or "inaccurate or delayed data" in line or "docket sheet information should" in line or "not comply with the" in line or "liability as set forth" in line or "printed:" in line or "magisterial district judge" in line):
+        # The column header line tells where the columns start.
+        if("offense dt." in line):
+            columns = column_spec("MJ", "CHARGES", line)
+            i += 1
+        # Skip blank lines. The page header and footer are already cropped off (see crop_page_bands).
+        elif(line.strip() == ""):
             i += 1
         # The § character indicates a new charge. However, not every charge has §. See ds_Blair_MJ_24103_CR_0000021_2011.
         elif("§" in line or "unspecified object crime" in line):
             charge_nr += 1
             charge_nr_idx = "charge_nr_" + str(charge_nr)
-            extracted_info[charge_nr_idx] = {}
 
             # Each charge adheres to the following pattern.
-            extracted_info[charge_nr_idx]["nr"] = line[:17].strip()
-            extracted_info[charge_nr_idx]["charge"] = line[17:45].strip()
-            extracted_info[charge_nr_idx]["grade"] = line[45:53].strip()
-            extracted_info[charge_nr_idx]["description"] = line[53:108].strip()
-            extracted_info[charge_nr_idx]["offense_date"] = line[108:121].strip()
-            extracted_info[charge_nr_idx]["disposition"] = line[121:].strip()
+            extracted_info[charge_nr_idx] = columns.row(line)
             i += 1
-        # If the line is not a header line, a blank line, a new charge, or a junk line, then it is the description from the previous charge overflowing onto a new line.
+        # If the line is not a header line, a blank line or a new charge, then it is the description from the previous charge overflowing onto a new line.
         else:
             extracted_info[charge_nr_idx]["description"] = extracted_info[charge_nr_idx]["description"] + " " + line.strip()
             i += 1
@@ -381,11 +370,13 @@ def extract_charges(text:str) -> dict[str, str | list]:
 
 # Extracts the disposition / sentencing details from the DISPOSITION / SENTENCING DETAILS section.
 # Args:
-#   text(str): The text containing the disposition and sentencing details.
+#   lines (SectionView): The lower case lines containing the disposition and sentencing details.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_disp_sent(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_disp_sent(lines: SectionView) -> dict[str, str | list]:
+    disposition_columns = column_spec("MJ", "CASE DISPOSITION")
+    offense_columns = column_spec("MJ", "OFFENSES")
+    penalty_columns = column_spec("MJ", "PENALTIES")
     extracted_info = {}
     i = 0
     disposition_block = False
@@ -400,14 +391,16 @@ def extract_disp_sent(text:str) -> dict[str, str | list]:
     penalty_nr = -1
     penalty_nr_idx = "penalty_nr_" + str(penalty_nr)
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if("case disposition" in line):
+            disposition_columns = column_spec("MJ", "CASE DISPOSITION", line)
             disposition_block = True
             offense_block = False
             penalty_block = False
         elif("offense disposition" in line):
+            offense_columns = column_spec("MJ", "OFFENSES", line)
             offense_block = True
             disposition_block = False
             penalty_block = False
@@ -423,21 +416,16 @@ def extract_disp_sent(text:str) -> dict[str, str | list]:
             disposition_block = False
             penalty_block = False
         # As long as we are not on a column header, a junk line, or the end of the page, we are in the disposition block.
-        elif(disposition_block and "case disposition" not in line and line.strip() != "" and "reflected on these" not in line and "inaccurate or delayed" not in line and "docket sheet info" not in line and "not comply with" not in line and "liability as set" not in line and "printed:" not in line and "magisterial district judge" not in line):
-            extracted_info["case_disposition"] = line[:69].strip()
-            extracted_info["disposition_date"] = line[69:103].strip()
-            extracted_info["defendant_present"] = line[103:].strip()
+        elif(disposition_block and "case disposition" not in line and line.strip() != ""):
+            extracted_info.update(disposition_columns.row(line))
         # As long as we are not on a column header, a junk line, or the end of the page, we are in the offense block.
-        elif(offense_block and "offense disposition" not in line and line.strip() != "" and "reflected on these" not in line and "inaccurate or delayed" not in line and "docket sheet info" not in line and "not comply with" not in line and "liability as set" not in line and "printed:" not in line and "magisterial district judge" not in line):
+        elif(offense_block and "offense disposition" not in line and line.strip() != ""):
             # If we find a number, that is the offense sequence number. It is a new offense.
             if(re.search("[0-9]+", line)):
                 offense_nr += 1
                 offense_nr_idx = "offense_nr_" + str(offense_nr)
-                extracted_info[offense_nr_idx] = {}
 
-                extracted_info[offense_nr_idx]["offense_seq"] = line[:14].strip()
-                extracted_info[offense_nr_idx]["description"] = line[14:80].strip()
-                extracted_info[offense_nr_idx]["offense_disposition"] = line[80:].strip()
+                extracted_info[offense_nr_idx] = offense_columns.row(line)
             # If we do not find a number, but we are still in the offense block, the description must have overflowed onto a new line.
             # It can also happen that there is no offense sequence number and description. See ds_Montgomery_MJ_38119_CR_0000581_2010.pdf.
             # In which case, we need to properly indicate this is a new offense.
@@ -445,27 +433,18 @@ def extract_disp_sent(text:str) -> dict[str, str | list]:
                 if(offense_nr == -1):
                     offense_nr += 1
                     offense_nr_idx = "offense_nr_" + str(offense_nr)
-                    extracted_info[offense_nr_idx] = {}
 
-                    extracted_info[offense_nr_idx]["offense_seq"] = line[:14].strip()
-                    extracted_info[offense_nr_idx]["description"] = line[14:80].strip()
-                    extracted_info[offense_nr_idx]["offense_disposition"] = line[80:].strip()
+                    extracted_info[offense_nr_idx] = offense_columns.row(line)
                 else:
                     extracted_info[offense_nr_idx]["description"] = extracted_info[offense_nr_idx]["description"] + " " + line.strip()
         # As long as we are not on a column header, a junk line, or the end of the page, we are in the offense block.
-        elif(penalty_block and "penalty type" not in line and line.strip() != "" and "reflected on these" not in line and "inaccurate or delayed" not in line and "docket sheet info" not in line and "not comply with" not in line and "liability as set" not in line and "printed:" not in line and "magisterial district judge" not in line):
+        elif(penalty_block and "penalty type" not in line and line.strip() != ""):
             # If we find a date in the line, then it is not an overflow line.
             if(re.search("\d{2}/\d{2}/\d{4}", line)):
                 penalty_nr += 1
                 penalty_nr_idx = "penalty_nr_" + str(penalty_nr)
-                extracted_info[penalty_nr_idx] = {}
-
-                extracted_info[penalty_nr_idx]["penalty_type"] = line[:41].strip()
-                extracted_info[penalty_nr_idx]["penalty_date"] = line[41:58].strip()
-                extracted_info[penalty_nr_idx]["program_type"] = line[58:83].strip()
-                extracted_info[penalty_nr_idx]["start_date"] = line[83:97].strip()
-                extracted_info[penalty_nr_idx]["end_date"] = line[97:111].strip()
-                extracted_info[penalty_nr_idx]["period"] = line[111:].strip()
+
+                extracted_info[penalty_nr_idx] = penalty_columns.row(line)
             # If there is no date, then it is an overflow line.
             else:
                 extracted_info[penalty_nr_idx]["program_type"] = extracted_info[penalty_nr_idx]["program_type"] + " " + line.strip()
@@ -476,19 +455,18 @@ def extract_disp_sent(text:str) -> dict[str, str | list]:
 
 # Extract attorney information from the ATTORNEY INFORMATION section.
 # Args:
-#   text(str): The text containing the attorney information.
+#   lines (SectionView): The lower case lines containing the attorney information.
 # Return:
 #   dict: A dictionary containing the attorney information.
-def extract_attorney_info(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_attorney_info(lines: SectionView) -> dict[str, str | list]:
     extracted_info = {}
     i = 0
     i2 = 0
 
     # Split each line into two sides.
-    lefthand_lines = [line[:69].strip().lower() for line in split]
+    lefthand_lines = [line[:69].strip() for line in lines]
     lefthand_lines_clean = [line for line in lefthand_lines if line.strip() != ""]
-    righthand_lines = [line[69:].strip().lower() for line in split]
+    righthand_lines = [line[69:].strip() for line in lines]
     righthand_lines_clean = [line for line in righthand_lines if line.strip() != ""]
     for line in righthand_lines_clean:
         print(line)
@@ -501,7 +479,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
     address_block = False
     
     while(i < len(lefthand_lines_clean)):
-        l_line = lefthand_lines_clean[i].strip().lower()
+        l_line = lefthand_lines_clean[i].strip()
         
         if("name:" in l_line or ""):
             # New lawyer.
@@ -546,7 +524,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
             if(extracted_info[lawyer_idx]["address"] != ""):
                 address_block = True
         # As long as we are not at the end of the page or on a blank line AND we are in the address block, collect the data and add it to the address.
-        elif(l_line != "" and "recent entries made" not in l_line and "nor the administrative" not in l_line and "docket sheet information" not in l_line and "do not comply" not in l_line and "may be subject to" not in l_line and "mdjs" not in l_line and "magisterial district judge" not in l_line and address_block):
+        elif(l_line != "" and address_block):
             print(l_line)
             extracted_info[lawyer_idx]["address"] = extracted_info[lawyer_idx]["address"] + "|" + l_line
 
@@ -560,7 +538,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
         i += 1
 
     while(i2 < len(righthand_lines_clean)):
-        r_line = righthand_lines_clean[i2].strip().lower()
+        r_line = righthand_lines_clean[i2].strip()
 
         if("name:" in r_line):
             # New lawyer.
@@ -586,7 +564,7 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
             if(extracted_info[lawyer_idx]["address"] != ""):
                 address_block = True
         # As long as we are not at the end of the page or on a blank line AND we are in the address block, collect the data and add it to the address.
-        elif(r_line != "" and "reflected on these" not in r_line and "inaccurate or delayed" not in r_line and "criminal history background" not in r_line and "provisions of the criminal" not in r_line and "liability as set forth" not in r_line and "printed:" not in r_line and "magisterial district judge" not in r_line and address_block):
+        elif(r_line != "" and address_block):
             extracted_info[lawyer_idx]["address"] = extracted_info[lawyer_idx]["address"] + "|" + r_line
 
             # If we find a the city + state + zip code, then the address is over.
@@ -599,11 +577,11 @@ def extract_attorney_info(text:str) -> dict[str, str | list]:
 
 # Extracts docket entry information from the DOCKET ENTRY INFORMATION section.
 # Args:
-#   text(str): The text containing the docket entry information.
+#   lines (SectionView): The lower case lines containing the docket entry information.
 # Return:
 #   dict: A dictionary containing the docket entry information.
-def extract_docket_entry_information(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_docket_entry_information(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "DOCKET ENTRY INFORMATION")
     extracted_info = {}
     
     # Line counter.
@@ -611,26 +589,22 @@ def extract_docket_entry_information(text:str) -> dict[str, str | list]:
     docket_entry_nr = -1
     docket_entry_idx = "docket_entry_" + str(docket_entry_nr)
 
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
         
         # If we find a date on the line (that is not at the end of the document), then it is a calendar event.
-        if(re.search(r"\d{2}/\d{2}/\d{4}", line) and "printed:" not in line):
+        if(re.search(r"\d{2}/\d{2}/\d{4}", line)):
             docket_entry_nr += 1
             docket_entry_idx = "docket_entry_" + str(docket_entry_nr)
-            extracted_info[docket_entry_idx] = {}
 
-            extracted_info[docket_entry_idx]["filed_date"] = line[:22].strip()
-            extracted_info[docket_entry_idx]["entry"] = line[22:68].strip()
-            extracted_info[docket_entry_idx]["filer"] = line[68:107].strip()
-            extracted_info[docket_entry_idx]["applies_to"] = line[107:].strip()
+            extracted_info[docket_entry_idx] = columns.row(line)
 
+        # The header row tells where the columns start.
+        elif("filed date" in line and "applies to" in line):
+            columns = column_spec("MJ", "DOCKET ENTRY INFORMATION", line)
         # If we do not find a date, but it is not the end of the document nor is it the header row or an empty row, then it is an overflow row.
-        elif("filed date" not in line and "applies to" not in line and "printed:" not in line and "recent entries made" not in line and "administrative office of penn" not in line and "docket sheet information should" not in line and "comply with the prov" not in line and "as set forth in" not in line and "magisterial district judge" not in line and line.strip() != ""):
-            extracted_info[docket_entry_idx]["filed_date"] = extracted_info[docket_entry_idx]["filed_date"] + " " + line[:22].strip()
-            extracted_info[docket_entry_idx]["entry"] = extracted_info[docket_entry_idx]["entry"] + " " + line[22:68].strip()
-            extracted_info[docket_entry_idx]["filer"] = extracted_info[docket_entry_idx]["filer"] + " " + line[68:107].strip()
-            extracted_info[docket_entry_idx]["applies_to"] = extracted_info[docket_entry_idx]["applies_to"] + " " + line[107:].strip()
+        elif("filed date" not in line and "applies to" not in line and line.strip() != ""):
+            columns.extend(extracted_info[docket_entry_idx], line)
         
         i += 1
     
@@ -638,11 +612,13 @@ def extract_docket_entry_information(text:str) -> dict[str, str | list]:
 
 # Extract bail information from the BAIL / BAIL INFORMATION section.
 # Args:
-#   text(str): The text containing the bail information.
+#   lines (SectionView): The lower case lines containing the bail information.
 # Return:
 #   dict: A dictionary containing the bail information.
-def extract_bail(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_bail(lines: SectionView) -> dict[str, str | list]:
+    bail_columns = column_spec("MJ", "BAIL ACTIONS")
+    surety_columns = column_spec("MJ", "SURETIES")
+    depositor_columns = column_spec("MJ", "BAIL DEPOSITORS")
     i = 0
     bail_dict = {}
 
@@ -664,16 +640,20 @@ def extract_bail(text:str) -> dict[str, str | list]:
     bail_depositor_nr = -1
     bail_depositor_idx = "bail_depositor_nr_" + str(bail_depositor_nr)
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if("nebbia status:" in line):
             bail_dict["nebbia_status"] = line.split("nebbia status:")[1].strip()
         elif("bail action" in line):
+            # The header row tells where the columns start. The bail action reason also mentions the bail action.
+            if("bail action type" in line):
+                bail_columns = column_spec("MJ", "BAIL ACTIONS", line)
             bail_block = True
             surety_block = False
             bail_depositor_block = False
         elif("surety type" in line):
+            surety_columns = column_spec("MJ", "SURETIES", line)
             surety_block = True
             bail_block = False
             bail_depositor_block = False
@@ -683,58 +663,44 @@ def extract_bail(text:str) -> dict[str, str | list]:
             surety_block = False
 
         # If we are in the bail section, and we are not at the end of page nor are we on the header row or on a blank line... collect the bail data.
-        if(bail_block and "printed:" not in line and "recent entries made" not in line and "administrative office of" not in line and "docket sheet info" not in line and "comply with the" not in line and "set forth in" not in line and "bail action type" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and "magisterial district judge" not in line and line.strip() != ""):
+        if(bail_block and "bail action type" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and line.strip() != ""):
             if("bail action reason:" in line):
                 bail_dict["bail_info"][bail_idx]["bail_action_reason"] = line.split("bail action reason:")[1].strip()
             # If the bail date is blank, the bail action overflowed onto the next line.
-            elif(line[37:60].strip() == ""):
-                bail_dict["bail_info"][bail_idx]["bail_action"] = bail_dict["bail_info"][bail_idx]["bail_action"] +  " " + line[:37].strip()
-                bail_dict["bail_info"][bail_idx]["bail_type"] = bail_dict["bail_info"][bail_idx]["bail_type"] + " " + line[60:85].strip()
+            elif(bail_columns.value(line, "date") == ""):
+                bail_dict["bail_info"][bail_idx]["bail_action"] = bail_dict["bail_info"][bail_idx]["bail_action"] +  " " + bail_columns.value(line, "bail_action")
+                bail_dict["bail_info"][bail_idx]["bail_type"] = bail_dict["bail_info"][bail_idx]["bail_type"] + " " + bail_columns.value(line, "bail_type")
             # Otherwise, continue collecting the bail information as normal.
             else:
                 # Initialize starting values.
                 bail_nr += 1
                 bail_idx = "bail_nr_" + str(bail_nr)
-                bail_dict["bail_info"][bail_idx] = {}
 
                 # Set values for bail.
-                bail_dict["bail_info"][bail_idx]["bail_action"] = line[:37].strip()
-                bail_dict["bail_info"][bail_idx]["date"] = line[37:60].strip()
-                bail_dict["bail_info"][bail_idx]["bail_type"] = line[60:85].strip()
-                bail_dict["bail_info"][bail_idx]["originating_court"] = line[85:115].strip()
-                bail_dict["bail_info"][bail_idx]["percentage"] = line[115:131].strip()
-                bail_dict["bail_info"][bail_idx]["amount"] = line[131:].strip()
+                bail_dict["bail_info"][bail_idx] = bail_columns.row(line)
         # If we are in the surety section, and we are not at the end of page nor are we on the header row or on a blank line... collect the surety data.
-        elif(surety_block and "printed:" not in line and "recent entries made" not in line and "administrative office of" not in line and "docket sheet info" not in line and "comply with the" not in line and "set forth in" not in line and "surety type" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and "magisterial district judge" not in line and line.strip() != ""):
+        elif(surety_block and "surety type" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and line.strip() != ""):
             # If the surety type is blank, the surety overflowed onto the next line.
-            if(line[:37].strip() == ""):
+            if(surety_columns.value(line, "surety_type") == ""):
                 # This is annoying because sometimes the name flows all the way up to the security type. I am not certain there is way to distinguish them.
                 bail_dict["surety_info"][surety_idx]["surety_name"] = bail_dict["surety_info"][surety_idx]["surety_name"] +  " " + line[37:100].strip()
-                bail_dict["surety_info"][surety_idx]["security_type"] = bail_dict["surety_info"][surety_idx]["security_type"] +  " " + line[106:131].strip()
+                bail_dict["surety_info"][surety_idx]["security_type"] = bail_dict["surety_info"][surety_idx]["security_type"] +  " " + surety_columns.value(line, "security_type")
             # Otherwise, continue collecting the surety information as normal.
             else:
                 # Initialize starting values.
                 surety_nr += 1
                 surety_idx = "surety_nr_" + str(surety_nr)
-                bail_dict["surety_info"][surety_idx] = {}
 
                 # Set values for surety.
-                bail_dict["surety_info"][surety_idx]["surety_type"] = line[:37].strip()
-                bail_dict["surety_info"][surety_idx]["surety_name"] = line[37:69].strip()
-                bail_dict["surety_info"][surety_idx]["posting_status"] = line[69:89].strip()
-                bail_dict["surety_info"][surety_idx]["posting_date"] = line[89:106].strip()
-                bail_dict["surety_info"][surety_idx]["security_type"] = line[106:131].strip()
-                bail_dict["surety_info"][surety_idx]["security_amount"] = line[131:].strip()
+                bail_dict["surety_info"][surety_idx] = surety_columns.row(line)
         # If we are in the bail depositor section, and we are not at the end of page nor are we on the header row or on a blank line... collect the depositor data.
-        elif(bail_depositor_block and "printed:" not in line and "recent entries made" not in line and "administrative office of" not in line and "docket sheet info" not in line and "comply with the" not in line and "set forth in" not in line and "depositor name" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and "magisterial district judge" not in line and line.strip() != ""):
+        elif(bail_depositor_block and "depositor name" not in line and "commonwealth of penn" not in line and "bail set:" not in line and "bail posted:" not in line and "bail depositor(s):" not in line and line.strip() != ""):
             # Initialize values.
             bail_depositor_nr += 1 
             bail_depositor_idx = "bail_depositor_nr_" + str(bail_depositor_nr)
-            bail_dict["depositor_info"][bail_depositor_idx] = {}
 
             # Set values for depositor.
-            bail_dict["depositor_info"][bail_depositor_idx]["depositor_name"] = line[:65].strip()
-            bail_dict["depositor_info"][bail_depositor_idx]["depositor_amount"] = line[65:].strip()
+            bail_dict["depositor_info"][bail_depositor_idx] = depositor_columns.row(line)
 
         i += 1
     
@@ -742,11 +708,11 @@ def extract_bail(text:str) -> dict[str, str | list]:
 
 # Extracts confinement information from the CONFINEMENT INFORMATION section.
 # Args:
-#   text(str): The text containing the case information.
+#   lines (SectionView): The lower case lines containing the case information.
 # Return:
 #   dict: A dictionary containing the extracted information.
-def extract_confinement(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_confinement(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "CONFINEMENT")
     extracted_info = {}
     confinement_nr = -1
     confinement_idx = "confinement_nr_" + str(confinement_nr)
@@ -754,20 +720,18 @@ def extract_confinement(text:str) -> dict[str, str | list]:
     # Line counter.
     i = 0
 
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
 
+        # The header row tells where the columns start.
+        if("confinement type" in line and "confinement reason" in line):
+            columns = column_spec("MJ", "CONFINEMENT", line)
         # Capture confinement information.
-        if("confinement" not in line and "end date" not in line and "printed:" not in line and "recent entries made" not in line and "administrative office of penn" not in line and "docket sheet info" not in line and "comply with the provisions" not in line and "set forth in" not in line and "magisterial district judge" not in line and "case confinement" not in line and line != "" and re.search("\d{2}/\d{2}/\d{4}", line)):
+        elif("confinement" not in line and "end date" not in line and "case confinement" not in line and line != "" and re.search("\d{2}/\d{2}/\d{4}", line)):
             confinement_nr += 1
             confinement_idx = "confinement_nr_" + str(confinement_nr)
-            extracted_info[confinement_idx] = {}
 
-            extracted_info[confinement_idx]["confinement_location"] = line[:48].strip()
-            extracted_info[confinement_idx]["confinement_type"] = line[48:78].strip()
-            extracted_info[confinement_idx]["confinement_reason"] = line[78:117].strip()
-            extracted_info[confinement_idx]["confinement_date"] = line[117:133].strip()
-            extracted_info[confinement_idx]["confinement_end_date"] = line[133:].strip()
+            extracted_info[confinement_idx] = columns.row(line)
         
         i += 1
 
@@ -775,18 +739,18 @@ def extract_confinement(text:str) -> dict[str, str | list]:
 
 # Extract case financial information from the CASE FINANCIAL INFORMATION section.
 # Args:
-#   text(str): The text containing the case financial information.
+#   lines (SectionView): The lower case lines containing the case financial information.
 # Return:
 #   dict: A dictionary containing the case financial information.
-def extract_case_financial_info(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_case_financial_info(lines: SectionView) -> dict[str, str | list]:
+    columns = column_spec("MJ", "CASE FINANCIAL INFORMATION")
     i = 0
     case_financial_dict = {}
     fee_nr = -1
     fee_idx = "fee_nr_" + str(fee_nr)
     
-    while(i < len(split)):
-        line = split[i].lower().strip()
+    while(i < len(lines)):
+        line = lines[i].strip()
 
         header_line1 = "assessment amt" in line or "adjustment amt" in line or "payment amt" in line or "non-monetary" in line
 
@@ -796,17 +760,11 @@ def extract_case_financial_info(text:str) -> dict[str, str | list]:
         elif("last payment amt:" in line and "next payment due date:" in line):
             case_financial_dict["last_payment_amt"] = line.split("last payment amt:")[1].split("next payment due date:")[0].strip()
             case_financial_dict["next_payment_due_date"] = line.split("next payment due date:")[1].strip()
-        elif("reflected on these docket" not in line and "liability for inaccurate" not in line and "docket sheet information" not in line and "who do not comply" not in line and "liability as set forth" not in line and "printed:" not in line and "magisterial district judge" not in line and line != "" and not header_line1):
+        elif(line != "" and not header_line1):
             fee_nr += 1
             fee_idx = "fee_nr_" + str(fee_nr)
-            case_financial_dict[fee_idx] = {}
 
-            case_financial_dict[fee_idx]["description"] = line[:52].strip()
-            case_financial_dict[fee_idx]["amount"] = line[52:73].strip()
-            case_financial_dict[fee_idx]["adjusted_amount"] = line[73:94].strip()
-            case_financial_dict[fee_idx]["non_monetary_amount"] = line[94:112].strip()
-            case_financial_dict[fee_idx]["payment_amount"] = line[112:130].strip()
-            case_financial_dict[fee_idx]["balance"] = line[130:].strip()
+            case_financial_dict[fee_idx] = columns.row(line)
 
         i += 1
     
@@ -814,11 +772,12 @@ def extract_case_financial_info(text:str) -> dict[str, str | list]:
 
 # Extract payment plan summary from the PAYMENT PLAN SUMMARY section.
 # Args:
-#   text(str): The text containing the payment plan summary.
+#   lines (SectionView): The lower case lines containing the payment plan summary.
 # Return:
 #   dict: A dictionary containing the payment plan summary.
-def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
-    split = text.split("\n")
+def extract_payment_plan_summary(lines: SectionView) -> dict[str, str | list]:
+    payment_plan_columns = column_spec("MJ", "PAYMENT PLANS")
+    payment_columns = column_spec("MJ", "PAYMENTS")
     i = 0
     payment_plan_dict = {}
     payment_plan_info_block = False
@@ -827,8 +786,8 @@ def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
     payment_nr = -1
     payment_idx = "payment_nr_" + str(payment_nr)
     
-    while(i < len(split)):
-        line = split[i].lower()
+    while(i < len(lines)):
+        line = lines[i]
 
         if("payment plan no." in line):
             payment_plan_info_block = True
@@ -843,37 +802,26 @@ def extract_payment_plan_summary(text:str) -> dict[str, str | list]:
             payment_plan_info_block = False
             payment_plan_participant_block = False
 
-        if(payment_plan_info_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and "these docket" not in line and "any liability" not in line and "docket sheet info" not in line and "who do not comply" not in line and "liability as" not in line and "printed:" not in line and "magisterial district judge" not in line and line.strip() != ""):
-            payment_plan_dict["payment_plan_nr"] = line[:42].strip()
-            payment_plan_dict["payment_plan_freq"] = line[42:62].strip()
-            payment_plan_dict["next_due_date"] = line[62:93].strip()
-            payment_plan_dict["active"] = line[93:112].strip()
-            payment_plan_dict["next_due_amount"] = line[112:135].strip()
-            payment_plan_dict["overdue_amount"] = line[135:].strip()
-        elif(payment_plan_participant_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and "these docket" not in line and "any liability" not in line and "docket sheet info" not in line and "who do not comply" not in line and "liability as" not in line and "printed:" not in line and "magisterial district judge" not in line and line.strip() != ""):
+        if(payment_plan_info_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and line.strip() != ""):
+            payment_plan_dict.update(payment_plan_columns.row(line))
+        elif(payment_plan_participant_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and line.strip() != ""):
             payment_plan_dict["responsible_participant"] = line.strip()
-        elif(payment_plan_history_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and "these docket" not in line and "any liability" not in line and "docket sheet info" not in line and "who do not comply" not in line and "liability as" not in line and "printed:" not in line and "magisterial district judge" not in line and line.strip() != ""):
+        elif(payment_plan_history_block and "payment plan no." not in line and "responsible participant" not in line and "payment plan history:" not in line and line.strip() != ""):
             payment_nr += 1
             payment_idx = "payment_nr_" + str(payment_nr)
-            payment_plan_dict[payment_idx] = {}
 
-            payment_plan_dict[payment_idx]["payment_date"] = line[:42].strip()
-            payment_plan_dict[payment_idx]["applied_date"] = line[42:63].strip()
-            payment_plan_dict[payment_idx]["transaction_type"] = line[63:77].strip()
-            payment_plan_dict[payment_idx]["payor"] = line[77:106].strip()
-            payment_plan_dict[payment_idx]["participant_role"] = line[106:133].strip()
-            payment_plan_dict[payment_idx]["amount"] = line[133:].strip()
+            payment_plan_dict[payment_idx] = payment_columns.row(line)
 
         i += 1
     
     return(payment_plan_dict)
 
-def extract_all(pdf_path: str) -> dict[str, str | dict]:
-    # Join together all pages and lines into one string.
-    text = extract_text_from_pdf(pdf_path)
+def extract_all(pdf_path: str, cache_dir: str | None = None, engine: str = "pdfplumber") -> dict[str, str | dict]:
+    # Read the body of every page.
+    pages = extract_text_from_pdf(pdf_path, cache_dir, engine)
 
     # Partition the text by sections.
-    sections = extract_sections(text)
+    sections = extract_sections(pages)
 
     defendant_info = (
         # The second argument in get() is the default value returned if the key is not found in the dictionary.
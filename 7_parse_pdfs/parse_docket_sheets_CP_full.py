@@ -1,80 +1,81 @@
-import re
 import os
 import sys
-import csv
-import json
 import logging
-import pdfplumber
-import pandas as pd
+import functools
 from datetime import datetime
 from parse_docket_sheet_CP_functions import extract_all
+from parse_pdf_driver_functions import parse_arguments, plan_resume, describe_plan, run_parse, worker_limits, ResultSink
+from parse_pdf_progress_functions import open_progress_store
+from parse_pdf_output_functions import prepare_output, open_output_writer
 
-arguments = sys.argv
+# Parse one docket sheet.
+# Args:
+#   file_name (str): Name of the PDF.
+#   path_to_pdfs (str): Folder with the PDFs.
+#   path_to_text_cache (str): Folder of the layout text cache. If None, the text is always extracted from the PDF.
+#   text_engine (str): Text extraction engine.
+# Returns:
+#   dict: What we parsed out of the PDF. Errors are left to parse_one_pdf, which records why parsing failed.
+def parse_pdf(file_name: str, path_to_pdfs: str, path_to_text_cache: str | None, text_engine: str) -> dict:
+    logging.info(f"Parsing... {file_name}")
 
-# Initialize paths and file names.
-# Argument 1 is the root path of our files e.g., ~/secret_lives_pa/output/pdf_parse_list/ or /media/joe/T7 Shield/
-# Argument 2 is the chunk of PDFs you want parsed e.g., Montgomery_ds_CP_CR_chunkList.csv
-path_to_progress_file = arguments[1] + "progress_files/"
-path_to_json = arguments[1] + "json/"
-path_to_logs = arguments[1] + "log_files/"
-os.makedirs(path_to_progress_file, exist_ok = True)
-os.makedirs(path_to_json, exist_ok = True)
-os.makedirs(path_to_logs, exist_ok = True)
+    result_dictionary = extract_all(path_to_pdfs + file_name, path_to_text_cache, text_engine)
+    logging.info("Successfully parsed.")
 
-target_county = arguments[2].split("_")[0]
-path_to_pdfs = arguments[1] + "pdfs/" + target_county + "/"
-pdfs_to_parse = arguments[1] + "pdf_chunk_lists/" + arguments[2]
-progress_file = path_to_progress_file + "progress-" + arguments[2]
-log_file = path_to_logs + "log_file_" + arguments[2].removesuffix(".csv") + "_" + datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".txt"
+    return result_dictionary
 
-# Configure the logger.
-logging.basicConfig(filename = log_file, level = logging.INFO, filemode = "w+")
+if __name__ == "__main__":
+    # Initialize paths and file names.
+    # Argument 1 is the root path of our files e.g., ~/secret_lives_pa/output/pdf_parse_list/ or /media/joe/T7 Shield/
+    # Argument 2 is the chunk of PDFs you want parsed e.g., Montgomery_ds_CP_CR_chunkList.csv
+    # Argument 3 (optional) is the text extraction engine, either pdfplumber (default) or pdfium (faster, same text).
+    # --workers N (optional) parses N PDFs at the same time, each in its own process.
+    # --plan-only (optional) prints how many PDFs are left to parse and stops.
+    # --time-limit and --memory-limit (optional) kill and replace a worker stuck on one PDF e.g., after 900 seconds or 4096 MB (default off).
+    # --retries N (optional) tries the PDFs which failed again N times once every other PDF is done (default 1).
+    # --text-cache DIR (optional) caches the extracted text of every PDF in DIR, so parsing the chunk again skips extracting it (default no cache).
+    # --output jsonl (optional) saves compressed JSON Lines shards under jsonl/ instead of one JSON per PDF (--compression gzip or xz).
+    # --output parquet (optional) saves Parquet tables under parquet/ instead (needs pyarrow).
+    # --parquet-documents (optional) also saves the whole JSON of every PDF in the documents table of the parquet output.
+    arguments = parse_arguments("Montgomery_ds_CP_CR_chunkList.csv")
+    path_to_progress_file = arguments.root + "progress_files/"
+    path_to_json = arguments.root + "json/"
+    path_to_logs = arguments.root + "log_files/"
+    path_to_text_cache = arguments.text_cache
+    os.makedirs(path_to_progress_file, exist_ok = True)
+    os.makedirs(path_to_json, exist_ok = True)
+    os.makedirs(path_to_logs, exist_ok = True)
 
-# Check if the PDF progress file exists.
-if(os.path.exists(progress_file)):
-    # If it does exist, use the progress file (keeping only PDFs that have never been parsed successfully).
-    pdf_parse_table_df = pd.read_csv(
-        progress_file,
-        dtype = {"file_name": str, "successfully_parsed": bool}
-    )
+    target_county = arguments.chunk.split("_")[0]
+    path_to_pdfs = arguments.root + "pdfs/" + target_county + "/"
+    pdfs_to_parse = arguments.root + "pdf_chunk_lists/" + arguments.chunk
+    log_file = path_to_logs + "log_file_" + arguments.chunk.removesuffix(".csv") + "_" + datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".txt"
 
-    # Drop all observations which have at least one entry indicating the file was successfully parsed.
-    pdf_parse_table_df = pdf_parse_table_df.groupby('file_name').filter(lambda x: (~x['successfully_parsed']).all())
-else:
-    # If it does not exist, it is our first time parsing these PDFs. Use the original file.
-    pdf_parse_table_df = pd.read_csv(
-        pdfs_to_parse,
-        dtype = {"file_name": str, "successfully_parsed": bool}
-    )
+    # Configure the logger.
+    logging.basicConfig(filename = log_file, level = logging.INFO, filemode = "w+")
 
-    # Create progress file.
-    with open(progress_file, "w") as file:
-        writer = csv.writer(file)
-        writer.writerow(["file_name", "successfully_parsed", "time_stamp"])
-
-for row in pdf_parse_table_df.itertuples():
-    logging.info(f"Parsing... {row.file_name}")
-    successfully_parsed_var = True
+    # Work out which PDFs still need to be parsed (the chunk list minus the PDFs already parsed).
+    progress_store = open_progress_store(path_to_progress_file, arguments.chunk)
+    pdf_parse_table_df, plan = plan_resume(pdfs_to_parse, progress_store)
+    logging.info(describe_plan(arguments.chunk, plan))
+    if(arguments.plan_only):
+        print(describe_plan(arguments.chunk, plan))
+        progress_store.close()
+        sys.exit()
 
+    time_limit, memory_limit = worker_limits(arguments.time_limit, arguments.memory_limit)
+    sink = ResultSink(progress_store, open_output_writer(arguments.output, arguments.root, arguments.chunk, arguments.compression, documents = arguments.parquet_documents))
     try:
-        result_dictionary = extract_all(path_to_pdfs + row.file_name)
-        logging.info("Successfully parsed.")
-    except Exception as e:
-        logging.error(f"Error in parsing. The error is {e}")
-        successfully_parsed_var = False
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        progress_row = pd.DataFrame([{"file_name": row.file_name, "successfully_parsed": False, "time_stamp": timestamp}])
-        progress_row.to_csv(progress_file, index = False, mode = "a", header = False)
-
-    # Create name of JSON based on the name of the PDF we are parsing.
-    filename = path_to_json + row.file_name.replace(".pdf", ".json")
-
-    # Save dictionary as a JSON file and log successful progress in the progress file.
-    if(successfully_parsed_var):
-        # Log successful parsing.
-        progress_row = pd.DataFrame([{"file_name": row.file_name, "successfully_parsed": True, "time_stamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}])
-        progress_row.to_csv(progress_file, index = False, mode = "a", header = False)
-        
-        # Save results.
-        with open(filename, "w") as json_file:
-            json.dump(result_dictionary, json_file, indent = 4)
\ No newline at end of file
+        run_parse(
+            functools.partial(parse_pdf, path_to_pdfs = path_to_pdfs, path_to_text_cache = path_to_text_cache, text_engine = arguments.engine),
+            functools.partial(prepare_output, output = arguments.output, path_to_json = path_to_json, documents = arguments.parquet_documents),
+            pdf_parse_table_df["file_name"],
+            sink,
+            log_file,
+            workers = arguments.workers,
+            time_limit = time_limit,
+            memory_limit = memory_limit,
+            retries = arguments.retries
+        )
+    finally:
+        sink.close()
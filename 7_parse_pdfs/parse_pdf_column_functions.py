@@ -0,0 +1,154 @@
+import logging
+from collections import Counter
+
+# The fixed-width tables of the docket sheets, one per court type and table.
+# Each table is a list of (field, first character) pairs in the order of its columns. A column ends where the next one starts, and the last one at the end of the line.
+# The offsets are for the layout text we extract (see parse_pdf_text_functions.py). Some sections hold more than one table (e.g., BAIL has the bail actions and the sureties).
+COLUMN_SPECS = {
+    ("CP", "CHARGES"): [("seq", 0), ("orig_seq", 11), ("grade", 22), ("statute", 31), ("description", 56), ("offense_date", 102), ("otn", 118)],
+    ("CP", "CASE EVENTS"): [("case_event", 0), ("disposition_date", 60), ("final_disposition", 98)],
+    ("CP", "OFFENSES"): [("offense_description", 0), ("offense_disposition", 61), ("grade", 100), ("offense_section", 110)],
+    ("CP", "SENTENCES"): [("sentencing_judge", 0), ("sentencing_date", 60), ("credit_for_time_served", 100)],
+    ("CP", "PUNISHMENTS"): [("punishment_type", 0), ("punishment", 60), ("punishment_start_date", 101)],
+    ("CP", "CONFINEMENT"): [("confinement_date", 0), ("confinement_type", 19), ("confinement_location", 55), ("confinement_reason", 89), ("in_custody", 122)],
+    ("CP", "STATUS INFORMATION"): [("status_date", 0), ("processing_status", 20)],
+    ("CP", "CALENDAR EVENTS"): [("event_type", 0), ("start_date", 37), ("start_time", 49), ("room", 65), ("judge", 90), ("schedule_status", 127)],
+    ("CP", "CASE PARTICIPANTS"): [("participant_type", 0), ("name", 45)],
+    ("CP", "BAIL ACTIONS"): [("bail_action", 0), ("date", 38), ("bail_type", 65), ("originating_court", 88), ("percentage", 118), ("amount", 132)],
+    ("CP", "SURETIES"): [("surety_type", 0), ("surety_name", 38), ("posting_status", 65), ("posting_date", 88), ("security_type", 105), ("security_amount", 133)],
+    ("CP", "CASE FINANCIAL INFORMATION"): [("description", 0), ("assessment", 60), ("payment", 78), ("adjustment", 99), ("non_monetary_payment", 116), ("balance", 133)],
+    ("CP", "RELATED CASES"): [("related_docket_nr", 0), ("related_case_caption", 43), ("related_court", 89), ("relation_reason", 114)],
+    ("CP", "PAYMENT PLANS"): [("payment_plan_nr", 0), ("payment_plan_freq", 41), ("next_due_date", 74), ("active", 98), ("overdue_amount", 133)],
+    ("CP", "PAYMENT PLAN PARTICIPANTS"): [("participant", 0), ("suspended", 98), ("next_due_amount", 133)],
+    ("CP", "PAYMENTS"): [("receipt_date", 0), ("payor_name", 82), ("participant_role", 110), ("amount_paid", 132)],
+    ("MJ", "STATUS INFORMATION"): [("case_status", 0), ("status_date", 35), ("processing_status", 56)],
+    ("MJ", "CALENDAR EVENTS"): [("event_type", 0), ("start_date", 37), ("start_time", 49), ("room", 65), ("judge", 90), ("schedule_status", 127)],
+    ("MJ", "CASE PARTICIPANTS"): [("participant_type", 0), ("name", 45)],
+    ("MJ", "CHARGES"): [("nr", 0), ("charge", 17), ("grade", 45), ("description", 53), ("offense_date", 108), ("disposition", 121)],
+    ("MJ", "CASE DISPOSITION"): [("case_disposition", 0), ("disposition_date", 69), ("defendant_present", 103)],
+    ("MJ", "OFFENSES"): [("offense_seq", 0), ("description", 14), ("offense_disposition", 80)],
+    ("MJ", "PENALTIES"): [("penalty_type", 0), ("penalty_date", 41), ("program_type", 58), ("start_date", 83), ("end_date", 97), ("period", 111)],
+    ("MJ", "DOCKET ENTRY INFORMATION"): [("filed_date", 0), ("entry", 22), ("filer", 68), ("applies_to", 107)],
+    ("MJ", "BAIL ACTIONS"): [("bail_action", 0), ("date", 37), ("bail_type", 60), ("originating_court", 85), ("percentage", 115), ("amount", 131)],
+    ("MJ", "SURETIES"): [("surety_type", 0), ("surety_name", 37), ("posting_status", 69), ("posting_date", 89), ("security_type", 106), ("security_amount", 131)],
+    ("MJ", "BAIL DEPOSITORS"): [("depositor_name", 0), ("depositor_amount", 65)],
+    ("MJ", "CONFINEMENT"): [("confinement_location", 0), ("confinement_type", 48), ("confinement_reason", 78), ("confinement_date", 117), ("confinement_end_date", 133)],
+    ("MJ", "CASE FINANCIAL INFORMATION"): [("description", 0), ("amount", 52), ("adjusted_amount", 73), ("non_monetary_amount", 94), ("payment_amount", 112), ("balance", 130)],
+    ("MJ", "PAYMENT PLANS"): [("payment_plan_nr", 0), ("payment_plan_freq", 42), ("next_due_date", 62), ("active", 93), ("next_due_amount", 112), ("overdue_amount", 135)],
+    ("MJ", "PAYMENTS"): [("payment_date", 0), ("applied_date", 42), ("transaction_type", 63), ("payor", 77), ("participant_role", 106), ("amount", 133)]
+}
+
+# The header label over each column of a table, for the tables whose header row sits in the section (see ColumnSpec.calibrate), with where the label starts in the layout the offsets of COLUMN_SPECS are for.
+# Labels are lower case and listed in the order of the columns. The first column always starts at the first character, so it has no label, and neither do columns without a label of their own (e.g., room and judge of the calendar events).
+# A left aligned label starts where its column does. A right aligned label (over amounts and percentages) ends where its values end, so where it starts depends on how wide it is; it has no position and only has to be in the header.
+COLUMN_HEADERS = {
+    ("CP", "CHARGES"): {"orig_seq": ("orig seq.", 11), "grade": ("grade", 22), "statute": ("statute", 31), "description": ("statute description", 56), "offense_date": ("offense dt.", 102), "otn": ("otn", 118)},
+    ("CP", "CALENDAR EVENTS"): {"start_date": ("start date", 37), "start_time": ("time", 49), "schedule_status": ("status", 127)},
+    ("CP", "CASE PARTICIPANTS"): {"name": ("name", 45)},
+    ("CP", "BAIL ACTIONS"): {"date": ("date", 38), "bail_type": ("bail type", 65), "originating_court": ("originating court", 88), "percentage": ("percentage", None), "amount": ("amount", None)},
+    ("CP", "SURETIES"): {"surety_name": ("surety name", 38), "posting_status": ("posting status", 65), "posting_date": ("posting date", 88), "security_type": ("security type", 105), "security_amount": ("security amt", None)},
+    ("MJ", "STATUS INFORMATION"): {"status_date": ("status date", 35), "processing_status": ("processing status", 56)},
+    ("MJ", "CALENDAR EVENTS"): {"start_date": ("start date", 37), "start_time": ("time", 49), "schedule_status": ("status", 127)},
+    ("MJ", "CASE PARTICIPANTS"): {"name": ("participant name", 45)},
+    ("MJ", "CHARGES"): {"charge": ("charge", 17), "grade": ("grade", 45), "description": ("description", 53), "offense_date": ("offense dt.", 108), "disposition": ("disposition", 121)},
+    ("MJ", "CASE DISPOSITION"): {"disposition_date": ("disposition date", 69), "defendant_present": ("defendant present?", 103)},
+    ("MJ", "OFFENSES"): {"offense_disposition": ("offense disposition", 80)},
+    ("MJ", "DOCKET ENTRY INFORMATION"): {"entry": ("entry", 22), "filer": ("filer", 68), "applies_to": ("applies to", 107)},
+    ("MJ", "BAIL ACTIONS"): {"date": ("bail action date", 37), "bail_type": ("bail type", 60), "originating_court": ("originating court", 85), "percentage": ("percentage", None), "amount": ("amount", None)},
+    ("MJ", "SURETIES"): {"surety_name": ("surety name", 37), "posting_status": ("posting status", 69), "posting_date": ("posting date", 89), "security_type": ("security type", 106), "security_amount": ("security amt", None)},
+    ("MJ", "CONFINEMENT"): {"confinement_type": ("confinement type", 48), "confinement_reason": ("confinement reason", 78), "confinement_date": ("confinement", 117), "confinement_end_date": ("confinement", 133)}
+}
+
+# The columns of one table, compiled into slices once so a row is cut up in a single pass.
+class ColumnSpec:
+    # Args:
+    #   columns (list): (field, first character) pairs in the order of the columns (see COLUMN_SPECS).
+    #   labels (dict): The header label of each column which has one, and where it starts (see COLUMN_HEADERS).
+    def __init__(self, columns: list[tuple[str, int]], labels: dict[str, tuple[str, int | None]] | None = None):
+        starts = [start for _, start in columns]
+        ends = starts[1:] + [None]
+        self.fields = [field for field, _ in columns]
+        self.starts = starts
+        self.columns = [(field, slice(start, end)) for (field, _), start, end in zip(columns, starts, ends)]
+        self.slices = dict(self.columns)
+        self.labels = labels or {}
+        # The shifted columns by how far they are shifted, so each layout is only compiled once per process.
+        self.shifted = {}
+
+    # Find how far the columns are shifted in the header row of a table, in case the layout has moved.
+    # Every label with a position votes for how far it is from where it should be, and the columns are all shifted by what most of them agree on.
+    # So a label a character off its usual place on its own (e.g., because of a wider word next to it) does not move any column.
+    # Args:
+    #   header (str): The header row of the table, as the lines of the table are read.
+    # Returns:
+    #   ColumnSpec: The columns of this layout. The default columns when the header matches them, when a label is missing or when most labels do not agree.
+    def calibrate(self, header: str) -> "ColumnSpec":
+        if(not self.labels):
+            return self
+
+        # Look for the labels left to right, so repeated words (e.g., "confinement") are matched to the right column.
+        shifts = []
+        position = 0
+        for field in self.fields:
+            if(field in self.labels):
+                label, label_start = self.labels[field]
+                found = header.find(label, position)
+                if(found == -1):
+                    return self
+                if(label_start is not None):
+                    shifts.append(found - label_start)
+                position = found + len(label)
+
+        shift, votes = Counter(shifts).most_common(1)[0]
+        if(shift == 0 or votes * 2 <= len(shifts)):
+            return self
+
+        if(shift not in self.shifted):
+            # The first column always starts at the first character.
+            starts = [0] + [start + shift for start in self.starts[1:]]
+            if(starts[1] <= 0):
+                self.shifted[shift] = self
+            else:
+                logging.info(f"Columns {self.fields} shifted by {shift} characters.")
+                self.shifted[shift] = ColumnSpec(list(zip(self.fields, starts)))
+        return self.shifted[shift]
+
+    # Cut a line into its columns.
+    # Args:
+    #   line (str): One line of the table.
+    # Returns:
+    #   dict: The stripped text of each column, by field.
+    def row(self, line: str) -> dict[str, str]:
+        return {field: line[columns].strip() for field, columns in self.columns}
+
+    # Read one column of a line.
+    # Args:
+    #   line (str): One line of the table.
+    #   field (str): The column to read.
+    # Returns:
+    #   string: The stripped text of the column.
+    def value(self, line: str, field: str) -> str:
+        return line[self.slices[field]].strip()
+
+    # Add a line which overflows from the row above to that row, column by column.
+    # Args:
+    #   row (dict): The row (see row).
+    #   line (str): The overflowing line.
+    def extend(self, row: dict[str, str], line: str):
+        for field, columns in self.columns:
+            row[field] = row[field] + " " + line[columns].strip()
+
+# Every table of COLUMN_SPECS, compiled.
+COLUMNS = {table: ColumnSpec(columns, COLUMN_HEADERS.get(table)) for table, columns in COLUMN_SPECS.items()}
+
+# Get the compiled columns of one table.
+# Args:
+#   court (str): Court type, "CP" or "MJ".
+#   table (str): Name of the table in COLUMN_SPECS e.g., "CHARGES".
+#   header (str): The header row of the table. If given, the columns are calibrated to it (see ColumnSpec.calibrate).
+# Returns:
+#   ColumnSpec: The columns of the table.
+def column_spec(court: str, table: str, header: str | None = None) -> ColumnSpec:
+    if(header is None):
+        return COLUMNS[(court, table)]
+    return COLUMNS[(court, table)].calibrate(header)
@@ -0,0 +1,398 @@
+import os
+import glob
+import time
+import logging
+import argparse
+import functools
+import threading
+import multiprocessing
+import multiprocessing.pool
+import pypdfium2
+import pandas as pd
+from parse_pdf_watchdog_functions import supervised_imap_unordered
+from parse_pdf_progress_functions import ProgressStore, open_progress_store, read_parsed_file_names
+from parse_pdf_output_functions import OUTPUTS, prepare_output
+from parse_pdf_failure_functions import describe_failure
+
+# Statuses of the PDFs tried again at the end of a run (see run_parse). A PDF which went over a limit would only go over it again.
+RETRY_STATUSES = {"failed", "crashed"}
+
+# Read the runtime arguments shared by all parse_*_full.py files.
+# Args:
+#   chunk_example (str): Example of a chunk list name, shown in the help text.
+# Returns:
+#   Namespace: The parsed arguments (root, chunk, engine and the worker arguments).
+def parse_arguments(chunk_example: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root", help = "Root path of our files e.g., ~/secret_lives_pa/output/pdf_parse_list/ or /media/joe/T7 Shield/")
+    parser.add_argument("chunk", help = "Chunk of PDFs you want parsed e.g., " + chunk_example)
+    parser.add_argument("engine", nargs = "?", default = "pdfplumber", choices = ["pdfplumber", "pdfium"], help = "Text extraction engine (default pdfplumber).")
+    add_worker_arguments(parser)
+    add_output_arguments(parser)
+    return parser.parse_args()
+
+# Add the arguments controlling the worker processes to an argument parser.
+# Args:
+#   parser (ArgumentParser): The parser.
+def add_worker_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--plan-only", action = "store_true", help = "Only print how many PDFs are left to parse, without parsing them.")
+    parser.add_argument("--workers", type = int, default = 1, help = "Number of processes parsing PDFs at the same time (default 1).")
+    parser.add_argument("--time-limit", type = float, default = 0, help = "Seconds one PDF may take before its worker is killed and replaced e.g., 900, 0 for no limit (default no limit).")
+    parser.add_argument("--memory-limit", type = float, default = 0, help = "Megabytes of memory a worker may use before it is killed and replaced e.g., 4096, 0 for no limit (default no limit).")
+    parser.add_argument("--retries", type = int, default = 1, help = "Times the PDFs which failed or crashed are tried again once every other PDF is done, 0 to never try again (default 1).")
+    parser.add_argument("--text-cache", default = None, metavar = "DIR", help = "Folder to cache the extracted text of every PDF in, so parsing a PDF again skips extracting its text (default no cache).")
+
+# Work out which PDFs of a chunk list still need to be parsed.
+# This is the chunk list minus every PDF the progress says was parsed (an anti-join on the file name), so PDFs we never got to before a crash are kept.
+# Args:
+#   pdfs_to_parse (str): File path to the chunk list.
+#   progress_store (ProgressStore): The progress of the chunk.
+#   parsed_elsewhere (list): PDFs of the chunk parsed according to other progress (e.g., the progress from before a sharded run, see read_parsed_file_names). May be None.
+# Returns:
+#   tuple: The PDFs to parse (DataFrame with a file_name column) and a dictionary counting the PDFs in the chunk list (total), already parsed (parsed), tried but not parsed (failed), never tried (new) and left to parse (remaining).
+def plan_resume(pdfs_to_parse: str, progress_store: ProgressStore, parsed_elsewhere: list[str] | None = None) -> tuple[pd.DataFrame, dict[str, int]]:
+    pdf_parse_table_df = pd.read_csv(pdfs_to_parse, usecols = ["file_name"], dtype = {"file_name": str}).drop_duplicates("file_name")
+
+    # isin builds a hash set of the parsed PDFs, so this is linear in the size of the chunk.
+    parsed = pdf_parse_table_df["file_name"].isin(progress_store.file_names(True))
+    if(parsed_elsewhere is not None):
+        parsed = parsed | pdf_parse_table_df["file_name"].isin(parsed_elsewhere)
+    failed = pdf_parse_table_df["file_name"].isin(progress_store.file_names(False)) & ~parsed
+
+    plan = {
+        "total": len(pdf_parse_table_df),
+        "parsed": int(parsed.sum()),
+        "failed": int(failed.sum()),
+        "new": int((~parsed & ~failed).sum()),
+        "remaining": int((~parsed).sum())
+    }
+    return pdf_parse_table_df[~parsed].reset_index(drop = True), plan
+
+# Describe the output of plan_resume in one line.
+# Args:
+#   chunk (str): Name of the chunk list.
+#   plan (dict): The counts returned by plan_resume.
+# Returns:
+#   string: The description.
+def describe_plan(chunk: str, plan: dict[str, int]) -> str:
+    return f"{chunk}: {plan['remaining']} of {plan['total']} PDFs left to parse ({plan['parsed']} parsed, {plan['failed']} failed before and will be tried again, {plan['new']} never tried)."
+
+# Point the logger of a worker process at the log file of the job.
+# Args:
+#   log_file (str): File path to the log file.
+def configure_worker_logging(log_file: str):
+    # Append, since the main process has already created the file.
+    logging.basicConfig(filename = log_file, level = logging.INFO, filemode = "a", force = True)
+
+# Parse one PDF and prepare its output, turning any error we did not see coming into a failed parse instead of ending the whole job.
+# Args:
+#   parse_function (function): Parses one PDF. Takes the file name, returns what we parsed out of it (or None if parsing failed).
+#   output_function (function): Saves or serializes the result (see prepare_output). Takes the file name and the result.
+#   file_name (str): Name of the PDF.
+# Returns:
+#   tuple: The file name, whether it was parsed successfully, how many seconds it took, the record for the writer of the output (or None) and why it failed (see describe_failure, None if it did not raise an error).
+def parse_one_pdf(parse_function, output_function, file_name: str) -> tuple[str, bool, float, object, dict | None]:
+    start = time.monotonic()
+    record = None
+    failure = None
+    try:
+        result = parse_function(file_name)
+        successfully_parsed = result is not None
+        if(successfully_parsed):
+            record = output_function(file_name, result)
+    except Exception as e:
+        logging.error(f"Error in parsing {file_name}. The error is {e}")
+        successfully_parsed = False
+        failure = describe_failure(e)
+    return file_name, successfully_parsed, time.monotonic() - start, record, failure
+
+# Takes the outcome of every PDF of a chunk in the main process: hands records to the writer of the output and records the progress.
+# A PDF whose record goes to a writer only counts as parsed once the writer has saved it for good (e.g., its shard is complete).
+class ResultSink:
+    # Args:
+    #   progress_store (ProgressStore): The progress of the chunk.
+    #   writer: The writer of the output (see open_output_writer), or None if the workers save the output themselves.
+    def __init__(self, progress_store: ProgressStore, writer = None):
+        self.progress_store = progress_store
+        self.writer = writer
+        # Durations of the PDFs handed to the writer but not yet saved for good.
+        self.durations = {}
+        # PDFs which failed in a way worth trying again (see RETRY_STATUSES).
+        self.failed = []
+        if(self.writer is not None):
+            self.recover()
+
+    # Take the outcome of one PDF.
+    # Args:
+    #   file_name (str): Name of the PDF.
+    #   successfully_parsed (bool): Whether it was parsed successfully.
+    #   duration (float): Seconds it took. May be None.
+    #   record: Its record for the writer of the output. May be None.
+    #   failure (dict): Why the parser raised an error (see describe_failure). May be None.
+    #   status (str): Why it failed (see parse_pdf_progress_functions.py). Defaults to "parsed" or "failed".
+    def add(self, file_name: str, successfully_parsed: bool, duration: float | None = None, record = None, failure: dict | None = None, status: str | None = None):
+        if(self.writer is None or record is None):
+            self.progress_store.record(file_name, successfully_parsed, status, duration, failure)
+            if(not successfully_parsed and (status or "failed") in RETRY_STATUSES):
+                self.failed.append(file_name)
+            self.flush_if_due()
+            return
+
+        self.durations[file_name] = duration
+        self.record_saved(self.writer.write(file_name, record))
+
+    # Record the progress of PDFs the writer has sealed, then let it rename their output into place.
+    # Both the progress and the names of the sealed outputs are committed in one transaction first, so a crash at any point neither loses the output of a PDF recorded as parsed nor leaves the output of a PDF which is parsed again (see recover).
+    # Args:
+    #   file_names (list): Their file names.
+    def record_saved(self, file_names: list[str]):
+        if(len(file_names) == 0):
+            return
+        self.progress_store.record_sealed(self.writer.sealed, {file_name: self.durations.pop(file_name, None) for file_name in file_names})
+        self.progress_store.unseal(self.writer.publish())
+
+    # Rename the output a crashed run sealed and recorded but did not get to rename.
+    def recover(self):
+        sealed = self.progress_store.sealed()
+        if(len(sealed) > 0):
+            logging.warning(f"Renaming {len(sealed)} outputs of {self.progress_store.chunk} left under a temporary name by an earlier run.")
+            self.progress_store.unseal(self.writer.publish(sealed))
+
+    # Let the writer save what it has held for too long (see JSONLinesWriter.flush_if_due).
+    def flush_if_due(self):
+        if(self.writer is not None):
+            self.record_saved(self.writer.flush_if_due())
+
+    # Let the writer save everything it still holds, then commit and close the progress.
+    def close(self):
+        if(self.writer is not None):
+            self.record_saved(self.writer.close())
+        self.progress_store.close()
+
+# Hand items to a pool, never letting more than max_in_flight of them be queued or running at once.
+# Pool.imap_unordered on its own reads the whole iterable up front, so memory would grow with the size of the chunk.
+# Args:
+#   pool (Pool): The process pool.
+#   function (function): The function to apply to every item.
+#   items (iterable): The items.
+#   max_in_flight (int): Most items handed to the pool whose results we have not yet received.
+# Returns:
+#   generator: The results, in the order they finish.
+def bounded_imap_unordered(pool, function, items, max_in_flight: int):
+    slots = threading.Semaphore(max_in_flight)
+
+    def gated_items():
+        for item in items:
+            slots.acquire()
+            yield item
+
+    for result in pool.imap_unordered(function, gated_items()):
+        slots.release()
+        yield result
+
+# Same as bounded_imap_unordered, but the results come back in the order of the items.
+# A slow item holds back the results after it, and since results only free their slot once they are handed back, at most max_in_flight items wait behind it.
+# Args:
+#   pool (Pool): The process pool.
+#   function (function): The function to apply to every item.
+#   items (iterable): The items.
+#   max_in_flight (int): Most items handed to the pool whose results we have not yet handed back.
+# Returns:
+#   generator: The results, in the order of the items.
+def bounded_imap(pool, function, items, max_in_flight: int):
+    slots = threading.Semaphore(max_in_flight)
+
+    def gated_items():
+        for item in items:
+            slots.acquire()
+            yield item
+
+    for result in pool.imap(function, gated_items()):
+        slots.release()
+        yield result
+
+# Convert the --time-limit and --memory-limit arguments into the limits of supervised_imap_unordered.
+# Args:
+#   time_limit (float): Seconds, 0 for no limit.
+#   memory_limit (float): Megabytes, 0 for no limit.
+# Returns:
+#   tuple: The time limit in seconds and the memory limit in bytes, each None if there is no limit.
+def worker_limits(time_limit: float, memory_limit: float) -> tuple[float | None, int | None]:
+    return (time_limit if(time_limit > 0) else None), (int(memory_limit * 1024 * 1024) if(memory_limit > 0) else None)
+
+# Parse a list of PDFs, one at a time or over a pool of worker processes, and hand every outcome to the sink of the chunk.
+# One PDF failing (or even crashing its worker) never stops the others. Once they are all done, the PDFs which failed or crashed are tried again, up to retries times, in case the error was passing (e.g., a file system hiccup).
+# The progress and the writers of the output are only ever used by this (the main) process.
+# Args:
+#   parse_function (function): Parses one PDF. Takes the file name, returns what we parsed out of it (or None). Must be picklable (e.g., a functools.partial of a module-level function).
+#   output_function (function): Saves or serializes the result (e.g., a functools.partial of prepare_output). Must be picklable.
+#   file_names (iterable): Names of the PDFs to parse.
+#   sink (ResultSink): Takes the outcome of every PDF.
+#   log_file (str): File path to the log file.
+#   workers (int): Number of worker processes. With 1 and no limits, the PDFs are parsed in this process.
+#   max_in_flight (int): Most PDFs handed to the pool at once. Defaults to 4 per worker.
+#   time_limit (float): Seconds one PDF may take before its worker is killed and replaced. None for no limit.
+#   memory_limit (int): Bytes of memory a worker may use before it is killed and replaced. None for no limit.
+#   retries (int): Times the PDFs which failed or crashed are tried again.
+def run_parse(parse_function, output_function, file_names, sink: ResultSink, log_file: str, workers: int = 1, max_in_flight: int | None = None, time_limit: float | None = None, memory_limit: int | None = None, retries: int = 0):
+    task = functools.partial(parse_one_pdf, parse_function, output_function)
+
+    for retry in range(retries + 1):
+        if(retry > 0):
+            if(len(sink.failed) == 0):
+                break
+            logging.info(f"Trying {len(sink.failed)} PDFs which failed again (retry {retry} of {retries}).")
+            file_names = sink.failed
+        sink.failed = []
+        run_parse_pass(task, file_names, sink, log_file, workers, max_in_flight, time_limit, memory_limit)
+
+# Parse a list of PDFs once (see run_parse).
+# Args:
+#   task (function): parse_one_pdf with the parse and output functions filled in.
+#   file_names (iterable): Names of the PDFs to parse.
+#   sink (ResultSink): Takes the outcome of every PDF.
+#   log_file (str): File path to the log file.
+#   workers (int): Number of worker processes.
+#   max_in_flight (int): Most PDFs handed to the pool at once.
+#   time_limit (float): Seconds one PDF may take. None for no limit.
+#   memory_limit (int): Bytes of memory a worker may use. None for no limit.
+def run_parse_pass(task, file_names, sink: ResultSink, log_file: str, workers: int, max_in_flight: int | None, time_limit: float | None, memory_limit: int | None):
+    if(time_limit is not None or memory_limit is not None):
+        # The limits can only be enforced from outside the process parsing the PDF, so even a single worker gets its own process.
+        results = supervised_imap_unordered(task, ([file_name] for file_name in file_names), max(workers, 1), time_limit, memory_limit, configure_worker_logging, (log_file,))
+        for file_name, result, status in results:
+            if(status == "done"):
+                sink.add(*result)
+            else:
+                sink.add(file_name, False, status = status)
+    elif(workers <= 1):
+        for file_name in file_names:
+            sink.add(*task(file_name))
+    else:
+        if(max_in_flight is None):
+            max_in_flight = workers * 4
+
+        with multiprocessing.Pool(workers, initializer = configure_worker_logging, initargs = (log_file,)) as pool:
+            for result in bounded_imap_unordered(pool, task, file_names, max_in_flight):
+                sink.add(*result)
+
+# Add the arguments controlling how the results are saved to an argument parser.
+# Args:
+#   parser (ArgumentParser): The parser.
+def add_output_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--output", default = "json", choices = OUTPUTS, help = "Save one JSON file per PDF (json, default), compressed JSON Lines shards per chunk (jsonl) or Parquet tables of the docket sheets (parquet, needs pyarrow).")
+    parser.add_argument("--compression", default = "gzip", choices = ["gzip", "xz"], help = "Compression of the jsonl output (default gzip).")
+    parser.add_argument("--parquet-documents", action = "store_true", help = "Also save the whole JSON of every docket sheet in the documents table of the parquet output (court summaries always are).")
+
+# Read the PDFs which still need to be parsed across every chunk list under the root path.
+# Args:
+#   root (str): Root path of our files (the folder holding pdf_chunk_lists/ and progress_files/).
+#   chunk_pattern (str): Glob pattern of the chunk lists to include.
+#   path_to_progress_file (str): Folder with the progress files. Defaults to progress_files/ under the root path.
+#   path_to_main_progress_file (str): Folder with progress which is only read, not written (e.g., progress_files/ when parsing a shard, so PDFs parsed before the run was sharded are not parsed again). May be None.
+# Returns:
+#   DataFrame: One row per PDF with its chunk list (chunk) and name (file_name).
+def read_manifest(root: str, chunk_pattern: str = "*_chunkList.csv", path_to_progress_file: str | None = None, path_to_main_progress_file: str | None = None) -> pd.DataFrame:
+    if(path_to_progress_file is None):
+        path_to_progress_file = root + "progress_files/"
+    os.makedirs(path_to_progress_file, exist_ok = True)
+    chunk_tables = []
+
+    for chunk_path in sorted(glob.glob(root + "pdf_chunk_lists/" + chunk_pattern)):
+        chunk = os.path.basename(chunk_path)
+        progress_store = open_progress_store(path_to_progress_file, chunk)
+        parsed_elsewhere = None if(path_to_main_progress_file is None) else read_parsed_file_names(path_to_main_progress_file, chunk)
+        chunk_table, plan = plan_resume(chunk_path, progress_store, parsed_elsewhere)
+        progress_store.close()
+        logging.info(describe_plan(chunk, plan))
+        chunk_tables.append(pd.DataFrame({"chunk": chunk, "file_name": chunk_table["file_name"]}))
+
+    if(len(chunk_tables) == 0):
+        return pd.DataFrame({"chunk": pd.Series(dtype = "category"), "file_name": pd.Series(dtype = str)})
+
+    # Store the chunk as a category since millions of rows share a few hundred values.
+    manifest = pd.concat(chunk_tables, ignore_index = True)
+    manifest["chunk"] = manifest["chunk"].astype("category")
+    return manifest
+
+# Count the pages of a PDF without extracting anything.
+# Args:
+#   pdf_path (str): File path to the PDF.
+# Returns:
+#   int: The number of pages, or 1 if the PDF cannot be opened (it will fail fast anyway).
+def count_pdf_pages(pdf_path: str) -> int:
+    try:
+        pdf = pypdfium2.PdfDocument(pdf_path)
+    except Exception:
+        return 1
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+# Read the size of a PDF with one stat call.
+# Args:
+#   pdf_path (str): File path to the PDF.
+# Returns:
+#   int: The size in bytes, or 0 if the PDF is missing (it fails as soon as we try to open it).
+def pdf_size(pdf_path: str) -> int:
+    try:
+        return os.stat(pdf_path).st_size
+    except OSError:
+        return 0
+
+# Estimate how long each PDF of a manifest will take to parse.
+# Parsing time grows with the amount of text, which tracks both the file size and the page count.
+# The file size is much cheaper to get, the page count is closer to the truth.
+# Either way, millions of PDFs take a while to look at one by one, so they are spread over a pool.
+# Args:
+#   manifest (DataFrame): Output of read_manifest.
+#   root (str): Root path of our files (the folder holding pdfs/).
+#   cost (str): Either "size" (file size in bytes) or "pages" (number of pages).
+#   workers (int): Number of worker processes the PDFs will be parsed with.
+# Returns:
+#   Series: The estimated cost of each PDF, aligned with the manifest.
+def estimate_costs(manifest: pd.DataFrame, root: str, cost: str = "size", workers: int = 1) -> pd.Series:
+    # The county is the first part of the chunk name e.g., Montgomery_ds_CP_CR_chunkList.csv.
+    counties = manifest["chunk"].map(lambda chunk: chunk.split("_")[0]).astype(str)
+    pdf_paths = root + "pdfs/" + counties + "/" + manifest["file_name"]
+
+    if(cost == "pages"):
+        # pypdfium2 is not thread safe, so the PDFs are opened in worker processes.
+        function, pool = count_pdf_pages, multiprocessing.Pool(max(workers, 1))
+    elif(cost == "size"):
+        # A stat waits on the file system (slow on network storage) rather than the CPU, so threads overlap them.
+        function, pool = pdf_size, multiprocessing.pool.ThreadPool(max(workers, 1) * 4)
+    else:
+        raise ValueError(f"Unknown cost {cost}. Use size or pages.")
+
+    with pool:
+        return pd.Series(pool.map(function, pdf_paths, chunksize = 256), index = manifest.index, dtype = "int64")
+
+# Cut a manifest into batches of roughly equal cost, most expensive PDFs first.
+# Handing out the big PDFs first and the small ones last (longest processing time first) lets every worker finish at about the same time.
+# Cheap PDFs are grouped so the workers do not spend their time waiting on the queue.
+# Args:
+#   manifest (DataFrame): Output of read_manifest.
+#   costs (Series): Output of estimate_costs.
+#   workers (int): Number of worker processes.
+#   batches_per_worker (int): Roughly how many batches each worker should pull over the whole run.
+#   max_batch_size (int): Most PDFs in one batch, so progress is recorded regularly.
+# Returns:
+#   generator: Lists of (chunk, file_name) tuples.
+def make_batches(manifest: pd.DataFrame, costs: pd.Series, workers: int, batches_per_worker: int = 50, max_batch_size: int = 64):
+    order = costs.sort_values(ascending = False, kind = "stable").index
+    target_cost = max(costs.sum() / (workers * batches_per_worker), 1)
+
+    batch = []
+    batch_cost = 0
+    for chunk, file_name, cost in zip(manifest["chunk"].loc[order], manifest["file_name"].loc[order], costs.loc[order]):
+        batch.append((chunk, file_name))
+        batch_cost += cost
+        if(batch_cost >= target_cost or len(batch) >= max_batch_size):
+            yield batch
+            batch = []
+            batch_cost = 0
+
+    if(len(batch) > 0):
+        yield batch
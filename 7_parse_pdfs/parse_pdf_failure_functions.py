@@ -0,0 +1,23 @@
+# Why a PDF could not be parsed, kept next to its progress (see parse_pdf_progress_functions.py) so we can tell a bug in one section of the parser from a broken PDF without reading the logs.
+
+# An error raised while parsing one section of a document, which remembers where it happened.
+class SectionParseError(Exception):
+    # Args:
+    #   section (str): The section being parsed e.g., "poi", "closed" or "cases".
+    #   line_index (int): Index of the line being parsed, counting from the first line of the document. May be None.
+    #   error (Exception): The error itself.
+    def __init__(self, section: str, line_index: int | None, error: Exception):
+        super().__init__(f"{type(error).__name__} in section {section} at line {line_index}: {error}")
+        self.section = section
+        self.line_index = line_index
+        self.error = error
+
+# Describe why parsing a PDF failed.
+# Args:
+#   error (Exception): The error the parser raised.
+# Returns:
+#   dict: The class of the error (error_class), the section and line it was raised at (section, line_index, None if unknown) and its message (message).
+def describe_failure(error: Exception) -> dict[str, str | int | None]:
+    if(isinstance(error, SectionParseError)):
+        return {"error_class": type(error.error).__name__, "section": error.section, "line_index": error.line_index, "message": str(error.error)}
+    return {"error_class": type(error).__name__, "section": None, "line_index": None, "message": str(error)}
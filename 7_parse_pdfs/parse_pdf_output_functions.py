@@ -0,0 +1,355 @@
+import os
+import csv
+import gzip
+import json
+import lzma
+import time
+import socket
+from datetime import datetime
+
+# pyarrow is only needed for the parquet output.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Ways of saving what we parsed out of each PDF.
+#   json: One indented JSON file per PDF under json/ (what we always did). Written by the worker which parsed the PDF.
+#   jsonl: One compact JSON record per line, appended to a few large compressed files per chunk under jsonl/. Written by the main process.
+#   parquet: The repeated parts of the docket sheets (charges, bail, attorneys, ...) as flat tables under parquet/, one folder per table. Written by the main process. Needs pyarrow.
+#     The whole JSON of every PDF is only saved (in the documents table) if asked for, since it is as large as the jsonl output. Court summaries have no other tables, so theirs is always saved.
+# Saving happens in two steps: prepare_output runs in the worker right after parsing and returns what the main process should write (nothing for json), and the writer of the output (see open_output_writer) writes it.
+OUTPUTS = ("json", "jsonl", "parquet")
+
+# Columns of every table of the parquet output, on top of file_name (the PDF a row comes from) and row_nr (the row's number within its PDF, e.g., 2 for charge_nr_2).
+# These are every field the CP and MJ docket sheet parsers fill in; a field one court type does not have is left empty.
+PARQUET_TABLES = {
+    "documents": ["data"],
+    "charges": ["seq", "orig_seq", "nr", "charge", "grade", "statute", "description", "offense_date", "otn", "disposition"],
+    "bail_info": ["bail_action", "date", "bail_type", "originating_court", "percentage", "amount", "bail_action_reason"],
+    "surety_info": ["surety_type", "surety_name", "posting_status", "posting_date", "security_type", "security_amount"],
+    "attorneys": ["role", "name", "type", "representing", "counsel_status", "rep_status", "supreme_court_nr", "phone_nr", "address"],
+    "calendar_events": ["event_type", "start_date", "start_time", "room", "judge", "schedule_status"],
+    "docket_entries": ["filed_date", "entry", "filer", "applies_to"],
+    "case_financial": ["description", "assessment", "amount", "payment", "payment_amount", "adjustment", "adjusted_amount", "non_monetary_payment", "non_monetary_amount", "balance"]
+}
+
+# Save or serialize the result of one PDF, in the worker which parsed it.
+# Args:
+#   file_name (str): Name of the PDF.
+#   result (dict): What we parsed out of the PDF.
+#   output (str): One of OUTPUTS.
+#   path_to_json (str): Folder to save the JSON files in (only used by the json output).
+#   documents (bool): Whether to add the whole JSON of the PDF to the documents table (only used by the parquet output).
+# Returns:
+#   The record to hand to the writer of the output, or None if the result is already saved.
+def prepare_output(file_name: str, result: dict, output: str, path_to_json: str, documents: bool = False):
+    if(output == "json"):
+        # Create name of JSON based on the name of the PDF we are parsing.
+        filename = path_to_json + file_name.replace(".pdf", ".json")
+
+        # Save results.
+        with open(filename, "w") as json_file:
+            json.dump(result, json_file, indent = 4)
+        return None
+    elif(output == "jsonl"):
+        return json.dumps({"file_name": file_name, "data": result}, separators = (",", ":"))
+    elif(output == "parquet"):
+        tables = flatten_docket_tables(file_name, result)
+        if(documents):
+            tables["documents"] = [{"file_name": file_name, "data": json.dumps(result, separators = (",", ":"))}]
+        return tables
+    else:
+        raise ValueError(f"Unknown output {output}. Use one of {', '.join(OUTPUTS)}.")
+
+# Turn the numbered entries of one section (e.g., {"charge_nr_0": {...}, "charge_nr_1": {...}}) into rows.
+# Args:
+#   file_name (str): Name of the PDF.
+#   section (dict): The section. May be None.
+#   extra (dict): Columns to add to every row (e.g., the role of an attorney).
+# Returns:
+#   list: One dictionary per entry, with the file name and the number of the entry.
+def section_rows(file_name: str, section: dict | None, extra: dict | None = None) -> list[dict]:
+    rows = []
+    for key, entry in (section or {}).items():
+        # Some sections mix their entries with fields of the whole section (e.g., the case balance in the financial information).
+        if(not isinstance(entry, dict)):
+            continue
+        row = {"file_name": file_name, "row_nr": int(key.rsplit("_", 1)[1])}
+        row.update(extra or {})
+        row.update({field: (None if(value is None) else str(value)) for field, value in entry.items()})
+        rows.append(row)
+    return rows
+
+# Flatten the repeated parts of a parsed docket sheet (CP or MJ) into the tables of PARQUET_TABLES.
+# Court summaries have none of these sections, so only their documents row is saved (see prepare_output).
+# Args:
+#   file_name (str): Name of the PDF.
+#   result (dict): What extract_all returned.
+# Returns:
+#   dict: The rows of every table (except documents).
+def flatten_docket_tables(file_name: str, result: dict) -> dict[str, list[dict]]:
+    bail = result.get("bail") or {}
+    # CP docket sheets split the attorneys into prosecutors and defense, MJ docket sheets list them together with their type.
+    attorneys = result.get("attorneys") or {}
+    return {
+        "charges": section_rows(file_name, result.get("charges")),
+        "bail_info": section_rows(file_name, bail.get("bail_info")),
+        "surety_info": section_rows(file_name, bail.get("surety_info")),
+        "attorneys": (
+            section_rows(file_name, attorneys.get("prosecutors"), {"role": "prosecutor"}) +
+            section_rows(file_name, attorneys.get("defense"), {"role": "defense"}) +
+            section_rows(file_name, result.get("attorney_info"))
+        ),
+        "calendar_events": section_rows(file_name, result.get("calendar_events")),
+        "docket_entries": section_rows(file_name, result.get("docket_entry_info")),
+        "case_financial": section_rows(file_name, result.get("case_financial_info"))
+    }
+
+# Rename a file, unless it is gone (e.g., renamed already).
+# Args:
+#   path (str): File path to the file.
+#   new_path (str): Its new file path.
+def rename_if_exists(path: str, new_path: str):
+    try:
+        os.replace(path, new_path)
+    except FileNotFoundError:
+        pass
+
+# Appends JSON records of one chunk to rolling compressed JSON Lines files (shards).
+# A shard is written under a temporary name. Once it is complete, it is sealed (closed, and its index written under a temporary name too), and only once the progress of its PDFs is committed are both renamed to their final names (see publish and ResultSink.record_saved).
+# So a crash never leaves half a shard behind, nor a shard whose PDFs are parsed again. A *.tmp file the progress does not name (see ProgressStore.record_sealed) is what is left of a crash and can be deleted.
+# The index of a shard (a CSV next to it) gives the shard, line and byte offset (in the uncompressed text) of every PDF in it.
+class JSONLinesWriter:
+    # Args:
+    #   path_to_jsonl (str): Folder of the shards of the chunk.
+    #   chunk (str): Name of the chunk list e.g., Montgomery_ds_CP_CR_chunkList.csv.
+    #   compression (str): Either "gzip" or "xz".
+    #   max_records (int): Start a new shard after this many records...
+    #   max_bytes (int): ...or this many (uncompressed) bytes...
+    #   max_seconds (float): ...or this many seconds, so the progress of a slow chunk is still recorded regularly.
+    def __init__(self, path_to_jsonl: str, chunk: str, compression: str = "gzip", max_records: int = 10000, max_bytes: int = 256 * 1024 * 1024, max_seconds: float = 600):
+        os.makedirs(path_to_jsonl, exist_ok = True)
+        self.path_to_jsonl = path_to_jsonl
+        # Several jobs (e.g., the nodes of a sharded run) may write shards of the same chunk, so every writer names its shards after its host, process and start time (to the microsecond, since the scheduler may reopen the writer of a chunk right away to retry its failed PDFs).
+        self.shard_prefix = chunk.removesuffix(".csv") + "_" + socket.gethostname() + "_" + str(os.getpid()) + "_" + datetime.now().strftime("%Y%m%d%H%M%S%f")
+        self.extension = {"gzip": ".jsonl.gz", "xz": ".jsonl.xz"}[compression]
+        self.compression = compression
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.shard_number = 0
+        self.shard_file = None
+        # Shards sealed but not yet renamed.
+        self.sealed = []
+
+    # Start a new shard.
+    def open_shard(self):
+        self.shard_name = self.shard_prefix + "_" + str(self.shard_number).zfill(5) + self.extension
+        self.tmp_path = os.path.join(self.path_to_jsonl, self.shard_name + ".tmp")
+        if(self.compression == "gzip"):
+            self.shard_file = gzip.open(self.tmp_path, "wb", compresslevel = 6)
+        else:
+            self.shard_file = lzma.open(self.tmp_path, "wb", preset = 3)
+        self.index = []
+        self.offset = 0
+        self.opened = time.monotonic()
+
+    # File path of the index of a shard.
+    # Args:
+    #   shard_name (str): Name of the shard.
+    # Returns:
+    #   string: The file path.
+    def index_path(self, shard_name: str) -> str:
+        return os.path.join(self.path_to_jsonl, shard_name.rsplit(".jsonl", 1)[0] + ".index.csv")
+
+    # Seal the current shard: close it and write its index, both under temporary names until publish renames them.
+    # Returns:
+    #   list: The file names of the PDFs in the shard.
+    def close_shard(self) -> list[str]:
+        if(self.shard_file is None):
+            return []
+
+        self.shard_file.close()
+        self.shard_file = None
+        self.shard_number += 1
+
+        with open(self.index_path(self.shard_name) + ".tmp", "w", newline = "") as index_file:
+            writer = csv.writer(index_file)
+            writer.writerow(["file_name", "shard", "line", "offset"])
+            writer.writerows((file_name, self.shard_name, line, offset) for line, (file_name, offset) in enumerate(self.index))
+        self.sealed.append(self.shard_name)
+
+        return [file_name for file_name, _ in self.index]
+
+    # Rename sealed shards and their indexes to their final names. A shard is renamed before its index, so an index always points to a complete shard.
+    # What was renamed already is skipped, so the shards a crashed run may have left sealed can be renamed again (see ResultSink.recover).
+    # Args:
+    #   shard_names (list): Names of the shards. Defaults to the shards this writer sealed since the last call.
+    # Returns:
+    #   list: The names of the shards.
+    def publish(self, shard_names: list[str] | None = None) -> list[str]:
+        if(shard_names is None):
+            shard_names, self.sealed = self.sealed, []
+        for shard_name in shard_names:
+            rename_if_exists(os.path.join(self.path_to_jsonl, shard_name + ".tmp"), os.path.join(self.path_to_jsonl, shard_name))
+            rename_if_exists(self.index_path(shard_name) + ".tmp", self.index_path(shard_name))
+        return shard_names
+
+    # Append the record of one PDF.
+    # Args:
+    #   file_name (str): Name of the PDF.
+    #   record (str): Its record, as returned by prepare_output.
+    # Returns:
+    #   list: The file names of the PDFs whose shard was sealed by this call (usually none).
+    def write(self, file_name: str, record: str) -> list[str]:
+        if(self.shard_file is None):
+            self.open_shard()
+
+        line = (record + "\n").encode("utf-8")
+        self.shard_file.write(line)
+        self.index.append((file_name, self.offset))
+        self.offset += len(line)
+
+        if(len(self.index) >= self.max_records or self.offset >= self.max_bytes):
+            return self.close_shard()
+        return self.flush_if_due()
+
+    # Seal the current shard if it has been open for max_seconds.
+    # write only checks this when a record comes, so the caller also calls it while waiting for records (e.g., while the other chunks of a run are parsed).
+    # Returns:
+    #   list: The file names of the PDFs whose shard was sealed by this call (usually none).
+    def flush_if_due(self) -> list[str]:
+        if(self.shard_file is not None and time.monotonic() - self.opened >= self.max_seconds):
+            return self.close_shard()
+        return []
+
+    # Seal the last shard.
+    # Returns:
+    #   list: The file names of the PDFs in it.
+    def close(self) -> list[str]:
+        return self.close_shard()
+
+# Collects the tables of the PDFs of one chunk and writes them in batches, one Parquet file per table and batch, under parquet/{table}/.
+# Like the shards of JSONLinesWriter, the files of a batch are written under temporary names and only renamed into place (see publish) once the progress of its PDFs is committed.
+# The temporary files start with _, which Arrow skips when reading a folder.
+class ParquetTablesWriter:
+    # Args:
+    #   path_to_parquet (str): Folder holding one folder per table.
+    #   chunk (str): Name of the chunk list e.g., Montgomery_ds_CP_CR_chunkList.csv.
+    #   documents (bool): Whether to write the documents table too.
+    #   max_records (int): Write a batch after this many PDFs...
+    #   max_seconds (float): ...or this many seconds.
+    def __init__(self, path_to_parquet: str, chunk: str, documents: bool = False, max_records: int = 10000, max_seconds: float = 600):
+        if(pa is None):
+            raise ImportError("The parquet output needs pyarrow (pip install pyarrow).")
+        self.tables = [table for table in PARQUET_TABLES if(documents or table != "documents")]
+        for table in self.tables:
+            os.makedirs(os.path.join(path_to_parquet, table), exist_ok = True)
+        self.path_to_parquet = path_to_parquet
+        self.batch_prefix = chunk.removesuffix(".csv") + "_" + socket.gethostname() + "_" + str(os.getpid()) + "_" + datetime.now().strftime("%Y%m%d%H%M%S%f")
+        self.schemas = {
+            table: pa.schema(
+                [("file_name", pa.string())] + ([] if(table == "documents") else [("row_nr", pa.int32())]) + [(column, pa.string()) for column in columns]
+            )
+            for table, columns in PARQUET_TABLES.items() if(table in self.tables)
+        }
+        self.max_records = max_records
+        self.max_seconds = max_seconds
+        self.batch_number = 0
+        # Batches sealed but not yet renamed.
+        self.sealed = []
+        self.start_batch()
+
+    # Start collecting a new batch.
+    def start_batch(self):
+        self.rows = {table: [] for table in self.tables}
+        self.file_names = []
+        self.opened = time.monotonic()
+
+    # File path of the temporary file of a table of a batch.
+    # Args:
+    #   table (str): The table.
+    #   batch_name (str): Name of the batch.
+    # Returns:
+    #   string: The file path.
+    def tmp_path(self, table: str, batch_name: str) -> str:
+        return os.path.join(self.path_to_parquet, table, "_" + batch_name + ".tmp")
+
+    # Seal the current batch: write one file per table, under temporary names until publish renames them.
+    # Returns:
+    #   list: The file names of the PDFs in the batch.
+    def write_batch(self) -> list[str]:
+        if(len(self.file_names) == 0):
+            return []
+
+        batch_name = self.batch_prefix + "_" + str(self.batch_number).zfill(5) + ".parquet"
+        for table, rows in self.rows.items():
+            pq.write_table(pa.Table.from_pylist(rows, schema = self.schemas[table]), self.tmp_path(table, batch_name), compression = "zstd")
+        self.batch_number += 1
+        self.sealed.append(batch_name)
+
+        file_names = self.file_names
+        self.start_batch()
+        return file_names
+
+    # Add the tables of one PDF.
+    # Args:
+    #   file_name (str): Name of the PDF.
+    #   record (dict): Its rows of every table, as returned by prepare_output.
+    # Returns:
+    #   list: The file names of the PDFs whose batch was sealed by this call (usually none).
+    def write(self, file_name: str, record: dict) -> list[str]:
+        for table, rows in record.items():
+            self.rows[table].extend(rows)
+        self.file_names.append(file_name)
+
+        if(len(self.file_names) >= self.max_records):
+            return self.write_batch()
+        return self.flush_if_due()
+
+    # Write the current batch if it has been collected for max_seconds (see JSONLinesWriter.flush_if_due).
+    # Returns:
+    #   list: The file names of the PDFs whose batch was sealed by this call (usually none).
+    def flush_if_due(self) -> list[str]:
+        if(len(self.file_names) > 0 and time.monotonic() - self.opened >= self.max_seconds):
+            return self.write_batch()
+        return []
+
+    # Seal the last batch.
+    # Returns:
+    #   list: The file names of the PDFs in it.
+    def close(self) -> list[str]:
+        return self.write_batch()
+
+    # Rename the files of sealed batches to their final names (see JSONLinesWriter.publish).
+    # Args:
+    #   batch_names (list): Names of the batches. Defaults to the batches this writer sealed since the last call.
+    # Returns:
+    #   list: The names of the batches.
+    def publish(self, batch_names: list[str] | None = None) -> list[str]:
+        if(batch_names is None):
+            batch_names, self.sealed = self.sealed, []
+        for batch_name in batch_names:
+            # A batch left by an earlier run may have the documents table even if this one does not.
+            for table in PARQUET_TABLES:
+                rename_if_exists(self.tmp_path(table, batch_name), os.path.join(self.path_to_parquet, table, batch_name))
+        return batch_names
+
+# Open the writer the main process uses for an output.
+# Args:
+#   output (str): One of OUTPUTS.
+#   root (str): Root path of our files.
+#   chunk (str): Name of the chunk list.
+#   compression (str): Compression of the jsonl output, either "gzip" or "xz". The parquet output is always compressed with zstd.
+#   documents (bool): Whether the parquet output writes the documents table too (see prepare_output).
+# Returns:
+#   The writer, or None if the workers save the output themselves.
+def open_output_writer(output: str, root: str, chunk: str, compression: str = "gzip", documents: bool = False):
+    if(output == "jsonl"):
+        return JSONLinesWriter(root + "jsonl/" + chunk.removesuffix(".csv") + "/", chunk, compression)
+    elif(output == "parquet"):
+        return ParquetTablesWriter(root + "parquet/", chunk, documents)
+    return None
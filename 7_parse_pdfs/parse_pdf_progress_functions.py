@@ -0,0 +1,257 @@
+import os
+import time
+import sqlite3
+import urllib.parse
+import pandas as pd
+from datetime import datetime
+
+# Progress of the parser, kept in one SQLite database per chunk list (and per shard, see parse_pdfs_scheduler.py).
+# One row per PDF holding its latest status, how often we tried it and how long the last try took.
+# We keep one database per chunk instead of one for everything because SQLite must not be shared between nodes over NFS/Lustre, and different chunks may run on different nodes.
+#
+# The status of a PDF is one of:
+#   parsed: Parsed and its output saved.
+#   failed: The parser raised an error.
+#   timeout, memory_limit: Its worker was killed for going over a limit (see parse_pdf_watchdog_functions.py).
+#   crashed: Its worker died on its own (e.g., a segfault).
+#
+# Every time the parser raises an error, a row of the failures table says why: the class of the error, the section and line of the document it was raised at (when the parser knows, see parse_pdf_failure_functions.py) and its message.
+#
+# The jsonl and parquet outputs are written under temporary names and renamed into place once complete. The sealed table names the outputs whose PDFs were recorded as parsed but which may not be renamed yet, committed together with those PDFs (see ResultSink.record_saved).
+
+CREATE_PROGRESS_TABLE = """
+CREATE TABLE IF NOT EXISTS progress (
+    chunk TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    successfully_parsed INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    duration REAL,
+    time_stamp TEXT NOT NULL,
+    PRIMARY KEY (chunk, file_name)
+)
+"""
+
+CREATE_FAILURES_TABLE = """
+CREATE TABLE IF NOT EXISTS failures (
+    chunk TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    error_class TEXT NOT NULL,
+    section TEXT,
+    line_index INTEGER,
+    message TEXT,
+    time_stamp TEXT NOT NULL
+)
+"""
+
+CREATE_SEALED_TABLE = """
+CREATE TABLE IF NOT EXISTS sealed (
+    chunk TEXT NOT NULL,
+    output TEXT NOT NULL,
+    PRIMARY KEY (chunk, output)
+)
+"""
+
+# Record one try of a PDF, counting the tries.
+# A PDF stays parsed once it was (e.g., when a retry pass or a node taking over a shard tries it again and fails), keeping the status and duration of the try which parsed it.
+UPSERT_PROGRESS = """
+INSERT INTO progress (chunk, file_name, successfully_parsed, status, attempts, duration, time_stamp)
+VALUES (?, ?, ?, ?, 1, ?, ?)
+ON CONFLICT (chunk, file_name) DO UPDATE SET
+    successfully_parsed = MAX(successfully_parsed, excluded.successfully_parsed),
+    status = CASE WHEN excluded.successfully_parsed >= successfully_parsed THEN excluded.status ELSE status END,
+    attempts = attempts + 1,
+    duration = CASE WHEN excluded.successfully_parsed >= successfully_parsed THEN excluded.duration ELSE duration END,
+    time_stamp = excluded.time_stamp
+"""
+
+# File path of the progress database of a chunk list.
+# Args:
+#   path_to_progress_file (str): Folder with the progress files.
+#   chunk (str): Name of the chunk list e.g., Montgomery_ds_CP_CR_chunkList.csv.
+# Returns:
+#   string: The file path.
+def progress_db_path(path_to_progress_file: str, chunk: str) -> str:
+    return path_to_progress_file + "progress-" + chunk.removesuffix(".csv") + ".sqlite"
+
+class ProgressStore:
+    # Open (or create) the progress database of a chunk list.
+    # The first time, the old progress CSV of the chunk is imported if there is one.
+    # Args:
+    #   progress_db (str): File path to the database (see progress_db_path).
+    #   chunk (str): Name of the chunk list.
+    #   legacy_progress_file (str): File path to the progress CSV written before we had the database. May be None.
+    #   batch_size (int): Commit after this many rows...
+    #   batch_seconds (float): ...or after this many seconds, whichever comes first. A crash loses at most this much progress, and those PDFs are simply parsed again.
+    def __init__(self, progress_db: str, chunk: str, legacy_progress_file: str | None = None, batch_size: int = 500, batch_seconds: float = 5):
+        self.chunk = chunk
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.pending = []
+        self.pending_failures = []
+        self.pending_sealed = []
+        self.last_commit = time.monotonic()
+
+        self.connection = sqlite3.connect(progress_db)
+        # WAL lets us read the progress (e.g., from another terminal) while the parser writes to it.
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(CREATE_PROGRESS_TABLE)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS progress_chunk_parsed ON progress (chunk, successfully_parsed)")
+        self.connection.execute(CREATE_FAILURES_TABLE)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS failures_chunk_file_name ON failures (chunk, file_name)")
+        self.connection.execute(CREATE_SEALED_TABLE)
+        self.connection.commit()
+
+        if(legacy_progress_file is not None and os.path.exists(legacy_progress_file) and not self.has_progress()):
+            self.import_progress_csv(legacy_progress_file)
+
+    # Import a progress CSV written by an older version of the parser (one row per try).
+    # Args:
+    #   progress_file (str): File path to the CSV.
+    def import_progress_csv(self, progress_file: str):
+        progress_df = pd.read_csv(progress_file, dtype = {"file_name": str, "successfully_parsed": bool})
+        if("status" not in progress_df.columns):
+            progress_df["status"] = progress_df["successfully_parsed"].map({True: "parsed", False: "failed"})
+
+        # Collapse the tries of every PDF into one row: parsed if any try succeeded, and the status and time of the last try.
+        tries = progress_df.groupby("file_name", sort = False)
+        progress_df = pd.DataFrame({
+            "successfully_parsed": tries["successfully_parsed"].max(),
+            "status": tries["status"].last(),
+            "attempts": tries.size(),
+            "time_stamp": tries["time_stamp"].last()
+        }).reset_index()
+        progress_df.loc[progress_df["successfully_parsed"], "status"] = "parsed"
+
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO progress (chunk, file_name, successfully_parsed, status, attempts, duration, time_stamp) VALUES (?, ?, ?, ?, ?, NULL, ?)",
+            ((self.chunk, row.file_name, int(row.successfully_parsed), row.status, int(row.attempts), row.time_stamp) for row in progress_df.itertuples())
+        )
+        self.connection.commit()
+
+    # Check whether any PDF of the chunk has been tried.
+    # Returns:
+    #   bool: Whether there is progress.
+    def has_progress(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM progress WHERE chunk = ? LIMIT 1", (self.chunk,)).fetchone() is not None
+
+    # Record the outcome of one PDF. Rows are committed in batches (see __init__).
+    # Args:
+    #   file_name (str): Name of the PDF.
+    #   successfully_parsed (bool): Whether the PDF was parsed (and its output saved).
+    #   status (str): See the top of this file. Defaults to "parsed" or "failed" depending on successfully_parsed.
+    #   duration (float): Seconds the PDF took. May be None.
+    #   failure (dict): Why the parser raised an error (see parse_pdf_failure_functions.py). May be None.
+    def record(self, file_name: str, successfully_parsed: bool, status: str | None = None, duration: float | None = None, failure: dict | None = None):
+        if(status is None):
+            status = "parsed" if(successfully_parsed) else "failed"
+        time_stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.pending.append((self.chunk, file_name, int(successfully_parsed), status, duration, time_stamp))
+        if(failure is not None):
+            self.pending_failures.append((self.chunk, file_name, failure["error_class"], failure["section"], failure["line_index"], failure["message"], time_stamp))
+
+        if(len(self.pending) >= self.batch_size or time.monotonic() - self.last_commit >= self.batch_seconds):
+            self.flush()
+
+    # Record the PDFs saved in outputs written under a temporary name as parsed, and name those outputs in the sealed table, in one transaction.
+    # Once the outputs are renamed into place, drop them with unseal. Until then, a crash leaves them named here, so the next run knows to rename them (and that their PDFs are parsed).
+    # Args:
+    #   outputs (list): Names of the outputs.
+    #   durations (dict): Seconds each of their PDFs took (None if unknown), by file name.
+    def record_sealed(self, outputs: list[str], durations: dict[str, float | None]):
+        time_stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.pending.extend((self.chunk, file_name, 1, "parsed", duration, time_stamp) for file_name, duration in durations.items())
+        self.pending_sealed.extend((self.chunk, output) for output in outputs)
+        self.flush()
+
+    # Read the outputs of the chunk named in the sealed table (see record_sealed).
+    # Returns:
+    #   list: Their names.
+    def sealed(self) -> list[str]:
+        return [row[0] for row in self.connection.execute("SELECT output FROM sealed WHERE chunk = ?", (self.chunk,))]
+
+    # Drop outputs from the sealed table once they are renamed into place.
+    # Args:
+    #   outputs (list): Their names.
+    def unseal(self, outputs: list[str]):
+        if(len(outputs) > 0):
+            self.connection.executemany("DELETE FROM sealed WHERE chunk = ? AND output = ?", ((self.chunk, output) for output in outputs))
+            self.connection.commit()
+
+    # Commit every recorded row.
+    def flush(self):
+        if(len(self.pending) > 0 or len(self.pending_sealed) > 0):
+            self.connection.executemany(UPSERT_PROGRESS, self.pending)
+            self.connection.executemany("INSERT INTO failures (chunk, file_name, error_class, section, line_index, message, time_stamp) VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending_failures)
+            self.connection.executemany("INSERT OR IGNORE INTO sealed (chunk, output) VALUES (?, ?)", self.pending_sealed)
+            self.connection.commit()
+            self.pending = []
+            self.pending_failures = []
+            self.pending_sealed = []
+        self.last_commit = time.monotonic()
+
+    # Commit every recorded row and close the database.
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    # Read the PDFs of the chunk which were parsed, or those which were tried but not parsed.
+    # Args:
+    #   successfully_parsed (bool): Whether to read the parsed or the not parsed PDFs.
+    # Returns:
+    #   list: Their file names.
+    def file_names(self, successfully_parsed: bool) -> list[str]:
+        query = "SELECT file_name FROM progress WHERE chunk = ? AND successfully_parsed = ?"
+        return [row[0] for row in self.connection.execute(query, (self.chunk, int(successfully_parsed)))]
+
+    # Count the PDFs of the chunk by status.
+    # Returns:
+    #   DataFrame: One row per status with the number of PDFs, their total tries and their average duration.
+    def summary(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT status, COUNT(*) AS pdfs, SUM(attempts) AS attempts, AVG(duration) AS mean_duration FROM progress WHERE chunk = ? GROUP BY status",
+            self.connection,
+            params = (self.chunk,)
+        )
+
+    # Read why the PDFs of the chunk failed, one row per error raised.
+    # Returns:
+    #   DataFrame: The file name, class of the error, section, line index, message and time of every failure, latest last.
+    def failures(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT file_name, error_class, section, line_index, message, time_stamp FROM failures WHERE chunk = ? ORDER BY rowid",
+            self.connection,
+            params = (self.chunk,)
+        )
+
+# Read the PDFs of a chunk which were parsed, without writing anything, so many nodes can read the same progress at once (e.g., the progress from before a sharded run, see parse_pdfs_scheduler.py).
+# Args:
+#   path_to_progress_file (str): Folder with the progress files.
+#   chunk (str): Name of the chunk list e.g., Montgomery_ds_CP_CR_chunkList.csv.
+# Returns:
+#   list: Their file names, from the progress database of the chunk if there is one, from its old progress CSV otherwise (empty if neither).
+def read_parsed_file_names(path_to_progress_file: str, chunk: str) -> list[str]:
+    progress_db = progress_db_path(path_to_progress_file, chunk)
+    if(os.path.exists(progress_db)):
+        connection = sqlite3.connect("file:" + urllib.parse.quote(os.path.abspath(progress_db)) + "?mode=ro", uri = True)
+        try:
+            return [row[0] for row in connection.execute("SELECT file_name FROM progress WHERE chunk = ? AND successfully_parsed = 1", (chunk,))]
+        finally:
+            connection.close()
+
+    legacy_progress_file = path_to_progress_file + "progress-" + chunk
+    if(os.path.exists(legacy_progress_file)):
+        progress_df = pd.read_csv(legacy_progress_file, usecols = ["file_name", "successfully_parsed"], dtype = {"file_name": str, "successfully_parsed": bool})
+        return progress_df.loc[progress_df["successfully_parsed"], "file_name"].unique().tolist()
+    return []
+
+# Open the progress database of a chunk list.
+# Args:
+#   path_to_progress_file (str): Folder with the progress files.
+#   chunk (str): Name of the chunk list e.g., Montgomery_ds_CP_CR_chunkList.csv.
+# Returns:
+#   ProgressStore: The progress of the chunk, with the old progress CSV imported if this is the first time we open it.
+def open_progress_store(path_to_progress_file: str, chunk: str) -> ProgressStore:
+    os.makedirs(path_to_progress_file, exist_ok = True)
+    return ProgressStore(progress_db_path(path_to_progress_file, chunk), chunk, path_to_progress_file + "progress-" + chunk)
@@ -0,0 +1,176 @@
+import os
+import time
+import uuid
+import socket
+import hashlib
+import logging
+import threading
+import pandas as pd
+
+# Read a shard given as i/N e.g., 3/16 is the fourth of 16 shards.
+# Args:
+#   shard_spec (str): The shard, counting from 0.
+# Returns:
+#   tuple: The shard and the number of shards.
+def parse_shard_spec(shard_spec: str) -> tuple[int, int]:
+    shard, shard_count = (int(x) for x in shard_spec.split("/"))
+    if(shard_count < 1 or shard < 0 or shard >= shard_count):
+        raise ValueError(f"Shard {shard_spec} is not of the form i/N with 0 <= i < N.")
+    return shard, shard_count
+
+# Find the shard a PDF belongs to.
+# We use our own hash (instead of Python's hash, which changes every run) so every node agrees on the partition.
+# Args:
+#   file_name (str): Name of the PDF.
+#   shard_count (int): Number of shards.
+# Returns:
+#   int: The shard of the PDF.
+def shard_of(file_name: str, shard_count: int) -> int:
+    return int.from_bytes(hashlib.md5(file_name.encode("utf-8")).digest()[:8], "big") % shard_count
+
+# Keep only the PDFs of one shard.
+# Args:
+#   manifest (DataFrame): Output of read_manifest.
+#   shard (int): The shard to keep.
+#   shard_count (int): Number of shards.
+# Returns:
+#   DataFrame: The rows of the manifest in the shard.
+def filter_shard(manifest: pd.DataFrame, shard: int, shard_count: int) -> pd.DataFrame:
+    return manifest[manifest["file_name"].map(lambda file_name: shard_of(file_name, shard_count) == shard)]
+
+# Name of the files marking who holds a shard and whether it is done.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+# Returns:
+#   string: The file path without extension.
+def shard_file_stem(lease_dir: str, shard: int, shard_count: int) -> str:
+    return os.path.join(lease_dir, f"shard_{shard}_of_{shard_count}")
+
+# Make a name for this process which no other process on any node will have.
+# Returns:
+#   string: hostname:pid:random.
+def lease_owner_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Read who holds a lease.
+# Args:
+#   lease_file (str): File path to the lease.
+# Returns:
+#   string: The owner, or None if nobody holds the lease.
+def read_lease_owner(lease_file: str) -> str | None:
+    try:
+        with open(lease_file) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        return None
+
+# Check whether a shard has been parsed to the end.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+# Returns:
+#   bool: Whether the shard is done.
+def is_shard_done(lease_dir: str, shard: int, shard_count: int) -> bool:
+    return os.path.exists(shard_file_stem(lease_dir, shard, shard_count) + ".done")
+
+# Check whether every shard has been parsed to the end.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard_count (int): Number of shards.
+# Returns:
+#   bool: Whether all shards are done.
+def are_all_shards_done(lease_dir: str, shard_count: int) -> bool:
+    return all(is_shard_done(lease_dir, shard, shard_count) for shard in range(shard_count))
+
+# Mark a shard as parsed to the end so no node picks it up again.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+#   owner (str): The process which finished the shard.
+def mark_shard_done(lease_dir: str, shard: int, shard_count: int, owner: str):
+    with open(shard_file_stem(lease_dir, shard, shard_count) + ".done", "w") as file:
+        file.write(owner + "\n")
+
+# Try to take the lease of a shard.
+# A lease is a file holding the name of its owner. The owner touches it regularly (see start_heartbeat), so a lease nobody touched for lease_timeout seconds belongs to a node which died, and we take it over.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+#   owner (str): Our name (see lease_owner_name).
+#   lease_timeout (float): Seconds after which a lease nobody touched counts as abandoned.
+# Returns:
+#   bool: Whether we now hold the lease.
+def try_acquire_lease(lease_dir: str, shard: int, shard_count: int, owner: str, lease_timeout: float) -> bool:
+    os.makedirs(lease_dir, exist_ok = True)
+    lease_file = shard_file_stem(lease_dir, shard, shard_count) + ".lease"
+
+    # Creating the file only succeeds if nobody holds the lease.
+    try:
+        fd = os.open(lease_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, "w") as file:
+            file.write(owner + "\n")
+        return True
+    except FileExistsError:
+        pass
+
+    try:
+        lease_age = time.time() - os.path.getmtime(lease_file)
+    except FileNotFoundError:
+        # The owner released it in the meantime; the shard is probably done, so let the caller check again later.
+        return False
+
+    if(lease_age < lease_timeout):
+        return False
+
+    # The owner stopped touching the lease, so we take it over by renaming our own lease over it.
+    logging.warning(f"Taking over the lease of shard {shard}/{shard_count} from {read_lease_owner(lease_file)}, untouched for {lease_age:.0f} seconds.")
+    tmp_file = lease_file + "." + owner.replace(":", "_") + ".tmp"
+    with open(tmp_file, "w") as file:
+        file.write(owner + "\n")
+    os.replace(tmp_file, lease_file)
+
+    # Another node may have done the same at the same time. The last rename wins, so wait a moment and check it was ours.
+    time.sleep(min(5, lease_timeout / 10))
+    return read_lease_owner(lease_file) == owner
+
+# Give a lease back.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+#   owner (str): Our name. The lease is only removed if we still hold it.
+def release_lease(lease_dir: str, shard: int, shard_count: int, owner: str):
+    lease_file = shard_file_stem(lease_dir, shard, shard_count) + ".lease"
+    if(read_lease_owner(lease_file) == owner):
+        os.remove(lease_file)
+
+# Touch a lease regularly in a background thread so other nodes know we are still alive.
+# Args:
+#   lease_dir (str): Folder with the lease files.
+#   shard (int): The shard.
+#   shard_count (int): Number of shards.
+#   owner (str): Our name.
+#   interval (float): Seconds between touches. Should be well below the lease timeout.
+# Returns:
+#   tuple: An Event to set to stop the heartbeat, and an Event the heartbeat sets once another node has taken the lease over.
+def start_heartbeat(lease_dir: str, shard: int, shard_count: int, owner: str, interval: float) -> tuple[threading.Event, threading.Event]:
+    lease_file = shard_file_stem(lease_dir, shard, shard_count) + ".lease"
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def beat():
+        while(not stop.wait(interval)):
+            if(read_lease_owner(lease_file) != owner):
+                # Someone took the shard over (e.g., we stalled for longer than the timeout). The shard is theirs now, so we stop handing out its PDFs (see run_schedule).
+                logging.warning(f"Lost the lease of shard {shard}/{shard_count}.")
+                lost.set()
+                return
+            os.utime(lease_file)
+
+    threading.Thread(target = beat, daemon = True).start()
+    return stop, lost
@@ -0,0 +1,351 @@
+import os
+import re
+import gzip
+import json
+import bisect
+import hashlib
+import logging
+import pdfplumber
+import pypdfium2
+import pypdfium2.raw as pdfium_c
+from pdfplumber.utils.text import extract_text as layout_text
+
+# Engines we can extract the layout text with. Both produce the same text; pdfium is several times faster.
+TEXT_ENGINES = ("pdfplumber", "pdfium")
+
+# Bump this if the way we store or build the cached text changes so old cache entries are never reused.
+TEXT_CACHE_VERSION = 1
+
+# Hash the raw bytes of a PDF.
+# Args:
+#   pdf_path (str): File path to the PDF.
+# Returns:
+#   string: The SHA-256 hex digest of the file contents.
+def hash_pdf(pdf_path: str) -> str:
+    sha = hashlib.sha256()
+    with open(pdf_path, "rb") as pdf_file:
+        # Read the file in 1 MB blocks so large PDFs are never held in memory all at once.
+        for block in iter(lambda: pdf_file.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+# Build the cache key for one PDF.
+# The key is the content hash of the PDF plus every setting which changes the extracted text.
+# Renaming or moving a PDF does not invalidate its cache entry, but changing any extraction setting does.
+# Args:
+#   pdf_hash (str): Content hash of the PDF (see hash_pdf).
+#   keep_blank_chars (bool): Setting passed to pdfplumber.
+#   x_density (float): Setting passed to pdfplumber.
+#   y_density (float): Setting passed to pdfplumber.
+#   engine (str): Engine used to read the characters off the page (see TEXT_ENGINES).
+# Returns:
+#   string: The cache key.
+def text_cache_key(pdf_hash: str, keep_blank_chars: bool, x_density: float, y_density: float, engine: str = "pdfplumber") -> str:
+    settings = {
+        "version": TEXT_CACHE_VERSION,
+        "pdfplumber": pdfplumber.__version__,
+        "layout": True,
+        "keep_blank_chars": keep_blank_chars,
+        "x_density": x_density,
+        "y_density": y_density
+    }
+    # Only add the engine for pdfium so entries written before pdfium was an option stay valid.
+    if(engine == "pdfium"):
+        settings["engine"] = engine
+        settings["pypdfium2"] = pypdfium2.V_PYPDFIUM2
+        settings["pdfium"] = pypdfium2.V_LIBPDFIUM
+    settings = json.dumps(settings, sort_keys = True)
+    return hashlib.sha256((pdf_hash + settings).encode("utf-8")).hexdigest()
+
+# Read cached page texts.
+# Args:
+#   cache_path (str): File path to the cache entry.
+# Returns:
+#   list: The text of each page, or None if there is no (readable) cache entry.
+def read_cached_pages(cache_path: str) -> list[str] | None:
+    try:
+        with gzip.open(cache_path, "rt", encoding = "utf-8") as cache_file:
+            return json.load(cache_file)
+    except (FileNotFoundError, EOFError, OSError, ValueError):
+        # A missing or half-written entry just means we need to extract the text again.
+        return None
+
+# Write page texts to the cache.
+# We write to a temporary file and then rename it so a crashed job never leaves a half-written entry behind.
+# Args:
+#   cache_path (str): File path to the cache entry.
+#   pages (list): The text of each page.
+def write_cached_pages(cache_path: str, pages: list[str]):
+    os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+    tmp_path = cache_path + "." + str(os.getpid()) + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding = "utf-8", compresslevel = 1) as cache_file:
+        json.dump(pages, cache_file)
+    os.replace(tmp_path, cache_path)
+
+# Read the characters of one page with pdfium, in the form pdfplumber's layout code expects.
+# pdfium merges a run of spaces drawn by the PDF into a single character, which would shift every column after it.
+# So whenever a space is followed by a gap on the same line, we put back as many spaces as fit into the gap.
+# Args:
+#   text_page (PdfTextPage): The pdfium text page.
+#   page_height (float): Height of the page, used to flip pdfium's bottom-up y-axis into pdfplumber's top-down one.
+# Returns:
+#   list: One dictionary per character with the keys pdfplumber uses (text, x0, x1, top, bottom, doctop, upright).
+def pdfium_page_chars(text_page, page_height: float) -> list[dict]:
+    raw_page = text_page.raw
+    box = pdfium_c.FS_RECTF()
+    chars = []
+    previous = None
+
+    for i in range(pdfium_c.FPDFText_CountChars(raw_page)):
+        # Skip the characters pdfium makes up itself (line breaks and spaces between words) since pdfplumber never sees them.
+        if(pdfium_c.FPDFText_IsGenerated(raw_page, i) != 0):
+            continue
+
+        text = chr(pdfium_c.FPDFText_GetUnicode(raw_page, i))
+        if(text in "\r\n\x00"):
+            continue
+
+        pdfium_c.FPDFText_GetLooseCharBox(raw_page, i, box)
+        char = {"text": text, "x0": box.left, "x1": box.right, "top": page_height - box.top, "bottom": page_height - box.bottom, "doctop": page_height - box.top, "upright": True}
+
+        if(previous is not None and previous["text"] == " " and previous["top"] == char["top"]):
+            space_width = previous["x1"] - previous["x0"]
+            gap = char["x0"] - previous["x1"]
+            if(space_width > 0 and gap > space_width / 2):
+                for j in range(round(gap / space_width)):
+                    x0 = previous["x1"] + j * space_width
+                    chars.append({**previous, "x0": x0, "x1": x0 + space_width})
+
+        chars.append(char)
+        previous = char
+
+    return chars
+
+# Extract the layout text of each page of a PDF with pdfium.
+# pdfium only reads the characters; the layout itself is still done by pdfplumber so the text matches the pdfplumber engine.
+# Args:
+#   pdf_path (str): File path to the PDF.
+#   keep_blank_chars (bool): Setting passed to pdfplumber.
+#   x_density (float): Setting passed to pdfplumber.
+#   y_density (float): Setting passed to pdfplumber.
+# Returns:
+#   list: The text of each page.
+def extract_page_texts_pdfium(pdf_path: str, keep_blank_chars: bool = True, x_density: float = 3.9, y_density: float = 13) -> list[str]:
+    pages = []
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        for page_number in range(len(pdf)):
+            page = pdf[page_number]
+            text_page = page.get_textpage()
+            width, height = page.get_size()
+            chars = pdfium_page_chars(text_page, height)
+            pages.append(layout_text(chars, layout = True, layout_bbox = (0, 0, width, height), layout_width = width, layout_height = height, x_density = x_density, y_density = y_density, keep_blank_chars = keep_blank_chars))
+            text_page.close()
+            page.close()
+    finally:
+        pdf.close()
+    return pages
+
+# Extract the layout text of each page of a PDF with pdfplumber.
+# Args:
+#   pdf_path (str): File path to the PDF.
+#   keep_blank_chars (bool): Setting passed to pdfplumber.
+#   x_density (float): Setting passed to pdfplumber.
+#   y_density (float): Setting passed to pdfplumber.
+# Returns:
+#   list: The text of each page.
+def extract_page_texts_pdfplumber(pdf_path: str, keep_blank_chars: bool = True, x_density: float = 3.9, y_density: float = 13) -> list[str]:
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text(keep_blank_chars = keep_blank_chars, layout = True, x_density = x_density, y_density = y_density) for page in pdf.pages]
+
+# Extract the layout text of each page of a PDF, using the on-disk cache if one is given.
+# Args:
+#   pdf_path (str): File path to the PDF.
+#   keep_blank_chars (bool): Setting passed to pdfplumber.
+#   x_density (float): Setting passed to pdfplumber.
+#   y_density (float): Setting passed to pdfplumber.
+#   cache_dir (str): Directory holding the text cache. If None, the cache is not used.
+#   engine (str): Engine used to read the characters off the page, either "pdfplumber" or "pdfium".
+# Returns:
+#   list: The text of each page.
+def extract_page_texts(pdf_path: str, keep_blank_chars: bool = True, x_density: float = 3.9, y_density: float = 13, cache_dir: str | None = None, engine: str = "pdfplumber") -> list[str]:
+    if(engine not in TEXT_ENGINES):
+        raise ValueError(f"Unknown text engine {engine}. Use one of {', '.join(TEXT_ENGINES)}.")
+
+    cache_path = None
+
+    if(cache_dir is not None):
+        key = text_cache_key(hash_pdf(pdf_path), keep_blank_chars, x_density, y_density, engine)
+        # Spread the entries over 256 sub-directories so no single directory gets millions of files.
+        cache_path = os.path.join(cache_dir, key[:2], key + ".json.gz")
+        pages = read_cached_pages(cache_path)
+        if(pages is not None):
+            return pages
+
+    if(engine == "pdfium"):
+        pages = extract_page_texts_pdfium(pdf_path, keep_blank_chars, x_density, y_density)
+    else:
+        pages = extract_page_texts_pdfplumber(pdf_path, keep_blank_chars, x_density, y_density)
+
+    if(cache_path is not None):
+        write_cached_pages(cache_path, pages)
+
+    return pages
+
+# Every page of a docket sheet starts with the same header band (court, docket number, "Commonwealth of Pennsylvania v. <defendant>") and ends with the same footer band (form number, print date and disclaimer).
+# We crop both bands off every page so the body of one page continues straight into the body of the next (see extract_sections of the docket sheet parsers).
+# A layout text line is one y_density tall band of the page, so cropping lines is the same as cropping the page to the body's bounding box, without having to extract the text again.
+# The header band ends with the first blank line after the "v." line, or if there is none, after the "Docket Number:" line. Search only the top of the page for them...
+PAGE_HEADER_MAX_LINES = 15
+PAGE_HEADER_DOCKET_NUMBER_PATTERN = re.compile(r"[ \t]*docket number:", re.IGNORECASE)
+# ...and the last lines of the page with text (above the blank lines of the bottom margin) for the first line of the footer: the form number (e.g., CPCMS 9082, MDJS 1200) or the print date.
+PAGE_FOOTER_MAX_LINES = 10
+PAGE_FOOTER_PATTERN = re.compile(r"[ \t]*(?:cpcms[ \t]+\d|mdjs[ \t]+\d|printed:)", re.IGNORECASE)
+
+# Crop the header and footer bands off one page of a docket sheet.
+# A band we cannot find (e.g., on a page with a different layout) is left in place, and logged.
+# Args:
+#   page (str): The layout text of the page.
+# Returns:
+#   string: The body of the page.
+def crop_page_bands(page: str) -> str:
+    lines = page.split("\n")
+    top = 0
+    bottom = len(lines)
+    header_lines = min(PAGE_HEADER_MAX_LINES, len(lines))
+
+    for i in range(header_lines):
+        if(lines[i].strip() == "v."):
+            # Skip the defendant's name, which may take more than one line, up to the blank line under the band.
+            top = i + 1
+            while(top < len(lines) and top <= i + 3 and lines[top].strip() != ""):
+                top += 1
+            break
+    else:
+        # Without the "v." line (e.g., the caption is laid out differently), the band still holds the docket number, followed by the caption without blank lines.
+        for i in range(header_lines):
+            if(PAGE_HEADER_DOCKET_NUMBER_PATTERN.match(lines[i])):
+                top = i + 1
+                while(top < header_lines and lines[top].strip() != ""):
+                    top += 1
+                break
+        else:
+            if(page.strip() != ""):
+                logging.warning("Could not find the header band of a page, so it is left in place.")
+
+    end = len(lines)
+    while(end > top and lines[end - 1].strip() == ""):
+        end -= 1
+    for i in range(max(top, end - PAGE_FOOTER_MAX_LINES), end):
+        if(PAGE_FOOTER_PATTERN.match(lines[i])):
+            bottom = i
+            break
+    else:
+        if(end > top):
+            logging.warning("Could not find the footer of a page, so it is left in place.")
+
+    return "\n".join(lines[top:bottom])
+
+# Split the pages of a document into one table of lines, once.
+# Args:
+#   pages (list): The text of each page.
+# Returns:
+#   tuple: The lines of every page in order, the same lines in lower case and the index of the first line of every page.
+def split_document_lines(pages: list[str]) -> tuple[list[str], list[str], list[int]]:
+    lines = []
+    page_starts = []
+    for page in pages:
+        page_starts.append(len(lines))
+        lines.extend(page.split("\n"))
+    # Lower case the whole document in one go. Lower casing never adds or removes line breaks, so both tables line up.
+    lowered = "\n".join(pages).lower().split("\n")
+    return lines, lowered, page_starts
+
+# Find the section headers in some lines of a document: runs of lines which only hold characters a header may have (e.g., upper case letters), with the blank lines around them.
+# These are the same headers a multi-line regex like ^\s*[A-Z\s\/\-]{4,}\s*$ finds in the text, but one line at a time, without the backtracking that regex does on every line.
+# Args:
+#   lines (list): The lines of the document.
+#   start (int): Index of the first line to look at...
+#   end (int): ...and of the line after the last one (e.g., the first and last line of a page, so headers never run across a page break).
+#   header_line_pattern (Pattern): Matches the whole of a line which may be (part of) a header.
+# Returns:
+#   list: (first line, line after the header, header) tuples. The header is the text of its lines, stripped.
+def find_section_headers(lines: list[str], start: int, end: int, header_line_pattern: re.Pattern) -> list[tuple[int, int, str]]:
+    headers = []
+    run_start = None
+    for i in range(start, end + 1):
+        if(i < end and header_line_pattern.fullmatch(lines[i])):
+            if(run_start is None):
+                run_start = i
+        elif(run_start is not None):
+            header = "\n".join(lines[run_start:i]).strip()
+            if(header != ""):
+                headers.append((run_start, i, header))
+            run_start = None
+    return headers
+
+# The lines of one section of a document: one or more (start, end) ranges of the document's lower case lines, read as one list of lines without copying them.
+# Like the text of a section used to, the view reads as if it started with a blank line (where its header was), so looking one line back from the first line never wraps around.
+class SectionView:
+    # Args:
+    #   lowered (list): The lower case lines of the whole document (see split_document_lines).
+    #   lines (list): The same lines as they are in the PDF.
+    def __init__(self, lowered: list[str], lines: list[str]):
+        self.lowered = lowered
+        self.lines = lines
+        self.ranges = []
+        # Index of the first line of each range, within the view.
+        self.offsets = []
+        self.length = 1
+
+    # Add the lines from start up to (but not including) end, without the blank lines at either end.
+    # Args:
+    #   start (int): Index of the first line in the document.
+    #   end (int): Index of the line after the last one.
+    def add_range(self, start: int, end: int):
+        while(start < end and self.lowered[start].strip() == ""):
+            start += 1
+        while(end > start and self.lowered[end - 1].strip() == ""):
+            end -= 1
+        if(start == end):
+            return
+        self.ranges.append((start, end))
+        self.offsets.append(self.length)
+        self.length += end - start
+
+    def __len__(self) -> int:
+        return self.length
+
+    # Find where line i of the view is in the document.
+    # Args:
+    #   i (int): Index of the line in the view. May be negative, like for a list.
+    # Returns:
+    #   int: Index of the line in the document, or None for the blank first line.
+    def document_index(self, i: int) -> int | None:
+        if(i < 0):
+            i += self.length
+        if(i < 0 or i >= self.length):
+            raise IndexError("section line index out of range")
+        if(i == 0):
+            return None
+        r = bisect.bisect_right(self.offsets, i) - 1
+        return self.ranges[r][0] + i - self.offsets[r]
+
+    def __getitem__(self, i: int) -> str:
+        index = self.document_index(i)
+        return "" if(index is None) else self.lowered[index]
+
+    def __iter__(self):
+        yield ""
+        for start, end in self.ranges:
+            for i in range(start, end):
+                yield self.lowered[i]
+
+    # Read line i of the view the way it is in the PDF, e.g., to keep its case.
+    # Args:
+    #   i (int): Index of the line in the view.
+    # Returns:
+    #   string: The line.
+    def original(self, i: int) -> str:
+        index = self.document_index(i)
+        return "" if(index is None) else self.lines[index]
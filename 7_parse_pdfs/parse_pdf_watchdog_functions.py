@@ -0,0 +1,174 @@
+import time
+import logging
+import collections
+import multiprocessing
+import psutil
+from multiprocessing.connection import wait
+
+# A process pool which watches how long each PDF takes and how much memory its worker uses.
+# multiprocessing.Pool cannot stop a single task, so a PDF which hangs or eats all the memory would stall the whole job.
+# Here every worker talks to the main process through its own pipe, so we can kill one worker without breaking the others and start a new one in its place.
+
+# Loop run by every worker process: parse the batches we are sent, reporting when each item starts and what it returned.
+# Args:
+#   conn (Connection): The worker's end of its pipe.
+#   function (function): The function to apply to every item.
+#   initializer (function): Called once when the worker starts (e.g., to set up logging). May be None.
+#   initargs (tuple): Arguments of the initializer.
+def supervised_worker(conn, function, initializer, initargs: tuple):
+    if(initializer is not None):
+        initializer(*initargs)
+
+    while(True):
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if(batch is None):
+            break
+
+        for item in batch:
+            conn.send(("start", None))
+            conn.send(("done", function(item)))
+
+# Start one worker process.
+# Args:
+#   function (function): The function to apply to every item.
+#   initializer (function): Called once when the worker starts. May be None.
+#   initargs (tuple): Arguments of the initializer.
+# Returns:
+#   dict: The process, our end of its pipe, the items it has left in its batch and when it started the current one.
+def start_supervised_worker(function, initializer, initargs: tuple) -> dict:
+    main_conn, worker_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target = supervised_worker, args = (worker_conn, function, initializer, initargs), daemon = True)
+    process.start()
+    worker_conn.close()
+    return {"process": process, "psutil": psutil.Process(process.pid), "conn": main_conn, "pending": [], "started": None}
+
+# Kill a worker process for good.
+# Args:
+#   worker (dict): Output of start_supervised_worker.
+def kill_supervised_worker(worker: dict):
+    worker["process"].kill()
+    worker["process"].join()
+    worker["conn"].close()
+
+# Send a batch to a worker.
+# Args:
+#   worker (dict): Output of start_supervised_worker.
+#   batch (list): The items.
+def send_batch(worker: dict, batch: list):
+    worker["pending"] = list(batch)
+    worker["started"] = None
+    worker["conn"].send(worker["pending"])
+
+# Check whether the item a worker is on has gone over its limits.
+# Args:
+#   worker (dict): Output of start_supervised_worker.
+#   time_limit (float): Seconds one item may take. None for no limit.
+#   memory_limit (int): Bytes of resident memory the worker may use. None for no limit.
+# Returns:
+#   string: "timeout" or "memory_limit" if a limit was broken, else None.
+def check_limits(worker: dict, time_limit: float | None, memory_limit: int | None) -> str | None:
+    if(worker["started"] is None):
+        return None
+    if(time_limit is not None and time.monotonic() - worker["started"] > time_limit):
+        return "timeout"
+    if(memory_limit is not None):
+        try:
+            if(worker["psutil"].memory_info().rss > memory_limit):
+                return "memory_limit"
+        except psutil.NoSuchProcess:
+            # The worker died; reading its pipe will tell us.
+            return None
+    return None
+
+# Apply a function to every item of a stream of batches over supervised worker processes.
+# Each worker gets one batch at a time. An item which takes longer than time_limit, or whose worker uses more than memory_limit, gets its worker killed and replaced. The rest of its batch goes to the next free worker.
+# Args:
+#   function (function): The function to apply to every item. Must be picklable.
+#   batches (iterable): Lists of items.
+#   workers (int): Number of worker processes.
+#   time_limit (float): Seconds one item may take. None for no limit.
+#   memory_limit (int): Bytes of resident memory a worker may use. None for no limit.
+#   initializer (function): Called once in every worker when it starts. May be None.
+#   initargs (tuple): Arguments of the initializer.
+#   poll_interval (float): Seconds between checks of the limits.
+# Returns:
+#   generator: (item, result, status) tuples in the order they finish. The status is "done" (result is what function returned), or "timeout", "memory_limit" or "crashed" (result is None).
+def supervised_imap_unordered(function, batches, workers: int, time_limit: float | None = None, memory_limit: int | None = None, initializer = None, initargs: tuple = (), poll_interval: float = 1.0):
+    batches = iter(batches)
+    # Leftovers of batches whose worker we killed, handed out before any new batch.
+    leftovers = collections.deque()
+    pool = [start_supervised_worker(function, initializer, initargs) for _ in range(workers)]
+
+    # Hand the next batch to the worker at index i of the pool.
+    def assign(i):
+        batch = leftovers.popleft() if(len(leftovers) > 0) else next(batches, None)
+        if(batch is None or len(batch) == 0):
+            return
+        try:
+            send_batch(pool[i], batch)
+        except OSError:
+            # The worker died while it was idle (e.g., the kernel's OOM killer picked it), so its pipe is broken. Give the batch to a new one.
+            logging.error(f"Worker {pool[i]['process'].pid} died while idle, starting a new one.")
+            kill_supervised_worker(pool[i])
+            pool[i] = start_supervised_worker(function, initializer, initargs)
+            send_batch(pool[i], batch)
+
+    try:
+        for i in range(len(pool)):
+            assign(i)
+
+        while(any(len(worker["pending"]) > 0 for worker in pool)):
+            ready = wait([worker["conn"] for worker in pool if(len(worker["pending"]) > 0)], timeout = poll_interval)
+
+            for i in range(len(pool)):
+                worker = pool[i]
+                if(len(worker["pending"]) == 0):
+                    continue
+
+                status = None
+                if(worker["conn"] in ready):
+                    try:
+                        while(len(worker["pending"]) > 0 and worker["conn"].poll()):
+                            kind, result = worker["conn"].recv()
+                            if(kind == "start"):
+                                worker["started"] = time.monotonic()
+                            else:
+                                worker["started"] = None
+                                yield worker["pending"].pop(0), result, "done"
+                    except (EOFError, OSError):
+                        # The worker died without telling us (e.g., a segfault in the PDF library or the kernel's OOM killer).
+                        status = "crashed"
+
+                if(status is None and len(worker["pending"]) > 0):
+                    status = check_limits(worker, time_limit, memory_limit)
+
+                if(status is not None):
+                    item = worker["pending"][0]
+                    logging.error(f"Killing worker {worker['process'].pid} on {item}: {status}.")
+                    if(len(worker["pending"]) > 1):
+                        leftovers.append(worker["pending"][1:])
+                    kill_supervised_worker(worker)
+                    pool[i] = worker = start_supervised_worker(function, initializer, initargs)
+                    yield item, None, status
+
+                if(len(worker["pending"]) == 0):
+                    assign(i)
+
+            # A killed worker's leftovers may be waiting while every other worker is idle.
+            for i in range(len(pool)):
+                if(len(pool[i]["pending"]) == 0):
+                    assign(i)
+    finally:
+        for worker in pool:
+            try:
+                worker["conn"].send(None)
+            except OSError:
+                pass
+        for worker in pool:
+            worker["process"].join(timeout = 5)
+            if(worker["process"].is_alive()):
+                worker["process"].kill()
+            worker["conn"].close()
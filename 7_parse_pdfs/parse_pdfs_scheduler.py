@@ -0,0 +1,244 @@
+import os
+import time
+import itertools
+import logging
+import argparse
+import functools
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+import parse_docket_sheets_CP_full
+import parse_docket_sheets_MJ_full
+import parse_court_summaries_CP_full
+import parse_court_summaries_MJ_full
+from parse_pdf_driver_functions import read_manifest, estimate_costs, make_batches, parse_one_pdf, configure_worker_logging, bounded_imap_unordered, add_worker_arguments, add_output_arguments, worker_limits, ResultSink
+from parse_pdf_watchdog_functions import supervised_imap_unordered
+from parse_pdf_progress_functions import open_progress_store
+from parse_pdf_output_functions import prepare_output, open_output_writer
+from parse_pdf_shard_functions import parse_shard_spec, filter_shard, lease_owner_name, is_shard_done, are_all_shards_done, mark_shard_done, try_acquire_lease, release_lease, start_heartbeat
+
+# Parses every chunk list at once. Instead of one job per chunk, all remaining PDFs go into one queue and the workers pull small batches from it.
+# The output (JSONs or JSON Lines shards, progress files) is the same as running the parse_*_full.py file of every chunk.
+# With --shard i/N, many nodes sharing a file system can each parse one part of all PDFs (see parse_pdf_shard_functions.py).
+
+# Parser of each PDF type and court type, as named in the chunk lists e.g., Montgomery_ds_CP_CR_chunkList.csv.
+PARSERS = {
+    ("ds", "CP"): parse_docket_sheets_CP_full.parse_pdf,
+    ("ds", "MJ"): parse_docket_sheets_MJ_full.parse_pdf,
+    ("cs", "CP"): parse_court_summaries_CP_full.parse_pdf,
+    ("cs", "MJ"): parse_court_summaries_MJ_full.parse_pdf
+}
+
+# Whether the parquet output of a chunk saves the whole JSON of every PDF (always for court summaries, which have no other tables).
+# Args:
+#   chunk (str): Name of the chunk list.
+#   parquet_documents (bool): Whether to save it for docket sheets too.
+# Returns:
+#   bool: Whether to save it.
+def saves_documents(chunk: str, parquet_documents: bool) -> bool:
+    return parquet_documents or chunk.split("_")[1] == "cs"
+
+# Parse one PDF of any chunk list.
+# Args:
+#   item (tuple): The chunk and the file name of the PDF.
+#   root (str): Root path of our files.
+#   text_engine (str): Text extraction engine.
+#   output (str): How to save the output (see parse_pdf_output_functions.py).
+#   text_cache (str): Folder of the layout text cache. If None, the text is always extracted from the PDF.
+#   parquet_documents (bool): Whether the parquet output saves the whole JSON of every docket sheet too.
+# Returns:
+#   tuple: The chunk, the file name, whether the PDF was parsed successfully, how many seconds it took, its record for the writer of the output and why it failed (see parse_one_pdf).
+def parse_item(item: tuple[str, str], root: str, text_engine: str, output: str, text_cache: str | None = None, parquet_documents: bool = False) -> tuple[str, str, bool, float, object, dict | None]:
+    chunk, file_name = item
+    county, pdf_type, court_type = chunk.split("_")[:3]
+    parse_function = functools.partial(
+        PARSERS[(pdf_type, court_type)],
+        path_to_pdfs = root + "pdfs/" + county + "/",
+        path_to_text_cache = text_cache,
+        text_engine = text_engine
+    )
+    output_function = functools.partial(prepare_output, output = output, path_to_json = root + "json/", documents = saves_documents(chunk, parquet_documents))
+    return (chunk,) + parse_one_pdf(parse_function, output_function, file_name)
+
+# Parse a batch of PDFs, which may come from different chunk lists.
+# Args:
+#   batch (list): (chunk, file_name) tuples.
+#   root (str): Root path of our files.
+#   text_engine (str): Text extraction engine.
+#   output (str): How to save the output.
+#   text_cache (str): Folder of the layout text cache. May be None.
+#   parquet_documents (bool): Whether the parquet output saves the whole JSON of every docket sheet too.
+# Returns:
+#   list: (chunk, file_name, successfully_parsed, duration, record, failure) tuples.
+def parse_batch(batch: list[tuple[str, str]], root: str, text_engine: str, output: str, text_cache: str | None = None, parquet_documents: bool = False) -> list[tuple[str, str, bool, float, object, dict | None]]:
+    return [parse_item(item, root, text_engine, output, text_cache, parquet_documents) for item in batch]
+
+# Read the runtime arguments.
+# Returns:
+#   Namespace: The parsed arguments.
+def parse_scheduler_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root", help = "Root path of our files e.g., ~/secret_lives_pa/output/pdf_parse_list/ or /media/joe/T7 Shield/")
+    parser.add_argument("engine", nargs = "?", default = "pdfplumber", choices = ["pdfplumber", "pdfium"], help = "Text extraction engine (default pdfplumber).")
+    add_worker_arguments(parser)
+    add_output_arguments(parser)
+    parser.add_argument("--chunks", default = "*_chunkList.csv", help = "Glob pattern of the chunk lists to parse (default all of them).")
+    parser.add_argument("--cost", default = "size", choices = ["size", "pages"], help = "Estimate the cost of a PDF by its file size (default) or its page count.")
+    parser.add_argument("--batches-per-worker", type = int, default = 50, help = "Roughly how many batches each worker pulls over the run (default 50).")
+    parser.add_argument("--max-batch-size", type = int, default = 64, help = "Most PDFs in one batch (default 64).")
+    parser.add_argument("--shard", default = None, help = "Only parse shard i of N (e.g., 3/16), then take over the shards of nodes which died. Every node must use the same N and --chunks.")
+    parser.add_argument("--lease-timeout", type = float, default = 600, help = "Seconds without a heartbeat after which the shard of a node counts as abandoned (default 600).")
+    return parser.parse_args()
+
+# Parse the PDFs of a manifest over a pool of workers, recording every outcome in the progress of its chunk.
+# Args:
+#   manifest (DataFrame): Output of read_manifest.
+#   arguments (Namespace): Output of parse_scheduler_arguments.
+#   path_to_progress_file (str): Folder with the progress files.
+#   log_file (str): File path to the log file.
+#   lease_lost (Event): Set once another node has taken over the shard we parse (see start_heartbeat). No more PDFs are handed out once it is set. None if we hold no lease.
+# Returns:
+#   bool: Whether every PDF was handed out, i.e., the run was not stopped by losing the lease.
+def run_schedule(manifest, arguments: argparse.Namespace, path_to_progress_file: str, log_file: str, lease_lost = None) -> bool:
+    logging.info(f"{len(manifest)} PDFs left to parse in {manifest['chunk'].nunique()} chunk lists.")
+    if(arguments.plan_only):
+        print(f"{len(manifest)} PDFs left to parse in {manifest['chunk'].nunique()} chunk lists.")
+        if(len(manifest) > 0):
+            print(manifest.groupby("chunk", observed = True).size().to_string())
+        return True
+
+    costs = estimate_costs(manifest, arguments.root, arguments.cost, arguments.workers)
+
+    batches = make_batches(manifest, costs, arguments.workers, arguments.batches_per_worker, arguments.max_batch_size)
+    time_limit, memory_limit = worker_limits(arguments.time_limit, arguments.memory_limit)
+    # The progress and output writer of every chunk with PDFs still out, opened when its first PDF comes back and closed once its last one is back.
+    # So a run over hundreds of chunk lists only holds the files of the chunks it is working on.
+    sinks = {}
+    # PDFs which failed in a way worth trying again, as (chunk, file_name) tuples, collected from the sinks as they close.
+    failed = []
+
+    # Hand the outcome of one PDF to the sink of its chunk (see ResultSink.add), and close the sink once the last PDF of the chunk is back.
+    def add_result(chunk, pending, *result, **status):
+        if(chunk not in sinks):
+            sinks[chunk] = ResultSink(open_progress_store(path_to_progress_file, chunk), open_output_writer(arguments.output, arguments.root, chunk, arguments.compression, saves_documents(chunk, arguments.parquet_documents)))
+        sinks[chunk].add(*result, **status)
+
+        pending[chunk] -= 1
+        if(pending[chunk] == 0):
+            sink = sinks.pop(chunk)
+            sink.close()
+            failed.extend((chunk, file_name) for file_name in sink.failed)
+
+        # The writers of the other chunks get no records while this one's come in, so check whether any of them is due to save what it holds.
+        for sink in sinks.values():
+            sink.flush_if_due()
+
+    # Parse batches over the workers.
+    # Args:
+    #   batches (iterable): Batches of (chunk, file_name) tuples.
+    #   pending (Counter): How many PDFs of every chunk are in them, counted down as they come back.
+    def run_batches(batches, pending):
+        # Once the lease is lost, the batches the workers are on still come back and are saved, but no new ones go out.
+        if(lease_lost is not None):
+            batches = itertools.takewhile(lambda batch: not lease_lost.is_set(), batches)
+
+        # Each worker pulls the next batch as soon as it is done with its last one.
+        if(time_limit is not None or memory_limit is not None):
+            task = functools.partial(parse_item, root = arguments.root, text_engine = arguments.engine, output = arguments.output, text_cache = arguments.text_cache, parquet_documents = arguments.parquet_documents)
+            for (chunk, file_name), result, status in supervised_imap_unordered(task, batches, arguments.workers, time_limit, memory_limit, configure_worker_logging, (log_file,)):
+                if(status == "done"):
+                    chunk, file_name, successfully_parsed, duration, record, failure = result
+                    add_result(chunk, pending, file_name, successfully_parsed, duration, record, failure)
+                else:
+                    add_result(chunk, pending, file_name, False, status = status)
+        else:
+            task = functools.partial(parse_batch, root = arguments.root, text_engine = arguments.engine, output = arguments.output, text_cache = arguments.text_cache, parquet_documents = arguments.parquet_documents)
+            with multiprocessing.Pool(arguments.workers, initializer = configure_worker_logging, initargs = (log_file,)) as pool:
+                for results in bounded_imap_unordered(pool, task, batches, arguments.workers * 2):
+                    for chunk, file_name, successfully_parsed, duration, record, failure in results:
+                        add_result(chunk, pending, file_name, successfully_parsed, duration, record, failure)
+
+    try:
+        run_batches(batches, Counter(manifest["chunk"]))
+
+        # Then try the PDFs which failed or crashed again (see run_parse), one per batch since they are few.
+        for retry in range(1, arguments.retries + 1):
+            if(len(failed) == 0 or (lease_lost is not None and lease_lost.is_set())):
+                break
+            logging.info(f"Trying {len(failed)} PDFs which failed again (retry {retry} of {arguments.retries}).")
+            retry_items = failed[:]
+            failed.clear()
+            run_batches([[item] for item in retry_items], Counter(chunk for chunk, _ in retry_items))
+    finally:
+        # Only left open if the run stopped early.
+        for sink in sinks.values():
+            sink.close()
+
+    if(lease_lost is not None and lease_lost.is_set()):
+        logging.warning(f"Stopped parsing {path_to_progress_file} since another node took it over.")
+        return False
+    return True
+
+# Parse our own shard, then every shard which nobody holds (e.g., because its node died), until every shard is done.
+# Each shard keeps its own progress files so nodes never append to the same file and a node taking over a shard resumes where the last one stopped.
+# PDFs parsed according to the progress outside the shards (progress_files/) are not parsed again.
+# Args:
+#   arguments (Namespace): Output of parse_scheduler_arguments.
+#   log_file (str): File path to the log file.
+def run_shards(arguments: argparse.Namespace, log_file: str):
+    shard, shard_count = parse_shard_spec(arguments.shard)
+    lease_dir = arguments.root + "leases/"
+    owner = lease_owner_name()
+    # The progress from before the run was sharded (and its old progress CSVs), which every shard reads but never writes.
+    path_to_main_progress_file = arguments.root + "progress_files/"
+
+    # Only report on our own shard, without taking any lease.
+    if(arguments.plan_only):
+        path_to_progress_file = arguments.root + f"progress_files/shard_{shard}_of_{shard_count}/"
+        manifest = filter_shard(read_manifest(arguments.root, arguments.chunks, path_to_progress_file, path_to_main_progress_file), shard, shard_count)
+        run_schedule(manifest, arguments, path_to_progress_file, log_file)
+        return
+
+    # Start with our own shard, then go around the others starting from the next one so nodes do not all rush for shard 0.
+    # Keep going around until every shard is done: a node may die after we went past its shard, and its lease only goes stale later.
+    while(not are_all_shards_done(lease_dir, shard_count)):
+        for other_shard in [(shard + i) % shard_count for i in range(shard_count)]:
+            if(is_shard_done(lease_dir, other_shard, shard_count)):
+                continue
+            if(not try_acquire_lease(lease_dir, other_shard, shard_count, owner, arguments.lease_timeout)):
+                continue
+
+            logging.info(f"Parsing shard {other_shard}/{shard_count} as {owner}.")
+            heartbeat, lease_lost = start_heartbeat(lease_dir, other_shard, shard_count, owner, arguments.lease_timeout / 4)
+            try:
+                path_to_progress_file = arguments.root + f"progress_files/shard_{other_shard}_of_{shard_count}/"
+                manifest = read_manifest(arguments.root, arguments.chunks, path_to_progress_file, path_to_main_progress_file)
+                manifest = filter_shard(manifest, other_shard, shard_count)
+                # If another node took the shard over, it is theirs to finish and mark done.
+                if(run_schedule(manifest, arguments, path_to_progress_file, log_file, lease_lost)):
+                    mark_shard_done(lease_dir, other_shard, shard_count, owner)
+            finally:
+                heartbeat.set()
+                release_lease(lease_dir, other_shard, shard_count, owner)
+
+        # The shards left are held by other nodes. Wait before looking again, so a lease which went stale meanwhile is taken over.
+        if(not are_all_shards_done(lease_dir, shard_count)):
+            time.sleep(min(60, arguments.lease_timeout / 4))
+
+if __name__ == "__main__":
+    arguments = parse_scheduler_arguments()
+    path_to_progress_file = arguments.root + "progress_files/"
+    path_to_logs = arguments.root + "log_files/"
+    os.makedirs(path_to_progress_file, exist_ok = True)
+    os.makedirs(arguments.root + "json/", exist_ok = True)
+    os.makedirs(path_to_logs, exist_ok = True)
+    log_file = path_to_logs + "log_file_scheduler_" + ("" if(arguments.shard is None) else "shard_" + arguments.shard.replace("/", "_of_") + "_") + datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".txt"
+
+    # Configure the logger.
+    logging.basicConfig(filename = log_file, level = logging.INFO, filemode = "w+")
+
+    if(arguments.shard is None):
+        # Read the PDFs which still need to be parsed in every chunk list.
+        run_schedule(read_manifest(arguments.root, arguments.chunks), arguments, path_to_progress_file, log_file)
+    else:
+        run_shards(arguments, log_file)
@@ -0,0 +1,30 @@
+from check_pdf_text_engines import compare_columns, compare_pages, offsets_cs, offsets_ds
+from parse_pdf_column_functions import COLUMN_SPECS
+
+# A court summary charge line (see parse_court_summary_CP_functions.py) as two engines could extract it.
+CHARGE_LINE = "1".ljust(11) + "18 § 3502 §§ A1".ljust(37) + "F1".ljust(6) + "Burglary - Overnight Accommodation".ljust(41) + "Guilty Plea"
+
+def test_court_summary_offsets_come_from_the_parsers():
+    # The charge columns of the CP court summaries and the case columns of the MJ ones.
+    assert {11, 48, 54, 95}.issubset(offsets_cs)
+    assert {42, 88, 130}.issubset(offsets_cs)
+
+def test_compare_pages_reports_the_field_which_differs():
+    line_pdfium = CHARGE_LINE.replace("Guilty Plea", "Guilty  Plea")
+    mismatches = compare_pages(["header\n" + CHARGE_LINE], ["header\n" + line_pdfium], offsets_cs)
+
+    assert len(mismatches) == 1
+    i, bad_offsets, line_a, line_b = mismatches[0]
+    assert i == 1
+    assert bad_offsets == [95]
+    assert (line_a, line_b) == (CHARGE_LINE, line_pdfium)
+
+def test_compare_pages_ignores_trailing_blanks():
+    assert compare_pages([CHARGE_LINE], [CHARGE_LINE + "   "], offsets_cs) == []
+
+def test_compare_columns_without_offsets():
+    assert compare_columns("abc", "abd", []) == [0]
+
+def test_docket_offsets_cover_the_column_specs():
+    for columns in COLUMN_SPECS.values():
+        assert {start for _, start in columns}.issubset(offsets_ds)
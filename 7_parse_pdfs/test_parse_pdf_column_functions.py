@@ -0,0 +1,55 @@
+from parse_pdf_column_functions import COLUMN_SPECS, COLUMN_HEADERS, ColumnSpec
+
+# Header and rows of the CP bail actions, with the amounts right aligned under their label.
+HEADER = [(0, "Bail Action"), (38, "Date"), (65, "Bail Type"), (88, "Originating Court"), (118, "Percentage"), (135, "Amount")]
+ROWS = [
+    [(0, "Set"), (38, "01/15/2019"), (65, "Monetary"), (88, "Magisterial District"), (132, "$5,000.00")],
+    [(0, "Change Bail Type"), (38, "02/15/2019"), (65, "ROR"), (88, "Common Pleas"), (118, "10%"), (136, "$50.00")]
+]
+RECORDS = [
+    {"bail_action": "set", "date": "01/15/2019", "bail_type": "monetary", "originating_court": "magisterial district", "percentage": "", "amount": "$5,000.00"},
+    {"bail_action": "change bail type", "date": "02/15/2019", "bail_type": "ror", "originating_court": "common pleas", "percentage": "10%", "amount": "$50.00"}
+]
+
+# Lay out a line of cells given as (first character, text) pairs, in lower case as the parsers read it.
+# The cells after the first column are moved right by shift characters.
+def layout(cells: list[tuple[int, str]], shift: int = 0) -> str:
+    line = ""
+    for start, text in cells:
+        start += shift if(start > 0) else 0
+        line = line.ljust(start) + text
+    return line.lower()
+
+def bail_columns() -> ColumnSpec:
+    return ColumnSpec(COLUMN_SPECS[("CP", "BAIL ACTIONS")], COLUMN_HEADERS[("CP", "BAIL ACTIONS")])
+
+def read_table(columns: ColumnSpec, header: str, shift: int = 0) -> list[dict]:
+    columns = columns.calibrate(header)
+    return [columns.row(layout(row, shift)) for row in ROWS]
+
+def test_unshifted_layout_keeps_the_default_columns():
+    columns = bail_columns()
+    assert columns.calibrate(layout(HEADER)) is columns
+    assert read_table(columns, layout(HEADER)) == RECORDS
+
+def test_shifted_layout():
+    columns = bail_columns()
+    for shift in [3, -2]:
+        assert columns.calibrate(layout(HEADER, shift)).starts == [0] + [start + shift for start in columns.starts[1:]]
+        assert read_table(columns, layout(HEADER, shift), shift) == RECORDS
+
+def test_one_label_off_its_place_moves_no_column():
+    columns = bail_columns()
+    header = [(start + 1, label) if(label == "Bail Type") else (start, label) for start, label in HEADER]
+    assert columns.calibrate(layout(header)) is columns
+    # Nor do labels which do not agree on a shift.
+    header = [(start + i, label) for i, (start, label) in enumerate(HEADER)]
+    assert columns.calibrate(layout(header)) is columns
+
+def test_calibration_only_depends_on_the_header():
+    fresh = bail_columns().calibrate(layout(HEADER, 3))
+    columns = bail_columns()
+    for shift in [0, 5, -2, 3]:
+        columns.calibrate(layout(HEADER, shift))
+    assert columns.calibrate(layout(HEADER, 3)).starts == fresh.starts
+    assert columns.calibrate(layout(HEADER)) is columns
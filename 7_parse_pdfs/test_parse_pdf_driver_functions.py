@@ -0,0 +1,73 @@
+import os
+import pytest
+import pypdfium2
+import pandas as pd
+from parse_pdf_driver_functions import estimate_costs, ResultSink
+from parse_pdf_progress_functions import open_progress_store
+from parse_pdf_output_functions import JSONLinesWriter, prepare_output
+
+# Write a blank PDF with the given number of pages.
+def write_pdf(pdf_path: str, nr_pages: int):
+    pdf = pypdfium2.PdfDocument.new()
+    for _ in range(nr_pages):
+        pdf.new_page(612, 792)
+    pdf.save(pdf_path)
+    pdf.close()
+
+def test_estimate_costs(tmp_path):
+    root = str(tmp_path) + "/"
+    for county in ["Blair", "Bucks"]:
+        os.makedirs(root + "pdfs/" + county)
+    pages = {"Blair_0.pdf": 3, "Blair_1.pdf": 1, "Bucks_0.pdf": 7}
+    for file_name, nr_pages in pages.items():
+        write_pdf(root + "pdfs/" + file_name.split("_")[0] + "/" + file_name, nr_pages)
+
+    # A manifest whose index is not 0..n-1 (e.g., a shard of a larger one), with a PDF which is missing.
+    manifest = pd.DataFrame({
+        "chunk": ["Bucks_ds_CP_CR_chunkList.csv", "Blair_ds_CP_CR_chunkList.csv", "Blair_ds_CP_CR_chunkList.csv", "Blair_ds_CP_CR_chunkList.csv"],
+        "file_name": ["Bucks_0.pdf", "Blair_1.pdf", "Blair_9.pdf", "Blair_0.pdf"]
+    }, index = [7, 3, 12, 5])
+    manifest["chunk"] = manifest["chunk"].astype("category")
+
+    sizes = [os.path.getsize(root + "pdfs/Bucks/Bucks_0.pdf"), os.path.getsize(root + "pdfs/Blair/Blair_1.pdf"), 0, os.path.getsize(root + "pdfs/Blair/Blair_0.pdf")]
+    for workers in [1, 3]:
+        costs = estimate_costs(manifest, root, "size", workers)
+        assert list(costs.index) == [7, 3, 12, 5]
+        assert list(costs) == sizes
+        assert list(estimate_costs(manifest, root, "pages", workers)) == [7, 1, 1, 3]
+
+def open_sink(root: str) -> ResultSink:
+    return ResultSink(open_progress_store(root + "progress_files/", "Blair_ds_CP_CR_chunkList.csv"), JSONLinesWriter(root + "jsonl/", "Blair_ds_CP_CR_chunkList.csv", max_records = 2))
+
+def add_pdf(sink: ResultSink, root: str, file_name: str):
+    sink.add(file_name, True, 1.0, prepare_output(file_name, {"file_name": file_name}, "jsonl", root + "json/"))
+
+def shards(root: str) -> list[str]:
+    return sorted(name for name in os.listdir(root + "jsonl/") if(name.endswith(".jsonl.gz")))
+
+def test_output_recorded_before_a_crash_is_put_in_place_by_the_next_run(tmp_path):
+    root = str(tmp_path) + "/"
+    sink = open_sink(root)
+    add_pdf(sink, root, "a.pdf")
+    add_pdf(sink, root, "b.pdf")
+    assert len(shards(root)) == 1
+
+    # The run crashes right after committing the progress of the next shard, before renaming it...
+    def crash(*args):
+        raise KeyboardInterrupt()
+    sink.writer.publish = crash
+    add_pdf(sink, root, "c.pdf")
+    with pytest.raises(KeyboardInterrupt):
+        add_pdf(sink, root, "d.pdf")
+    # ...and a third shard is cut off halfway.
+    add_pdf(sink, root, "e.pdf")
+    sink.writer.shard_file.flush()
+    sink.progress_store.connection.close()
+
+    sink = open_sink(root)
+    assert len(shards(root)) == 2
+    assert sorted(sink.progress_store.file_names(True)) == ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    assert sink.progress_store.sealed() == []
+    # What was never recorded stays under its temporary name, and its PDF is parsed again.
+    assert len([name for name in os.listdir(root + "jsonl/") if(name.endswith(".jsonl.gz.tmp"))]) == 1
+    sink.close()
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import pyarrow.parquet as pq
+from parse_pdf_output_functions import prepare_output, open_output_writer, JSONLinesWriter, ParquetTablesWriter
+
+DOCKET_SHEET = {"charges": {"charge_nr_0": {"seq": "1", "statute": "18 § 3921 §§ A"}, "charge_nr_1": {"seq": "2", "statute": "35 § 780-113"}}}
+COURT_SUMMARY = {"defendant_name": "smith, john", "dockets": ["CP-07-CR-0000007-2019"]}
+
+def write_parquet(root: str, chunk: str, results: dict, documents: bool) -> list[str]:
+    writer = open_output_writer("parquet", root, chunk, documents = documents)
+    for file_name, result in results.items():
+        assert writer.write(file_name, prepare_output(file_name, result, "parquet", root + "json/", documents)) == []
+    file_names = writer.close()
+    writer.publish()
+    return file_names
+
+def test_parquet_output_leaves_out_the_documents_by_default(tmp_path):
+    root = str(tmp_path) + "/"
+    assert write_parquet(root, "Blair_ds_CP_CR_chunkList.csv", {"a.pdf": DOCKET_SHEET}, documents = False) == ["a.pdf"]
+
+    assert "documents" not in os.listdir(root + "parquet/")
+    charges = pq.read_table(root + "parquet/charges/").to_pylist()
+    assert [(row["file_name"], row["row_nr"], row["statute"]) for row in charges] == [("a.pdf", 0, "18 § 3921 §§ A"), ("a.pdf", 1, "35 § 780-113")]
+
+def test_parquet_output_with_documents(tmp_path):
+    root = str(tmp_path) + "/"
+    assert write_parquet(root, "Blair_cs_CP_CR_chunkList.csv", {"a.pdf": COURT_SUMMARY}, documents = True) == ["a.pdf"]
+
+    documents = pq.read_table(root + "parquet/documents/").to_pylist()
+    assert [(row["file_name"], json.loads(row["data"])) for row in documents] == [("a.pdf", COURT_SUMMARY)]
+
+def test_writers_save_what_they_hold_once_due_without_new_records(tmp_path):
+    root = str(tmp_path) + "/"
+    writers = [JSONLinesWriter(root + "jsonl/", "Blair_ds_CP_CR_chunkList.csv", max_seconds = 0.2), ParquetTablesWriter(root + "parquet/", "Blair_ds_CP_CR_chunkList.csv", max_seconds = 0.2)]
+    for writer, output in zip(writers, ["jsonl", "parquet"]):
+        assert writer.write("a.pdf", prepare_output("a.pdf", DOCKET_SHEET, output, root + "json/")) == []
+        assert writer.flush_if_due() == []
+
+    time.sleep(0.2)
+    for writer in writers:
+        assert writer.flush_if_due() == ["a.pdf"]
+        assert writer.flush_if_due() == []
+        assert writer.close() == []
+        assert len(writer.publish()) == 1
+    assert len([name for name in os.listdir(root + "jsonl/") if(name.endswith(".jsonl.gz"))]) == 1
+    assert pq.read_table(root + "parquet/charges/").num_rows == 2
+
+def test_sealed_output_is_only_in_place_once_published(tmp_path):
+    root = str(tmp_path) + "/"
+    writers = [JSONLinesWriter(root + "jsonl/", "Blair_ds_CP_CR_chunkList.csv"), ParquetTablesWriter(root + "parquet/", "Blair_ds_CP_CR_chunkList.csv")]
+    for writer, output in zip(writers, ["jsonl", "parquet"]):
+        writer.write("a.pdf", prepare_output("a.pdf", DOCKET_SHEET, output, root + "json/"))
+        assert writer.close() == ["a.pdf"]
+
+    # Sealed, the output is only there under temporary names, which readers skip.
+    assert all(name.endswith(".tmp") for name in os.listdir(root + "jsonl/"))
+    assert pq.read_table(root + "parquet/charges/").num_rows == 0
+
+    for writer in writers:
+        sealed = writer.sealed
+        assert writer.publish() == sealed
+        # Publishing again does nothing.
+        assert writer.publish(sealed) == sealed
+    assert len(os.listdir(root + "jsonl/")) == 2
+    assert not any(name.endswith(".tmp") for name in os.listdir(root + "jsonl/"))
+    assert pq.read_table(root + "parquet/charges/").num_rows == 2
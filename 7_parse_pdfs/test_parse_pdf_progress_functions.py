@@ -0,0 +1,38 @@
+from parse_pdf_progress_functions import open_progress_store
+
+CHUNK = "Montgomery_ds_CP_CR_chunkList.csv"
+
+def read_progress(progress_store) -> dict:
+    progress_store.flush()
+    rows = progress_store.connection.execute("SELECT file_name, successfully_parsed, status, attempts, duration FROM progress")
+    return {file_name: (successfully_parsed, status, attempts, duration) for file_name, successfully_parsed, status, attempts, duration in rows}
+
+def test_failed_try_does_not_undo_a_parse(tmp_path):
+    progress_store = open_progress_store(str(tmp_path) + "/", CHUNK)
+    progress_store.record("a.pdf", True, duration = 1.5)
+    progress_store.flush()
+    progress_store.record("a.pdf", False, "crashed", duration = 9.0)
+
+    assert read_progress(progress_store) == {"a.pdf": (1, "parsed", 2, 1.5)}
+    assert progress_store.file_names(True) == ["a.pdf"]
+    progress_store.close()
+
+def test_parse_after_failed_tries(tmp_path):
+    progress_store = open_progress_store(str(tmp_path) + "/", CHUNK)
+    progress_store.record("a.pdf", False, duration = 0.5)
+    progress_store.flush()
+    progress_store.record("a.pdf", False, "timeout", duration = 900.0)
+    progress_store.flush()
+    progress_store.record("a.pdf", True, duration = 2.0)
+
+    assert read_progress(progress_store) == {"a.pdf": (1, "parsed", 3, 2.0)}
+    progress_store.close()
+
+def test_failed_tries_keep_the_last_status(tmp_path):
+    progress_store = open_progress_store(str(tmp_path) + "/", CHUNK)
+    progress_store.record("a.pdf", False, duration = 0.5)
+    progress_store.flush()
+    progress_store.record("a.pdf", False, "memory_limit", duration = 30.0)
+
+    assert read_progress(progress_store) == {"a.pdf": (0, "memory_limit", 2, 30.0)}
+    progress_store.close()
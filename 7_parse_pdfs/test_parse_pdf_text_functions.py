@@ -0,0 +1,108 @@
+import os
+import json
+import logging
+import pytest
+import parse_docket_sheet_CP_functions
+import parse_docket_sheet_MJ_functions
+from parse_pdf_text_functions import crop_page_bands
+
+# The layout text of two docket sheets whose sections run across page breaks (fixtures/*.pages.json), and their sections as extracted from the cropped pages (fixtures/*.sections.json).
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DOCKET_SHEETS = {
+    "ds_Blair_CP_CR_0000007_2019": parse_docket_sheet_CP_functions,
+    "ds_Blair_MJ_CR_0000002_2019": parse_docket_sheet_MJ_functions
+}
+
+def read_fixture(name: str, kind: str):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.{kind}.json")) as fixture_file:
+        return json.load(fixture_file)
+
+# The lines of every section as they are in the PDF.
+def section_lines(parser, pages: list[str]) -> dict[str, list[str]]:
+    sections = parser.extract_sections([crop_page_bands(page) for page in pages])
+    return {header: [view.original(i) for i in range(1, len(view))] for header, view in sections.items()}
+
+# Remove the "v." line from the header band of every page.
+def drop_versus_lines(pages: list[str]) -> list[str]:
+    return ["\n".join(line for line in page.split("\n") if line.strip() != "v.") for page in pages]
+
+@pytest.mark.parametrize("name", DOCKET_SHEETS)
+def test_sections_across_page_breaks(name):
+    sections = section_lines(DOCKET_SHEETS[name], read_fixture(name, "pages"))
+
+    assert sections == read_fixture(name, "sections")
+    # The header band repeated on every page is never read as a section, nor left in one.
+    assert "CRIMINAL DOCKET" not in sections and "DOCKET" not in sections
+    for lines in sections.values():
+        assert not any("Docket Number:" in line or "Commonwealth of Pennsylvania" in line for line in lines)
+
+@pytest.mark.parametrize("name", DOCKET_SHEETS)
+def test_sections_without_versus_line(name):
+    pages = read_fixture(name, "pages")
+    assert section_lines(DOCKET_SHEETS[name], drop_versus_lines(pages)) == section_lines(DOCKET_SHEETS[name], pages)
+
+def test_crop_page_bands():
+    page = "\n".join([
+        "",
+        "        COURT OF COMMON PLEAS OF BLAIR COUNTY",
+        "                        Docket Number: CP-07-CR-0000000-2019",
+        "        CRIMINAL DOCKET",
+        "        Commonwealth of Pennsylvania        Page 2 of 3",
+        "                v.",
+        "                Smith, John",
+        "",
+        "Bail Bondsman         ABC Bonds",
+        "",
+        "              CHARGES",
+        "CPCMS 9082                          Printed: 01/05/2024",
+        "Recent entries made in the court filing offices may not be immediately reflected on these docket sheets."
+    ])
+    body = "\n".join(["", "Bail Bondsman         ABC Bonds", "", "              CHARGES"])
+
+    assert crop_page_bands(page) == body
+    # Without the "v." line, the band ends at the first blank line after the docket number.
+    assert crop_page_bands(page.replace("                v.\n", "")) == body
+    # Without either, the header band is left in place.
+    no_band = page.replace("                v.\n", "").replace("Docket Number:", "Docket:")
+    assert crop_page_bands(no_band) == no_band[:no_band.index("\nCPCMS")]
+
+def test_crop_page_bands_with_a_bottom_margin(caplog):
+    page = "\n".join([
+        "        MAGISTERIAL DISTRICT JUDGE 24-1-01",
+        "                        Docket Number: MJ-24101-CR-0000002-2019",
+        "        Commonwealth of Pennsylvania",
+        "                v.",
+        "                Smith, John",
+        "",
+        "              CHARGES",
+        "# Charge        Grade",
+        "1 18 § 3921 §§ A   M1"
+    ])
+    footer = "\n".join([
+        "MDJS 1200                                   Page 1 of 2",
+        "Printed: 01/05/2024",
+        "Recent entries made in the court filing offices may not be immediately reflected on these docket sheets.",
+        "Neither the courts of the Unified Judicial System of the Commonwealth of Pennsylvania nor the Administrative",
+        "Office of Pennsylvania Courts assume any liability for inaccurate or delayed data, errors or omissions on",
+        "these reports. Docket Sheet information should not be used in place of a criminal history background",
+        "check which can only be provided by the Pennsylvania State Police."
+    ])
+    body = page[page.index("\n\n") + 1:]
+
+    for margin in [0, 2, 4, 8]:
+        assert crop_page_bands(page + "\n" + footer + "\n" * margin) == body
+    # A page without a footer is left as it is, and logged.
+    with caplog.at_level(logging.WARNING):
+        assert crop_page_bands(page + "\n" * 4) == body + "\n" * 4
+    assert "footer" in caplog.text
+
+@pytest.mark.parametrize("name", DOCKET_SHEETS)
+def test_charges_hold_no_footer_lines(name):
+    parser = DOCKET_SHEETS[name]
+    sections = parser.extract_sections([crop_page_bands(page) for page in read_fixture(name, "pages")])
+    charges = parser.extract_charges(sections["CHARGES"])
+
+    assert len(charges) > 0
+    for charge in charges.values():
+        for value in charge.values():
+            assert not any(word in value for word in ["cpcms", "mdjs", "printed:", "docket sheets", "magisterial district judge"])
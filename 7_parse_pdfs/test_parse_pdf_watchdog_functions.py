@@ -0,0 +1,21 @@
+import os
+import time
+import threading
+from parse_pdf_watchdog_functions import supervised_imap_unordered
+
+# Returns the item, and for "exit" makes the worker exit shortly after, once it is idle.
+def exit_when_idle(item: str) -> str:
+    if(item == "exit"):
+        threading.Timer(0.1, os._exit, (0,)).start()
+    return item
+
+def test_batch_given_to_a_worker_which_died_idle_goes_to_a_new_one():
+    # The next batch only comes once the worker which got "exit" is gone.
+    def batches():
+        yield ["exit"]
+        time.sleep(1)
+        yield ["a", "b"]
+        yield ["c"]
+
+    results = list(supervised_imap_unordered(exit_when_idle, batches(), 1, time_limit = 60, poll_interval = 0.1))
+    assert sorted(results) == [(item, item, "done") for item in ["a", "b", "c", "exit"]]
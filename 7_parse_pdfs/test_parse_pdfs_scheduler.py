@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import threading
+import multiprocessing
+from collections import Counter
+import pandas as pd
+import parse_pdfs_scheduler
+from parse_pdf_progress_functions import open_progress_store
+from parse_pdf_shard_functions import shard_file_stem, are_all_shards_done, read_lease_owner, try_acquire_lease, start_heartbeat
+
+# Runs the scheduler in several local processes sharing one root path, as nodes of a Slurm array job would, with a parser which only writes down which PDFs it was given.
+
+CHUNKS = {"Montgomery_ds_CP_CR_chunkList.csv": 120, "Bucks_ds_CP_CR_chunkList.csv": 80}
+
+# Stands in for the parse_pdf of the parse_*_full.py files.
+def fake_parse_pdf(file_name: str, path_to_pdfs: str, path_to_text_cache: str | None, text_engine: str) -> dict:
+    # One short write in append mode, so lines of different processes never mix.
+    with open(os.path.join(path_to_pdfs, "..", "..", "parsed.txt"), "a") as parsed_file:
+        parsed_file.write(file_name + "\n")
+    return {"file_name": file_name}
+
+# Run one node of the sharded scheduler.
+def run_node(root: str, shard: str, lease_timeout: float):
+    parse_pdfs_scheduler.PARSERS[("ds", "CP")] = fake_parse_pdf
+    sys.argv = ["parse_pdfs_scheduler.py", root, "--shard", shard, "--lease-timeout", str(lease_timeout), "--time-limit", "0", "--memory-limit", "0"]
+    arguments = parse_pdfs_scheduler.parse_scheduler_arguments()
+    parse_pdfs_scheduler.run_shards(arguments, root + "log_file.txt")
+
+def make_root(tmp_path) -> str:
+    root = str(tmp_path) + "/"
+    for folder in ["pdf_chunk_lists", "json", "progress_files"]:
+        os.makedirs(root + folder)
+    for chunk, nr_pdfs in CHUNKS.items():
+        county = chunk.split("_")[0]
+        os.makedirs(root + "pdfs/" + county)
+        pd.DataFrame({"file_name": [f"{county}_{i:05d}.pdf" for i in range(nr_pdfs)]}).to_csv(root + "pdf_chunk_lists/" + chunk, index = False)
+    return root
+
+def run_nodes(root: str, shards: list[str], lease_timeout: float):
+    context = multiprocessing.get_context("fork")
+    nodes = [context.Process(target = run_node, args = (root, shard, lease_timeout)) for shard in shards]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join(timeout = 120)
+        assert node.exitcode == 0
+
+def parse_counts(root: str) -> Counter:
+    if(not os.path.exists(root + "parsed.txt")):
+        return Counter()
+    with open(root + "parsed.txt") as parsed_file:
+        return Counter(parsed_file.read().split())
+
+def all_pdfs() -> set[str]:
+    return {f"{chunk.split('_')[0]}_{i:05d}.pdf" for chunk, nr_pdfs in CHUNKS.items() for i in range(nr_pdfs)}
+
+def test_every_pdf_is_parsed_exactly_once(tmp_path):
+    root = make_root(tmp_path)
+    run_nodes(root, [f"{i}/4" for i in range(4)], lease_timeout = 4)
+
+    counts = parse_counts(root)
+    assert set(counts) == all_pdfs()
+    assert set(counts.values()) == {1}
+    assert are_all_shards_done(root + "leases/", 4)
+    assert len(os.listdir(root + "json/")) == len(all_pdfs())
+
+def test_stale_lease_is_taken_over(tmp_path):
+    root = make_root(tmp_path)
+    # A node holds shard 1 and dies right away, after the only other node has started.
+    os.makedirs(root + "leases/")
+    lease_file = shard_file_stem(root + "leases/", 1, 2) + ".lease"
+    with open(lease_file, "w") as file:
+        file.write("dead-node:1:0\n")
+
+    start = time.monotonic()
+    run_nodes(root, ["0/2"], lease_timeout = 2)
+
+    counts = parse_counts(root)
+    assert set(counts) == all_pdfs()
+    assert set(counts.values()) == {1}
+    assert are_all_shards_done(root + "leases/", 2)
+    assert read_lease_owner(lease_file) is None
+    # Shard 1 could only be taken over once its lease went stale.
+    assert time.monotonic() - start >= 2
+
+def test_progress_from_before_sharding_is_kept(tmp_path):
+    root = make_root(tmp_path)
+    # Montgomery was parsed halfway by an old version (progress CSV), Bucks halfway by the unsharded scheduler (progress database).
+    montgomery_parsed = [f"Montgomery_{i:05d}.pdf" for i in range(0, 120, 2)]
+    pd.DataFrame({
+        "file_name": montgomery_parsed + ["Montgomery_00001.pdf"],
+        "successfully_parsed": [True] * len(montgomery_parsed) + [False],
+        "time_stamp": "2025-02-04 00:00:00"
+    }).to_csv(root + "progress_files/progress-Montgomery_ds_CP_CR_chunkList.csv", index = False)
+    bucks_parsed = [f"Bucks_{i:05d}.pdf" for i in range(40)]
+    progress_store = open_progress_store(root + "progress_files/", "Bucks_ds_CP_CR_chunkList.csv")
+    for file_name in bucks_parsed:
+        progress_store.record(file_name, True)
+    progress_store.record("Bucks_00041.pdf", False)
+    progress_store.close()
+
+    run_nodes(root, ["0/2", "1/2"], lease_timeout = 4)
+
+    counts = parse_counts(root)
+    assert set(counts) == all_pdfs() - set(montgomery_parsed) - set(bucks_parsed)
+    assert set(counts.values()) == {1}
+
+# Fails every PDF numbered a multiple of 10 the first time it is given, and parses it the second time.
+def flaky_parse_pdf(file_name: str, path_to_pdfs: str, path_to_text_cache: str | None, text_engine: str) -> dict:
+    fake_parse_pdf(file_name, path_to_pdfs, path_to_text_cache, text_engine)
+    marker = os.path.join(path_to_pdfs, file_name + ".failed")
+    if(int(file_name[-9:-4]) % 10 == 0 and not os.path.exists(marker)):
+        open(marker, "w").close()
+        raise ValueError("Failed the first time.")
+    return {"file_name": file_name}
+
+def test_sinks_are_closed_once_their_chunk_is_back(tmp_path, monkeypatch):
+    root = make_root(tmp_path)
+    monkeypatch.setitem(parse_pdfs_scheduler.PARSERS, ("ds", "CP"), flaky_parse_pdf)
+    monkeypatch.setattr(sys, "argv", ["parse_pdfs_scheduler.py", root, "--workers", "2", "--output", "jsonl", "--max-batch-size", "4", "--time-limit", "0", "--memory-limit", "0"])
+    arguments = parse_pdfs_scheduler.parse_scheduler_arguments()
+    manifest = parse_pdfs_scheduler.read_manifest(root)
+
+    # Record which PDFs every sink took and whether they were all back when it was closed.
+    added = Counter()
+    closed = []
+
+    class RecordingSink(parse_pdfs_scheduler.ResultSink):
+        def add(self, file_name, *args, **kwargs):
+            added[file_name.split("_")[0]] += 1
+            super().add(file_name, *args, **kwargs)
+
+        def close(self):
+            super().close()
+            county = self.progress_store.chunk.split("_")[0]
+            closed.append((county, added[county]))
+
+    monkeypatch.setattr(parse_pdfs_scheduler, "ResultSink", RecordingSink)
+    parse_pdfs_scheduler.run_schedule(manifest, arguments, root + "progress_files/", root + "log_file.txt")
+
+    # Each chunk is closed once after the first pass, with all its PDFs, and once after retrying its failed PDFs.
+    assert sorted(closed) == [("Bucks", 80), ("Bucks", 88), ("Montgomery", 120), ("Montgomery", 132)]
+    for chunk in CHUNKS:
+        progress_store = open_progress_store(root + "progress_files/", chunk)
+        assert len(progress_store.file_names(True)) == CHUNKS[chunk]
+        progress_store.close()
+
+def test_heartbeat_notices_the_lease_was_taken_over(tmp_path):
+    lease_dir = str(tmp_path) + "/"
+    assert try_acquire_lease(lease_dir, 0, 1, "node-a", lease_timeout = 10)
+    heartbeat, lease_lost = start_heartbeat(lease_dir, 0, 1, "node-a", interval = 0.05)
+    time.sleep(0.2)
+    assert not lease_lost.is_set()
+
+    with open(shard_file_stem(lease_dir, 0, 1) + ".lease", "w") as file:
+        file.write("node-b\n")
+    assert lease_lost.wait(timeout = 5)
+    heartbeat.set()
+
+def test_no_more_pdfs_are_handed_out_once_the_lease_is_lost(tmp_path, monkeypatch):
+    root = make_root(tmp_path)
+    monkeypatch.setitem(parse_pdfs_scheduler.PARSERS, ("ds", "CP"), fake_parse_pdf)
+    monkeypatch.setattr(sys, "argv", ["parse_pdfs_scheduler.py", root, "--workers", "1", "--max-batch-size", "4", "--time-limit", "0", "--memory-limit", "0"])
+    arguments = parse_pdfs_scheduler.parse_scheduler_arguments()
+    manifest = parse_pdfs_scheduler.read_manifest(root)
+
+    # Another node takes the shard over after the first 10 PDFs are back.
+    lease_lost = threading.Event()
+    added = []
+
+    class LosingSink(parse_pdfs_scheduler.ResultSink):
+        def add(self, file_name, *args, **kwargs):
+            super().add(file_name, *args, **kwargs)
+            added.append(file_name)
+            if(len(added) == 10):
+                lease_lost.set()
+
+    monkeypatch.setattr(parse_pdfs_scheduler, "ResultSink", LosingSink)
+    assert not parse_pdfs_scheduler.run_schedule(manifest, arguments, root + "progress_files/", root + "log_file.txt", lease_lost)
+
+    # Only the batches already out were parsed after that, and every PDF parsed made it into the progress files.
+    counts = parse_counts(root)
+    assert 10 <= len(counts) <= 10 + 4 * 3
+    assert sorted(added) == sorted(counts)
+    recorded = set()
+    for chunk in CHUNKS:
+        progress_store = open_progress_store(root + "progress_files/", chunk)
+        recorded |= set(progress_store.file_names(True))
+        progress_store.close()
+    assert recorded == set(counts)